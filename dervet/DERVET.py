@@ -34,10 +34,13 @@ This Python script serves as the initial launch point executing the
 Python-based version of DERVET.
 """
 import time
+import itertools
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 
 from dervet.MicrogridScenario import MicrogridScenario
 from dervet.DERVETParams import ParamsDER
 from dervet.MicrogridResult import MicrogridResult
+from storagevet.Checkpoint import Checkpoint
 from storagevet.ErrorHandling import *
 
 
@@ -47,7 +50,7 @@ class DERVET:
 
     """
 
-    def __init__(self, model_parameters_path, verbose=False, **kwargs):
+    def __init__(self, model_parameters_path, verbose=False, workers=1, resume=None, **kwargs):
         """
             Constructor to initialize the parameters and data needed to run
 
@@ -55,15 +58,22 @@ class DERVET:
                 model_parameters_path (str): Filename of the model parameters
                     CSV or JSON that describes the optimization case to be
                     analysed
+                workers (int): number of processes used to solve sensitivity
+                    cases concurrently (1 solves the cases one at a time)
+                resume (str, Path): results folder of an earlier run to
+                    resume from. Optimization windows saved in its
+                    checkpoints are skipped
 
             Notes: kwargs is in place for testing purposes
         """
         self.verbose = verbose
+        self.workers = max(int(workers), 1)
 
         # Initialize Params Object from Model Parameters and Simulation Cases
         self.cases = ParamsDER.initialize(model_parameters_path, self.verbose)
         self.results = MicrogridResult.initialize(ParamsDER.results_inputs,
                                                   ParamsDER.case_definitions)
+        self.resume_path = Checkpoint.resume_folder(resume)
 
         if self.verbose:
             from storagevet.Visualization import Visualization
@@ -72,15 +82,12 @@ class DERVET:
     def solve(self):
         starts = time.time()
 
-        for key, value in self.cases.items():
-            run = MicrogridScenario(value)
-            run.set_up_poi_and_service_aggregator()
-            run.initialize_cba()
-            run.fill_and_drop_extra_data()
-            run.sizing_module()
-            run.optimize_problem_loop()
-
-            MicrogridResult.add_instance(key, run)
+        if self.workers > 1 and len(self.cases) > 1:
+            self.solve_in_parallel()
+        else:
+            for key, value in ParamsDER.load_and_prepare():
+                run = solve_case(value, self.case_checkpoint(key, value))
+                MicrogridResult.add_instance(key, run)
 
         MicrogridResult.sensitivity_summary()
 
@@ -89,3 +96,107 @@ class DERVET:
         TellUser.close_log()
 
         return MicrogridResult
+
+    def solve_in_parallel(self):
+        """ Farms each sensitivity case out to a pool of worker processes. Each
+        worker logs to a file within its case's results folder, and saves its
+        results before sending them back, so results are collected as soon as
+        each case finishes.
+
+        """
+        TellUser.info(f"Solving {len(self.cases)} cases with {self.workers} workers")
+        class_inputs = MicrogridResult.class_inputs()
+        cases = ParamsDER.load_and_prepare()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            # only prepare a case once a worker is free to take it, so that at most WORKERS
+            # cases' data are held in memory at a time
+            futures = {}
+            for key, value in itertools.islice(cases, self.workers):
+                futures[pool.submit(solve_and_report_case, key, value, class_inputs,
+                                    self.verbose, self.case_checkpoint(key, value))] = key
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = futures.pop(future)
+                    try:
+                        template = future.result()
+                    except Exception as e:
+                        TellUser.error(f"Case {key} failed: {e}. See the log file in "
+                                       f"{class_inputs['dir_abs_path'] / str(key)}")
+                        for other in futures:
+                            other.cancel()
+                        TellUser.close_log()
+                        raise
+                    MicrogridResult.add_finished_instance(key, template)
+                    TellUser.info(f"Case {key} finished")
+                    for next_key, value in itertools.islice(cases, 1):
+                        futures[pool.submit(solve_and_report_case, next_key, value, class_inputs,
+                                            self.verbose, self.case_checkpoint(next_key, value))] = next_key
+
+    def case_checkpoint(self, key, case):
+        """ The checkpoint that saves the progress of a case's optimization
+        loop within the results folder (and resumes from the results folder
+        given to resume from, if any)
+
+        Args:
+            key (int): the case number
+            case (ParamsDER): the input parameters of the case
+
+        Returns: Checkpoint
+
+        """
+        return Checkpoint.for_case(MicrogridResult.dir_abs_path, key, case, self.resume_path)
+
+
+def solve_case(case, checkpoint=None):
+    """ Builds a MicrogridScenario from a single case's Params and runs it
+    through sizing and the optimization loop
+
+    Args:
+        case (ParamsDER): the input parameters of the case
+        checkpoint (Checkpoint): saves the progress of the optimization loop
+            (None to not save any)
+
+    Returns: the solved MicrogridScenario
+
+    """
+    run = MicrogridScenario(case)
+    run.checkpoint = checkpoint
+    run.set_up_poi_and_service_aggregator()
+    run.initialize_cba()
+    run.fill_and_drop_extra_data()
+    run.sizing_module()
+    try:
+        run.optimize_problem_loop()
+    except (Exception, KeyboardInterrupt):
+        # keep the windows solved before the error, so the run can be resumed
+        run.save_checkpoint(force=True)
+        raise
+    if checkpoint is not None:
+        checkpoint.remove()
+    return run
+
+
+def solve_and_report_case(key, case, class_inputs, verbose, checkpoint=None):
+    """ Solves a single case and saves its results. Runs in a worker process,
+    so the process-global log is replaced with one for this case.
+
+    Args:
+        key (int): the case number
+        case (ParamsDER): the input parameters of the case
+        class_inputs (Dict): result of MicrogridResult.class_inputs in the parent process
+        verbose (bool): whether or not to print to console for more feedback
+        checkpoint (Checkpoint): saves the progress of the optimization loop
+
+    Returns: the MicrogridResult instance of the case
+
+    """
+    TellUser.close_log()
+    TellUser.create_log(class_inputs['dir_abs_path'] / str(key), verbose)
+    MicrogridResult.set_class_inputs(class_inputs)
+    try:
+        run = solve_case(case, checkpoint)
+        MicrogridResult.add_instance(key, run)
+    finally:
+        TellUser.close_log()
+    return MicrogridResult.instances[key]
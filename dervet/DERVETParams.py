@@ -96,25 +96,21 @@ class ParamsDER(Params):
         return json_tree
 
     @classmethod
-    def initialize(cls, filename, verbose):
-        """ In addition to everything that initialize does in Params, this class will look at
-        Evaluation Value to - 1) determine if cba value can be given and validate; 2) convert
-        any referenced data into direct data 3) if sensitivity analysis, then make sure enough
-        cba values are given 4) build a dictionary of CBA inputs that match with the instances
-        that need to be run
-
-            Args:
-                filename (string): filename of JSON or CSV model parameter
-                verbose (bool): whether or not to print to console for more feedback
-
-            Returns dictionary of instances of Params, each key is a number
+    def case_builder(cls):
+        """ In addition to building the instances like in Params, this class will look at Evaluation
+        Value to - 1) determine if cba value can be given and validate; 2) convert any referenced
+        data into direct data 3) if sensitivity analysis, then make sure enough cba values are given
+
+        The dictionary of CBA inputs that match with each instance is built when that instance
+        is prepared (see prepare_case)
+
         """
-        cls.instances = super().initialize(filename, verbose)  # everything that initialize does in Params (steps 1-4)
+        super().case_builder()  # everything that case_builder does in Params
         # 1) INITIALIZE CLASS VARIABLES
         cls.sensitivity['cba_values'] = dict()
         cls.cba_input_error_raised = False
 
-        # 5) load direct data and create input template
+        # 2) load direct data and create input template
         # determine if cba value can be given and validate
         cls.cba_input_template = cls.cba_template_struct()
 
@@ -126,14 +122,27 @@ class ParamsDER(Params):
             TellUser.close_log()
             raise ModelParameterError("The model parameter has some errors associated to it in the CBA column. Please fix and rerun.")
 
-        # 6) if SA, update case definitions to define which CBA values will apply for each case
+        # 3) if SA, update case definitions to define which CBA values will apply for each case
         cls.add_evaluation_to_case_definitions()
 
-        # 7) build a dictionary of CBA inputs that matches with the instance Params that the inputs should be paired with and
-        # load up datasets that correspond with referenced data in respective cba_input_instance (as defined by CASE_DEFINITIONS)
-        # distribute CBA dictionary of inputs to the corresponding Param instance (so its value can be passed on to Scenario)
-        cls.cba_input_builder()
-        return cls.instances
+    @classmethod
+    def prepare_case(cls, case):
+        """ In addition to everything that prepare_case does in Params, build a dictionary of CBA
+        inputs that matches with the instance and load up datasets that correspond with referenced
+        data in it (as defined by CASE_DEFINITIONS), then give it to the instance (so its value can
+        be passed on to Scenario)
+
+        Args:
+            case (int): key of the case in INSTANCES
+
+        Returns: the prepared instance of ParamsDER
+
+        """
+        if cls.instances[case].prepared:
+            return cls.instances[case]
+        slf = super().prepare_case(case)
+        slf.Finance['CBA'] = slf.load_values_evaluation_column(cls.cba_input_builder(case))
+        return slf
 
     def __init__(self):
         """ Initialize these following attributes of the empty Params class object.
@@ -394,30 +403,30 @@ class ParamsDER(Params):
             TellUser.debug('There are some left over nans in the case definition. Something went wrong.')
 
     @classmethod
-    def cba_input_builder(cls):
+    def cba_input_builder(cls, index):
         """
-            Function to create all the possible combinations of inputs to correspond to the
+            Function to create the combination of CBA inputs that corresponds to the
             sensitivity analysis case being run
 
+        Args:
+            index (int): key of the case in INSTANCES
+
+        Returns: dictionary of CBA inputs for the case
+
         """
-        # while case definitions is not an empty df (there is SA)
-        # or if it is the last row in case definitions
-        for index, case in cls.instances.items():
-            cba_dict = copy.deepcopy(cls.cba_input_template)
-            # check to see if there are any CBA values included in case definition
-            # OTHERWISE just read in any referenced data
-            for tag_key_id in cls.sensitivity['cba_values'].keys():
-                row = cls.case_definitions.iloc[index]
-                # modify the case dictionary
-                if tag_key_id[0] in cls.cba_input_template['ders_values'].keys():
-                    cba_dict['ders_values'][tag_key_id[0]][tag_key_id[2]][tag_key_id[1]] = row.loc[f"CBA {tag_key_id}"]
-                elif tag_key_id[0] in cls.cba_input_template['valuestream_values'].keys():
-                    cba_dict['valuestream_values'][tag_key_id[0]][tag_key_id[2]][tag_key_id[1]] = row.loc[f"CBA {tag_key_id}"]
-                else:
-                    cba_dict[tag_key_id[0]][tag_key_id[2]][tag_key_id[1]] = row.loc[f"CBA {tag_key_id}"]
-            # flatten dictionaries for VS, Scenario, and Fiances & prepare referenced data
-            cba_dict = case.load_values_evaluation_column(cba_dict)
-            cls.instances[index].Finance['CBA'] = cba_dict
+        cba_dict = copy.deepcopy(cls.cba_input_template)
+        # check to see if there are any CBA values included in case definition
+        # OTHERWISE just read in any referenced data
+        for tag_key_id in cls.sensitivity['cba_values'].keys():
+            row = cls.case_definitions.iloc[index]
+            # modify the case dictionary
+            if tag_key_id[0] in cls.cba_input_template['ders_values'].keys():
+                cba_dict['ders_values'][tag_key_id[0]][tag_key_id[2]][tag_key_id[1]] = row.loc[f"CBA {tag_key_id}"]
+            elif tag_key_id[0] in cls.cba_input_template['valuestream_values'].keys():
+                cba_dict['valuestream_values'][tag_key_id[0]][tag_key_id[2]][tag_key_id[1]] = row.loc[f"CBA {tag_key_id}"]
+            else:
+                cba_dict[tag_key_id[0]][tag_key_id[2]][tag_key_id[1]] = row.loc[f"CBA {tag_key_id}"]
+        return cba_dict
 
     def load_values_evaluation_column(self, cba_dict):
         """ Flattens each tag that the Schema has defined to only have 1 allowed. Loads data sets
@@ -473,6 +482,59 @@ class ParamsDER(Params):
         self.Finance.update({'location': self.Scenario['location'],
                              'ownership': self.Scenario['ownership']})
 
+    def check_inputs(self):
+        """ Error checks the inputs of the case that can be checked without loading any data. Errors found
+        are recorded.
+
+        """
+        super().check_inputs()
+        for id_str, pv_inputs in self.PV.items():
+            if not pv_inputs['rated_capacity']:
+                if pv_inputs['min_rated_capacity'] > pv_inputs['max_rated_capacity']:
+                    self.record_input_error('Error: maximum rated power is less than the minimum rated power.' +
+                                            f"PV {id_str}")
+        for id_str, battery_inputs in self.Battery.items():
+            if battery_inputs['state_of_health'] > battery_inputs['cycle_life_table_eol_condition']:
+                self.record_input_error(f"Battery #{id_str} state_of_health > cycle_life_table_eol_condition. SOH input should be lesser than eol condition used to create cycle life table for accurate degradation calculation")
+
+            if not battery_inputs['ch_max_rated'] or not battery_inputs['dis_max_rated']:
+                if battery_inputs['incl_degradation']:
+                    self.record_input_error(
+                        f'Error: BATTERY {id_str}: Degradation with power sizing is still under ' +
+                        f'development. Please choose to do one or the other.')
+                if not battery_inputs['ch_max_rated']:
+                    if battery_inputs['user_ch_rated_min'] > battery_inputs['user_ch_rated_max']:
+                        self.record_input_error('Error: User battery min charge power requirement is greater than max charge power requirement.' +
+                                                f"BATTERY {id_str}")
+                if not battery_inputs['dis_max_rated']:
+                    if battery_inputs['user_dis_rated_min'] > battery_inputs['user_dis_rated_max']:
+                        self.record_input_error('User battery min discharge power requirement is greater than max discharge power requirement.')
+            if not battery_inputs['ene_max_rated']:
+                if battery_inputs['incl_degradation']:
+                    self.record_input_error(
+                        f'Error: BATTERY {id_str}: Degradation with energy sizing is still under' +
+                        f' development. Please choose to do one or the other.')
+                if battery_inputs['user_ene_rated_min'] > battery_inputs['user_ene_rated_max']:
+                    self.record_input_error('Error: User battery min energy requirement is greater than max energy requirement.')
+
+        for id_str, ev1_input in self.ElectricVehicle1.items():
+            # max ratings should not be greater than the min rating for power and energy
+            if ev1_input['ch_min_rated'] > ev1_input['ch_max_rated']:
+                self.record_input_error(f"EV1 #{id_str} ch_max_rated < ch_min_rated. ch_max_rated should be greater than ch_min_rated")
+
+        for id_str, electrolyzer_inputs in self.ElectrolyzerSystem.items():
+            # min rating should not be greater than the max rating for power
+            if electrolyzer_inputs['min_rated_power'] > electrolyzer_inputs['max_rated_power']:
+                self.record_input_error(f"ElectrolyzerSystem #{id_str} max_rated_power < min_rated_power. max_rated_power ({electrolyzer_inputs['max_rated_power']}) should be greater than min_rated_power ({electrolyzer_inputs['min_rated_power']})")
+            # do not allow sizing when the operation of the system is fixed
+            if electrolyzer_inputs['hydrogen_schedule_mode'] == 1 and electrolyzer_inputs['rated_power'] == 0:
+                self.record_input_error(f'ElectrolyzerSystem #{id_str} power sizing is turned ON, but we have declared a fixed operation of the system by setting hydrogen_schedul_mode to 1. This is incompatible; one or the other must be changed.')
+            # electrolyzer degradation-related warnings
+            if not electrolyzer_inputs['rated_power'] and electrolyzer_inputs['incl_degradation']:
+                self.record_input_error(
+                    f'Error: ELECTROLYZERSYSTEM {id_str}: Degradation with power sizing is still under ' +
+                    f'development. Please choose to do one or the other.')
+
     def load_technology(self, names_list=None):
         """ Interprets user given data and prepares it for each technology.
 
@@ -513,34 +575,8 @@ class ParamsDER(Params):
             # then no name_lst was inherited so initialize as list type
             names_list = []
 
-        for id_str, pv_inputs in self.PV.items():
-            if not pv_inputs['rated_capacity']:
-                if pv_inputs['min_rated_capacity'] > pv_inputs['max_rated_capacity']:
-                    self.record_input_error('Error: maximum rated power is less than the minimum rated power.' +
-                                            f"PV {id_str}")
+        # the inputs that need no data were checked by check_inputs
         for id_str, battery_inputs in self.Battery.items():
-            if battery_inputs['state_of_health'] > battery_inputs['cycle_life_table_eol_condition']:
-                self.record_input_error(f"Battery #{id_str} state_of_health > cycle_life_table_eol_condition. SOH input should be lesser than eol condition used to create cycle life table for accurate degradation calculation")
-
-            if not battery_inputs['ch_max_rated'] or not battery_inputs['dis_max_rated']:
-                if battery_inputs['incl_degradation']:
-                    self.record_input_error(
-                        f'Error: BATTERY {id_str}: Degradation with power sizing is still under ' +
-                        f'development. Please choose to do one or the other.')
-                if not battery_inputs['ch_max_rated']:
-                    if battery_inputs['user_ch_rated_min'] > battery_inputs['user_ch_rated_max']:
-                        self.record_input_error('Error: User battery min charge power requirement is greater than max charge power requirement.' +
-                                                f"BATTERY {id_str}")
-                if not battery_inputs['dis_max_rated']:
-                    if battery_inputs['user_dis_rated_min'] > battery_inputs['user_dis_rated_max']:
-                        self.record_input_error('User battery min discharge power requirement is greater than max discharge power requirement.')
-            if not battery_inputs['ene_max_rated']:
-                if battery_inputs['incl_degradation']:
-                    self.record_input_error(
-                        f'Error: BATTERY {id_str}: Degradation with energy sizing is still under' +
-                        f' development. Please choose to do one or the other.')
-                if battery_inputs['user_ene_rated_min'] > battery_inputs['user_ene_rated_max']:
-                    self.record_input_error('Error: User battery min energy requirement is greater than max energy requirement.')
             # check if user wants to include timeseries constraints -> grab data
             if battery_inputs['incl_ts_energy_limits']:
                 self.load_ts_limits(id_str, battery_inputs, 'Battery', 'Energy', 'kWh', time_series, time_series_nan_count)
@@ -566,9 +602,6 @@ class ParamsDER(Params):
                                 'growth': self.Scenario['def_growth']})
 
         for id_str, ev1_input in self.ElectricVehicle1.items():
-            # max ratings should not be greater than the min rating for power and energy
-            if ev1_input['ch_min_rated'] > ev1_input['ch_max_rated']:
-                self.record_input_error(f"EV1 #{id_str} ch_max_rated < ch_min_rated. ch_max_rated should be greater than ch_min_rated")
             ev1_input.update({'binary': binary,
                               'dt': dt})
             names_list.append(ev1_input['name'])
@@ -616,18 +649,12 @@ class ParamsDER(Params):
                 electrolyzer_inputs.update({'binary': binary,
                                   'dt': dt})
                 names_list.append(electrolyzer_inputs['name'])
-                # min rating should not be greater than the max rating for power
-                if electrolyzer_inputs['min_rated_power'] > electrolyzer_inputs['max_rated_power']:
-                    self.record_input_error(f"ElectrolyzerSystem #{id_str} max_rated_power < min_rated_power. max_rated_power ({electrolyzer_inputs['max_rated_power']}) should be greater than min_rated_power ({electrolyzer_inputs['min_rated_power']})")
                 # upload a hydrogen schedule timeseries if the flag is set to 1
                 if electrolyzer_inputs['hydrogen_schedule_mode'] == 1:
                     single_instance = True
                     if len(self.ElectrolyzerSystem) > 1:
                         single_instance = False
                     electrolyzer_inputs.update({'ts_hydrogen_schedule': self.get_single_series(time_series, 'ElectrolyzerSystem Schedule (kW)', time_series_nan_count, 'ElectrolyzerSystem Load', id_str=id_str, single_instance=single_instance)})
-                    # do not allow sizing in this scenario
-                    if electrolyzer_inputs['rated_power'] == 0:
-                        self.record_input_error(f'ElectrolyzerSystem #{id_str} power sizing is turned ON, but we have declared a fixed operation of the system by setting hydrogen_schedul_mode to 1. This is incompatible; one or the other must be changed.')
                 # ensure that the ElectrolyzerSystem size is large enough to meet the
                 #   hydrogen production quota at 100 percent capacity factor
                 if electrolyzer_inputs['hydrogen_schedule_mode'] == 2 and electrolyzer_inputs['rated_power']:
@@ -643,7 +670,7 @@ class ParamsDER(Params):
                 # upload a variable efficiency curve if the flag is set to 1
                 if electrolyzer_inputs['incl_variable_efficiency']:
                     try:
-                        electrolyzer_inputs['variable_efficiency_data'] = self.referenced_data['variable_efficiency_filename'][electrolyzer_inputs['variable_efficiency_filename']]
+                        electrolyzer_inputs['variable_efficiency_data'] = self.referenced_data['variable_efficiency_filename'][electrolyzer_inputs['variable_efficiency_filename']].copy(deep=False)
                     except KeyError:
                         self.record_input_error(f"Missing variable_efficiency_filename for ElectrolyzerSystem #{id_str}: {electrolyzer_inputs['variable_efficiency_filename']} Please include a variable_efficiency_filename")
                     # make sure we have the required columns
@@ -655,7 +682,7 @@ class ParamsDER(Params):
                 # upload a degradation curve if the incl_degradation flag is set to 1
                 if electrolyzer_inputs['incl_degradation']:
                     try:
-                        electrolyzer_inputs['cycle_life_data'] = self.referenced_data['cycle_life_filename'][electrolyzer_inputs['cycle_life_filename']]
+                        electrolyzer_inputs['cycle_life_data'] = self.referenced_data['cycle_life_filename'][electrolyzer_inputs['cycle_life_filename']].copy(deep=False)
                     except KeyError:
                         self.record_input_error(f"Missing cycle_life_filename for ElectrolyzerSystem #{id_str}: {electrolyzer_inputs['cycle_life_filename']} Please include a cycle_life_filename")
                     # make sure we have the required columns
@@ -664,11 +691,6 @@ class ParamsDER(Params):
                             if required_column not in electrolyzer_inputs['cycle_life_data'].columns:
                                 self.record_input_error(
                                         f"'{required_column}' is missing from {electrolyzer_inputs['cycle_life_filename']}")
-                # electrolyzer degradation-related warnings
-                if not electrolyzer_inputs['rated_power'] and electrolyzer_inputs['incl_degradation']:
-                    self.record_input_error(
-                        f'Error: ELECTROLYZERSYSTEM {id_str}: Degradation with power sizing is still under ' +
-                        f'development. Please choose to do one or the other.')
         if len(self.DieselGenset):
             for id_str, inputs in self.DieselGenset.items():
                 inputs.update({'dt': dt})
@@ -760,11 +782,11 @@ class ParamsDER(Params):
                 ts_max_nan_count = time_series_nan_count.get(ts_max_name, len(ts_max))
                 ts_min_nan_count = time_series_nan_count.get(ts_min_name, len(ts_min))
                 if ts_max_nan_count != 0:
-                    ts_max.fillna(fill_max_value, inplace=True)
+                    ts_max = ts_max.fillna(fill_max_value)
                     TellUser.warning(f"We have filled in {ts_max_nan_count} empty/NaN value(s) from "
                                      f"'{ts_max_name}' with the value: {fill_max_value}")
                 if ts_min_nan_count != 0:
-                    ts_min.fillna(fill_min_value, inplace=True)
+                    ts_min = ts_min.fillna(fill_min_value)
                     TellUser.warning(f"We have filled in {ts_min_nan_count} empty/NaN value(s) from "
                                      f"'{ts_min_name}' with the value: {fill_min_value}")
             # return 2 series
@@ -864,7 +886,7 @@ class ParamsDER(Params):
                 self.record_input_error("Missing 'Critial Load (kW)' from timeseries input. Please include a critical load.")
             if self.Reliability['load_shed_percentage']:
                 try:
-                    self.Reliability['load_shed_data'] = self.referenced_data["load_shed_percentage"][self.Reliability['load_shed_perc_filename']]
+                    self.Reliability['load_shed_data'] = self.referenced_data["load_shed_percentage"][self.Reliability['load_shed_perc_filename']].copy(deep=False)
                 except KeyError:
                     self.record_input_error("Missing 'Load shed percentage' file . Please include a load_shed_perc_filename") #--TODO length of the data
         # TODO add try statements around each lookup to time_series
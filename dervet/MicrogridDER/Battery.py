@@ -45,6 +45,7 @@ class Battery(BatteryTech.Battery, ESSSizing):
     """ Battery class that inherits from Storage.
 
     """
+    DEGRADATION_STATE = BatteryTech.Battery.DEGRADATION_STATE + ['years_system_degraded']
 
     def __init__(self, params):
         """ Initializes a battery class that inherits from the technology class.
@@ -186,8 +187,7 @@ class Battery(BatteryTech.Battery, ESSSizing):
         """ Builds the master constraint list for the subset of timeseries data being optimized.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns:
             A list of constraints that corresponds the battery's physical constraints and its service constraints
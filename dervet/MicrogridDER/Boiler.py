@@ -309,22 +309,16 @@ class Boiler(DER, ContinuousSizing, DERExtension):
         if self.variables_df.index.empty:
             return pro_forma
 
-        optimization_years = self.variables_df.index.year.unique()
         hot = self.variables_df['hotwater'] + self.variables_df['steam']
+        yearly_hot = Lib.yearly_sum(hot)
         # fixed om costs
-        om_costs = pd.DataFrame()
+        om_costs = pd.DataFrame({self.fixed_column_name(): -self.fixed_om}, index=yearly_hot.index)
         # fuel costs
-        fuel_costs = pd.DataFrame()
         fuel_col_name = tech_id + ' Fuel Costs'
-        for year in optimization_years:
-            hot_sub = hot.loc[hot.index.year == year]
-            # add fuel costs
-            if self.is_fuel:
-                fuel_costs.loc[pd.Period(year=year, freq='Y'), fuel_col_name] = -np.sum(self.fuel_cost * (1/KW_PER_MMBTU_HR) * self.dt * hot_sub * (1/self.cop))
-            else:
-                fuel_costs.loc[pd.Period(year=year, freq='Y'), fuel_col_name] = 0.0
-            # add fixed o&m costs
-            om_costs.loc[pd.Period(year=year, freq='Y'), self.fixed_column_name()] = -self.fixed_om
+        if self.is_fuel:
+            fuel_costs = pd.DataFrame({fuel_col_name: -self.fuel_cost * (1/KW_PER_MMBTU_HR) * self.dt * yearly_hot * (1/self.cop)})
+        else:
+            fuel_costs = pd.DataFrame({fuel_col_name: 0.0}, index=yearly_hot.index)
         # fill forward
         fuel_costs = fill_forward_func(fuel_costs, None)
         om_costs = fill_forward_func(om_costs, None, is_om_cost=True)
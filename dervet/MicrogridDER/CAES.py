@@ -71,7 +71,7 @@ class CAES(CAESTech.CAES, ESSSizing):
         """ Generates the objective function related to a technology. Default includes O&M which can be 0
 
         Args:
-            mask (Series): Series of booleans used, the same length as case.power_kw
+            mask (OptimizationWindow): the timesteps of the optimization window
             annuity_scalar (float): a scalar value to be multiplied by any yearly cost or benefit that helps capture the cost/benefit over
                     the entire project lifetime (only to be set iff sizing, else alpha should not affect the aobject function)
 
@@ -153,7 +153,7 @@ class Chiller(DER, DERExtension, ContinuousSizing):
         if self.is_hot:
             return self.variables_dict['cold'] / self.cop
         else:
-            return cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name=f'{self.name}-Zero')
+            return cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name=f'{self.name}-Zero')
 
     def constraints(self, mask, **kwargs):
         constraint_list = super().constraints(mask)
@@ -313,22 +313,16 @@ class Chiller(DER, DERExtension, ContinuousSizing):
         if self.variables_df.index.empty:
             return pro_forma
 
-        optimization_years = self.variables_df.index.year.unique()
         cold = self.variables_df['cold']
+        yearly_cold = Lib.yearly_sum(cold)
         # fixed om costs
-        om_costs = pd.DataFrame()
+        om_costs = pd.DataFrame({self.fixed_column_name(): -self.fixed_om}, index=yearly_cold.index)
         # fuel costs
-        fuel_costs = pd.DataFrame()
         fuel_col_name = tech_id + ' Fuel Costs'
-        for year in optimization_years:
-            cold_sub = cold.loc[cold.index.year == year]
-            # add fuel costs
-            if self.is_fuel:
-                fuel_costs.loc[pd.Period(year=year, freq='Y'), fuel_col_name] = -np.sum(self.fuel_cost * (1/KW_PER_MMBTU_HR) * self.dt * cold_sub * (1/self.cop))
-            else:
-                fuel_costs.loc[pd.Period(year=year, freq='Y'), fuel_col_name] = 0.0
-            # add fixed o&m costs
-            om_costs.loc[pd.Period(year=year, freq='Y'), self.fixed_column_name()] = -self.fixed_om
+        if self.is_fuel:
+            fuel_costs = pd.DataFrame({fuel_col_name: -self.fuel_cost * (1/KW_PER_MMBTU_HR) * self.dt * yearly_cold * (1/self.cop)})
+        else:
+            fuel_costs = pd.DataFrame({fuel_col_name: 0.0}, index=yearly_cold.index)
         # fill forward
         fuel_costs = fill_forward_func(fuel_costs, None)
         om_costs = fill_forward_func(om_costs, None, is_om_cost=True)
@@ -62,8 +62,7 @@ class DieselGenset(ICE):
         this DER can schedule to reserve
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
@@ -76,8 +75,7 @@ class DieselGenset(ICE):
         this DER can schedule to reserve
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
@@ -65,8 +65,7 @@ class DiscreteSizing:
         """ Builds the master constraint list for the subset of timeseries data being optimized.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns:
             A list of constraints that corresponds the battery's physical constraints and its service constraints
@@ -84,7 +83,7 @@ class DiscreteSizing:
         """ Generates the objective function related to a technology. Default includes O&M which can be 0
 
         Args:
-            mask (Series): Series of booleans used, the same length as case.power_kw
+            mask (OptimizationWindow): the timesteps of the optimization window
             annuity_scalar (float): a scalar value to be multiplied by any yearly cost or benefit that helps capture the cost/benefit over
                         the entire project lifetime (only to be set iff sizing)
 
@@ -243,8 +243,7 @@ class ESSSizing(EnergyStorage, DERExtension, ContinuousSizing):
         """ Builds the master constraint list for the subset of timeseries data being optimized.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns:
             A list of constraints that corresponds the battery's physical constraints and its service constraints
@@ -256,28 +255,28 @@ class ESSSizing(EnergyStorage, DERExtension, ContinuousSizing):
             # add timeseries energy limits on this instance
             ene = self.variables_dict['ene']
             if self.limit_energy_max is not None:
-                energy_max = cvx.Parameter(value=self.limit_energy_max.loc[mask].values, shape=sum(mask), name='ts_energy_max')
+                energy_max = cvx.Parameter(value=mask.subset(self.limit_energy_max).values, shape=mask.size, name='ts_energy_max')
                 constraint_list += [cvx.NonPos(ene - energy_max)]
             if self.limit_energy_min is not None:
-                energy_min = cvx.Parameter(value=self.limit_energy_min.loc[mask].values, shape=sum(mask), name='ts_energy_min')
+                energy_min = cvx.Parameter(value=mask.subset(self.limit_energy_min).values, shape=mask.size, name='ts_energy_min')
                 constraint_list += [cvx.NonPos(energy_min - ene)]
         if self.incl_charge_limits:
             # add timeseries energy limits on this instance
             charge = self.variables_dict['ch']
             if self.limit_charge_max is not None:
-                charge_max = cvx.Parameter(value=self.limit_charge_max.loc[mask].values, shape=sum(mask), name='ts_charge_max')
+                charge_max = cvx.Parameter(value=mask.subset(self.limit_charge_max).values, shape=mask.size, name='ts_charge_max')
                 constraint_list += [cvx.NonPos(charge - charge_max)]
             if self.limit_charge_min is not None:
-                charge_min = cvx.Parameter(value=self.limit_charge_min.loc[mask].values, shape=sum(mask), name='ts_charge_min')
+                charge_min = cvx.Parameter(value=mask.subset(self.limit_charge_min).values, shape=mask.size, name='ts_charge_min')
                 constraint_list += [cvx.NonPos(charge_min - charge)]
         if self.incl_discharge_limits:
             # add timeseries energy limits on this instance
             discharge = self.variables_dict['dis']
             if self.limit_discharge_max is not None:
-                discharge_max = cvx.Parameter(value=self.limit_discharge_max.loc[mask].values, shape=sum(mask), name='ts_discharge_max')
+                discharge_max = cvx.Parameter(value=mask.subset(self.limit_discharge_max).values, shape=mask.size, name='ts_discharge_max')
                 constraint_list += [cvx.NonPos(discharge - discharge_max)]
             if self.limit_discharge_min is not None:
-                discharge_min = cvx.Parameter(value=self.limit_discharge_min.loc[mask].values, shape=sum(mask), name='ts_discharge_min')
+                discharge_min = cvx.Parameter(value=mask.subset(self.limit_discharge_min).values, shape=mask.size, name='ts_discharge_min')
                 constraint_list += [cvx.NonPos(discharge_min - discharge)]
         return constraint_list
 
@@ -285,7 +284,7 @@ class ESSSizing(EnergyStorage, DERExtension, ContinuousSizing):
         """ Generates the objective function related to a technology. Default includes O&M which can be 0
 
         Args:
-            mask (Series): Series of booleans used, the same length as case.power_kw
+            mask (OptimizationWindow): the timesteps of the optimization window
             annuity_scalar (float): a scalar value to be multiplied by any yearly cost or benefit that helps capture the cost/benefit over
                     the entire project lifetime (only to be set iff sizing, else alpha should not affect the aobject function)
 
@@ -36,6 +36,7 @@ import logging
 import cvxpy as cvx
 import numpy as np
 import pandas as pd
+import storagevet.Library as Lib
 from storagevet.Technology.DistributedEnergyResource import DER
 from dervet.MicrogridDER.DERExtension import DERExtension
 from dervet.MicrogridDER.ContinuousSizing import ContinuousSizing
@@ -125,8 +126,7 @@ class ElectricVehicle1(DER, ContinuousSizing, DERExtension):
     def get_state_of_energy(self, mask):
         """
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the state of energy as a function of time for the
 
@@ -136,8 +136,7 @@ class ElectricVehicle1(DER, ContinuousSizing, DERExtension):
     def get_charge(self, mask):
         """
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the charge as a function of time for the
 
@@ -154,8 +153,7 @@ class ElectricVehicle1(DER, ContinuousSizing, DERExtension):
         this DER can schedule to reserve
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
@@ -167,8 +165,7 @@ class ElectricVehicle1(DER, ContinuousSizing, DERExtension):
         this DER can schedule to reserve
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
@@ -196,7 +193,7 @@ class ElectricVehicle1(DER, ContinuousSizing, DERExtension):
         """
 
         Args:
-            mask:
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns:
 
@@ -221,8 +218,7 @@ class ElectricVehicle1(DER, ContinuousSizing, DERExtension):
         """Default build constraint list method. Used by services that do not have constraints.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns:
             A list of constraints that corresponds the EV requirement to collect the required energy to operate. It also allows
@@ -230,7 +226,7 @@ class ElectricVehicle1(DER, ContinuousSizing, DERExtension):
         """
 
         constraint_list = []
-        self.get_active_times(mask.loc[mask])  # constructing the array that indicates whether the ev is plugged or not
+        self.get_active_times(mask)  # constructing the array that indicates whether the ev is plugged or not
 
         # print(self.plugin_times_index.iloc[0:24])
         # print(self.plugout_times_index.iloc[0:24])
@@ -335,11 +331,8 @@ class ElectricVehicle1(DER, ContinuousSizing, DERExtension):
         if self.variables_df.index.empty:
             return pro_forma
         optimization_years = self.variables_df.index.year.unique()
-        om_costs = pd.DataFrame()
-        for year in optimization_years:
-            # add fixed o&m costs
-            index_yr = pd.Period(year=year, freq='Y')
-            om_costs.loc[index_yr, self.fixed_column_name()] = -self.fixed_om
+        # add fixed o&m costs
+        om_costs = pd.DataFrame({self.fixed_column_name(): -self.fixed_om}, index=Lib.yearly_index(optimization_years))
         # fill forward
         om_costs = fill_forward_func(om_costs, None)
         # apply inflation rates
@@ -443,8 +436,7 @@ class ElectricVehicle2(DER, ContinuousSizing, DERExtension):
     def get_charge(self, mask):
         """
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the charge as a function of time for the
 
@@ -461,34 +453,32 @@ class ElectricVehicle2(DER, ContinuousSizing, DERExtension):
         this DER can schedule to reserve
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
 
 
         """
-        return self.variables_dict['ch'] - (1 - self.max_load_ctrl) * self.EV_load_TS[mask]
+        return self.variables_dict['ch'] - (1 - self.max_load_ctrl) * mask.subset(self.EV_load_TS)
 
     def get_charge_down_schedule(self, mask):
         """ the amount of charging power in the up direction (pulling power down from the grid) that
         this DER can schedule to reserve
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
         """
-        return -self.variables_dict['ch'] + self.EV_load_TS[mask]
+        return -self.variables_dict['ch'] + mask.subset(self.EV_load_TS)
 
     def objective_function(self, mask, annuity_scalar=1):
         """ Generates the objective function related to a technology. Default includes O&M which can be 0
 
         Args:
-            mask (Series): Series of booleans used, the same length as case.power_kw
+            mask (OptimizationWindow): the timesteps of the optimization window
             annuity_scalar (float): a scalar value to be multiplied by any yearly cost or benefit that helps capture the cost/benefit over
                     the entire project lifetime (only to be set iff sizing, else annuity_scalar should not affect the aobject function)
 
@@ -500,7 +490,7 @@ class ElectricVehicle2(DER, ContinuousSizing, DERExtension):
         ch = self.variables_dict['ch']
         costs = {
             self.name + ' fixed_om': self.fixed_om * annuity_scalar,
-            self.name + ' lost_load_cost': cvx.sum(self.EV_load_TS[mask].values - ch) * self.lost_load_cost  # added to account for lost load
+            self.name + ' lost_load_cost': cvx.sum(mask.subset(self.EV_load_TS).values - ch) * self.lost_load_cost  # added to account for lost load
 
         }
         # add startup objective costs
@@ -511,8 +501,7 @@ class ElectricVehicle2(DER, ContinuousSizing, DERExtension):
         """Default build constraint list method. Used by services that do not have constraints.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns:
             A list of constraints that corresponds the EV requirement to collect the required energy to operate. It also allows
@@ -526,8 +515,8 @@ class ElectricVehicle2(DER, ContinuousSizing, DERExtension):
         # uch = self.variables_dict['uch']
 
         # constraints on the ch/dis power
-        constraint_list += [cvx.NonPos(ch - self.EV_load_TS[mask].values)]
-        constraint_list += [cvx.NonPos((1 - self.max_load_ctrl) * self.EV_load_TS[mask].values - ch)]
+        constraint_list += [cvx.NonPos(ch - mask.subset(self.EV_load_TS).values)]
+        constraint_list += [cvx.NonPos((1 - self.max_load_ctrl) * mask.subset(self.EV_load_TS).values - ch)]
 
         # the constraint below limits energy throughput and total discharge to less than or equal to
         # (number of cycles * energy capacity) per day, for technology warranty purposes
@@ -568,11 +557,8 @@ class ElectricVehicle2(DER, ContinuousSizing, DERExtension):
         if self.variables_df.index.empty:
             return pro_forma
         optimization_years = self.variables_df.index.year.unique()
-        om_costs = pd.DataFrame()
-        for year in optimization_years:
-            # add fixed o&m costs
-            index_yr = pd.Period(year=year, freq='Y')
-            om_costs.loc[index_yr, self.fixed_column_name()] = -self.fixed_om
+        # add fixed o&m costs
+        om_costs = pd.DataFrame({self.fixed_column_name(): -self.fixed_om}, index=Lib.yearly_index(optimization_years))
         # fill forward
         om_costs = fill_forward_func(om_costs, None)
         # apply inflation rates
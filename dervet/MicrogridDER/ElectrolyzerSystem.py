@@ -32,12 +32,13 @@ ElectrolyzerSystem
 
 This Python class contains methods and attributes specific for an ElectrolyzerSystem Technology
 """
+import copy
 import logging
 import cvxpy as cvx
 import numpy as np
 import pandas as pd
-import rainflow
 import storagevet.Library as Lib
+from storagevet.CycleCounting import RainflowCounter
 from storagevet.Technology.DistributedEnergyResource import DER
 from dervet.MicrogridDER.DERExtension import DERExtension
 from dervet.MicrogridDER.ContinuousSizing import ContinuousSizing
@@ -48,6 +49,8 @@ from storagevet.Library import truncate_float, is_leap_yr
 class ElectrolyzerSystem(DER, ContinuousSizing, DERExtension):
     """
     """
+    # the attributes that calc_degradation changes
+    DEGRADATION_STATE = ['degrade_perc', 'soh', 'degrade_data', 'cycle_counter', 'years_system_degraded']
 
     def __init__(self, params):
         """ Initialize all technology with the following attributes.
@@ -68,6 +71,7 @@ class ElectrolyzerSystem(DER, ContinuousSizing, DERExtension):
 
         self.efficiency = params['efficiency'] # kg/kWh
         self.variable_efficiency_data = params.get('variable_efficiency_data', None)
+        self.variable_efficiency_interpolation = bool(params.get('variable_efficiency_interpolation') or 0)
 
         self.h2_unit_value = params['hydrogen_unit_value']  # $/kg
         self.ts_hydrogen_schedule = params.get('ts_hydrogen_schedule', False)
@@ -95,7 +99,11 @@ class ElectrolyzerSystem(DER, ContinuousSizing, DERExtension):
         self.yearly_degrade = params['yearly_degrade'] / 100
         self.incl_degradation = bool(params['incl_degradation'])
         self.degrade_data = None
-        self.counted_cycles = []
+        self.cycle_counter = None
+        # solve optimization windows in parallel with a predicted degradation (degradation does not change the
+        # rated power, so no window is solved again)
+        self.parallel_degradation_tolerance = (params.get('parallel_degradation_tolerance') or 0) / 100
+        self.degradation_reconciliation = None
         self.eol_condition = 0  # this is not a collected input
         self.state_of_health = 0  # this is not a collected input
         self.years_system_degraded = set()
@@ -148,6 +156,7 @@ class ElectrolyzerSystem(DER, ContinuousSizing, DERExtension):
             self.degrade_data['state of health %'] = self.soh * 1e2
             # NOTE: we do not model performance degradation here; self.degraded_energy_capacity() is constant
             #self.degrade_data['effective energy capacity (kWh)'] = self.degraded_energy_capacity()
+            self.cycle_counter = RainflowCounter(self.cycle_life['Power Fluctuation (%)'])
             self.calc_degradation('Optimization Start', None, None)
             # calculate current degrade_perc since installation
             step_before_optimziation_problems = opt_agg.sort_index().index[0] - pd.Timedelta(self.dt, unit='h')
@@ -169,6 +178,39 @@ class ElectrolyzerSystem(DER, ContinuousSizing, DERExtension):
         # do not reduce the performance based on the SOH
         return self.rated_power
 
+    def degradation_state(self):
+        """ Returns: a copy of the attributes that calc_degradation changes, so that the degradation of the
+        optimization windows can be calculated again from the same start (see restore_degradation_state)
+
+        """
+        return copy.deepcopy({attr: getattr(self, attr) for attr in self.DEGRADATION_STATE})
+
+    def restore_degradation_state(self, state):
+        """ Undoes any degradation calculated since STATE was taken
+
+        Args:
+            state (dict): from degradation_state
+
+        """
+        for attr, value in copy.deepcopy(state).items():
+            setattr(self, attr, value)
+
+    def set_degradation(self, degrade_perc):
+        """ Sets the degradation progress that the next optimization window is solved with
+
+        Args:
+            degrade_perc (float): degradation progress
+
+        """
+        self.degrade_perc = degrade_perc
+
+    def capacity_difference(self, degrade_perc1, degrade_perc2):
+        """ Returns: the difference between the effective capacities of two degradation progresses (always 0,
+        because degradation does not change the rated power)
+
+        """
+        return 0
+
     def calc_degradation(self, opt_period, start_dttm, last_dttm):
         """ calculate degradation percent based on yearly degradation and cycle degradation
 
@@ -189,41 +231,17 @@ class ElectrolyzerSystem(DER, ContinuousSizing, DERExtension):
 
             if not isinstance(opt_period, str):
                 # calculate degradation due to cycling iff energy values are given
-                energy_series = self.variables_df.loc[start_dttm:last_dttm, 'electrolyzer_power']
+                energy_series = self.variable_results.between('electrolyzer_power', start_dttm, last_dttm)
                 # Find the effective energy capacity
                 eff_e_cap = self.degraded_energy_capacity()
 
-                #If using rainflow counting package uncomment following few lines
-                # use rainflow counting algorithm to get cycle counts
-                # cycle_counts = rainflow.count_cycles(energy_series, ndigits=4)
-                #
-                # aux_df = pd.DataFrame(cycle_counts, columns=['Depth', 'N_cycles'])
-                # aux_df['Opt window'] = opt_period
-                #
-                # # sort cycle counts into user inputed cycle life bins
-                # digitized_cycles = np.searchsorted(self.cycle_life['Power Fluctuation (%)'],[min(i[0]/eff_e_cap, 1) for i in cycle_counts], side='left')
-
-                # use rainflow extract function to get information on each cycle
-                cycle_extract=list(rainflow.extract_cycles(energy_series))
-                aux_df = pd.DataFrame(cycle_extract, columns=['rng', 'mean','count','i_start','i_end'])
-                aux_df['Opt window'] = opt_period
-
-                # sort cycle counts into user inputed cycle life bins
-                # NOTE: digitized_cycles can be out of range here if cycle depth > 1
-                digitized_cycles = np.searchsorted(self.cycle_life['Power Fluctuation (%)'],[min(i[0] / eff_e_cap, 1) for i in cycle_extract], side='left')
-                aux_df['Input_cycle_Depth_mapping'] = np.array(self.cycle_life['Power Fluctuation (%)'][digitized_cycles]*eff_e_cap)
-                aux_df['Cycle Life Value (cycles)'] = np.array(self.cycle_life['Cycle Life Value (cycles)'][digitized_cycles] )
-
-                self.counted_cycles.append(aux_df.copy())
-                # sum up number of cycles for all cycle counts in each bin
-                cycle_sum = self.cycle_life.loc[:, :]
-                cycle_sum.loc[:, 'cycles'] = 0.0
-                for i in range(len(cycle_extract)):
-                    cycle_sum.loc[digitized_cycles[i], 'cycles'] += cycle_extract[i][2]
+                # count the cycles in this window (continuing any cycle left open by the windows before it),
+                # sorted into the user inputted cycle life bins
+                cycles = self.cycle_counter.count(energy_series.values, eff_e_cap, opt_period)
 
                 # sum across bins to get total degrade percent
                 # 1/cycle life value is degrade percent for each cycle
-                cycle_degrade = np.dot(1/cycle_sum['Cycle Life Value (cycles)'], cycle_sum.cycles)* (1 - self.eol_condition)
+                cycle_degrade = np.dot(1 / self.cycle_life['Cycle Life Value (cycles)'].values, cycles) * (1 - self.eol_condition)
 
             if start_dttm is not None and last_dttm is not None:
                 # add the yearly degradation linearly to the # of years from START_DTTM to (END_DTTM + dt)
@@ -374,8 +392,7 @@ class ElectrolyzerSystem(DER, ContinuousSizing, DERExtension):
     def get_charge(self, mask):
         """
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the charge as a function of time for the
 
@@ -440,7 +457,7 @@ class ElectrolyzerSystem(DER, ContinuousSizing, DERExtension):
         """ Generates the objective function related to a technology. Default includes O&M which can be 0
 
         Args:
-            mask (Series): Series of booleans used, the same length as case.power_kw
+            mask (OptimizationWindow): the timesteps of the optimization window
             annuity_scalar (float): a scalar value to be multiplied by any yearly cost or benefit that helps capture the cost/benefit over
                         the entire project lifetime (only to be set iff sizing)
 
@@ -471,8 +488,7 @@ class ElectrolyzerSystem(DER, ContinuousSizing, DERExtension):
         """Default build constraint list method. Used by services that do not have constraints.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns:
             A list of constraints that corresponds the EV requirement to collect the required energy to operate. It also allows
@@ -504,7 +520,7 @@ class ElectrolyzerSystem(DER, ContinuousSizing, DERExtension):
             # with a load timeseries input, the operation/power is fixed according to that timeseries
             # min_power is ignored
             TellUser.warning(f'For {self.unique_tech_id()}, since we are using a fixed schedule, we ignore the min_power parameter.')
-            electrolyzer_schedule = cvx.Parameter(shape=sum(mask), name=self.name + '-schedule', value=self.ts_hydrogen_schedule[mask].values)
+            electrolyzer_schedule = cvx.Parameter(shape=mask.size, name=self.name + '-schedule', value=mask.subset(self.ts_hydrogen_schedule).values)
             constraint_list += [cvx.Zero(electrolyzer_power - electrolyzer_schedule)]
         if self.hydrogen_schedule_mode == 2:
             # ensure hydrogen production (power * efficiency) meets or exceeds the quota
@@ -579,9 +595,10 @@ class ElectrolyzerSystem(DER, ContinuousSizing, DERExtension):
 
     def calc_variable_efficiency(self, fractional_power):
         """ Efficiency is determined from the input variable efficiency curve
-            Given a time series of fractional_power, we use the efficiency curve
-            to look up the index where that value occurs, and lookup the Efficiency value.
-            NOTE: values are not interpolated, but they could be using idx_hi
+            Given a time series of fractional_power, we look up where each value falls on
+            the efficiency curve (all at once with a binary search) and take the Efficiency
+            value of the curve point at or just below it. If variable_efficiency_interpolation
+            is set, the Efficiency is instead linearly interpolated between curve points.
 
         Args:
             fractional_power: a series of values between 0 and 1
@@ -590,24 +607,21 @@ class ElectrolyzerSystem(DER, ContinuousSizing, DERExtension):
             a series of Efficiency Actual (kg/kWh)
         """
         # first make sure that variable_efficiency_data is ordered by Fractional Power (low to hi)
-        self.variable_efficiency_data.sort_values('Fractional Power (%)', inplace=True)
-        self.variable_efficiency_data.reset_index(drop=True, inplace=True)
+        self.variable_efficiency_data = self.variable_efficiency_data.sort_values('Fractional Power (%)').reset_index(drop=True)
+        curve_power = self.variable_efficiency_data['Fractional Power (%)'].values
+        curve_efficiency = self.variable_efficiency_data['Efficiency (kg/kWh)'].values
+        if self.variable_efficiency_interpolation:
+            # values beyond either end of the curve take the value at that end
+            efficiency = np.interp(fractional_power.values, curve_power, curve_efficiency)
+        else:
+            # index of the last curve point that is less than or equal to each value
+            idx = np.searchsorted(curve_power, fractional_power.values, side='right') - 1
+            efficiency = curve_efficiency[np.clip(idx, 0, len(curve_power) - 1)]
         # create the output series
-        efficiency_actual = fractional_power.copy()
-        efficiency_actual.name = 'Efficiency Actual'
-        # FIXME: this is a slow way to do things
-        for j, i in enumerate(fractional_power):
-            idx = None
-            if self.variable_efficiency_data['Fractional Power (%)'].eq(i).sum() == 1:
-                idx = self.variable_efficiency_data['Fractional Power (%)'].eq(i).idxmax()
-            if idx is None:
-                idx_hi = self.variable_efficiency_data['Fractional Power (%)'].ge(i).idxmax()
-                idx_lo = max(idx_hi, 1) - 1
-                idx = idx_lo
-            if idx is None:
-                TellUser.error(f'Efficiency cannot be deternined from a fractional power of {i}')
-            efficiency_actual.iloc[j] = self.variable_efficiency_data.iloc[idx]['Efficiency (kg/kWh)']
-            #print(f'{i}, {idx}, {efficiency_actual}')
+        efficiency_actual = pd.Series(efficiency, index=fractional_power.index, name='Efficiency Actual')
+        if efficiency_actual.isna().any():
+            TellUser.error(f'Efficiency cannot be determined from some fractional power values: '
+                           f'{fractional_power[efficiency_actual.isna()].unique()}')
 
         return efficiency_actual
 
@@ -626,37 +640,29 @@ class ElectrolyzerSystem(DER, ContinuousSizing, DERExtension):
         pro_forma = super().proforma_report(apply_inflation_rate_func, fill_forward_func, results)
         if self.variables_df.index.empty:
             return pro_forma
-        optimization_years = self.variables_df.index.year.unique()
         tech_id = self.unique_tech_id()
-        om_costs = pd.DataFrame()
-        h2_value = pd.DataFrame()
-        cumulative_energy_dispatch_kw = pd.DataFrame()
         power = self.variables_df['electrolyzer_power']
         power_column_name = tech_id + ' Cumulative Energy Dispatch (kW)'
         variable_column_name = tech_id + ' Variable O&M Costs'
         h2_value_column_name = tech_id + ' Hydrogen Value'
         h2_production_column_name = tech_id + ' Hydrogen Production (kg)'
         #h2_production_actual_column_name = tech_id + ' Hydrogen Production Actual (kg)'
-        for year in optimization_years:
-            index_yr = pd.Period(year=year, freq='Y')
-            # add fixed o&m costs
-            om_costs.loc[index_yr, self.fixed_column_name()] = -self.fixed_om
-            # add variable_om costs
-            om_costs.loc[index_yr, variable_column_name] = -self.variable_om
-            power_sub = power.loc[power.index.year == year]
-            if self.variable_efficiency_data is not None:
-                # add variable power and variable efficiency value
-                #   and then sum that to get cumulative energy dispatch
-                efficiency_sub = self.variable_efficiency.loc[self.variable_efficiency.index.year == year]
-                cumulative_energy_dispatch_kw.loc[index_yr, power_column_name] = np.sum(power_sub * efficiency_sub)
-            else:
-                # sum variable power value to get cumulative energy dispatch,
-                #   and multiply by constant efficiency
-                cumulative_energy_dispatch_kw.loc[index_yr, power_column_name] = np.sum(power_sub) * self.efficiency
-            # hydrogen value = power (variable) * efficiency * unit_value
-            h2_value.loc[index_yr, h2_value_column_name] = self.h2_unit_value
-            # hydrogen production = power (variable) * efficiency
-            self.annual_hydrogen_production_kg.loc[index_yr, h2_production_column_name] = 1.0
+        if self.variable_efficiency_data is not None:
+            # add variable power and variable efficiency value
+            #   and then sum that to get cumulative energy dispatch
+            cumulative_energy_dispatch_kw = pd.DataFrame({power_column_name: Lib.yearly_sum(power * self.variable_efficiency)})
+        else:
+            # sum variable power value to get cumulative energy dispatch,
+            #   and multiply by constant efficiency
+            cumulative_energy_dispatch_kw = pd.DataFrame({power_column_name: Lib.yearly_sum(power) * self.efficiency})
+        years = cumulative_energy_dispatch_kw.index
+        # add fixed o&m costs and variable_om costs
+        om_costs = pd.DataFrame({self.fixed_column_name(): -self.fixed_om,
+                                 variable_column_name: -self.variable_om}, index=years)
+        # hydrogen value = power (variable) * efficiency * unit_value
+        h2_value = pd.DataFrame({h2_value_column_name: self.h2_unit_value}, index=years)
+        # hydrogen production = power (variable) * efficiency
+        self.annual_hydrogen_production_kg = pd.DataFrame({h2_production_column_name: 1.0}, index=years)
 
         # fill forward (escalate rates)
         om_costs = fill_forward_func(om_costs, None, is_om_cost=True)
@@ -780,8 +786,14 @@ class ElectrolyzerSystem(DER, ContinuousSizing, DERExtension):
 
         if self.incl_degradation:
             dct[f"{self.name.replace(' ', '_')}_degradation_data"] = self.degrade_data
-            total_counted_cycles = pd.concat(self.counted_cycles)
+            total_counted_cycles = self.cycle_counter.cycle_log()
+            bins = total_counted_cycles.pop('bin').values.astype(int)
+            total_counted_cycles['Input_cycle_Depth_mapping'] = \
+                self.cycle_life['Power Fluctuation (%)'].values[bins] * total_counted_cycles.pop('scale').values
+            total_counted_cycles['Cycle Life Value (cycles)'] = self.cycle_life['Cycle Life Value (cycles)'].values[bins]
             dct[f"{self.name.replace(' ', '_')}_cycle_counting"] = total_counted_cycles
+            if self.degradation_reconciliation is not None:
+                dct[f"{self.name.replace(' ', '_')}_degradation_reconciliation"] = self.degradation_reconciliation
 
         # FIXME: should this be in the incl_degradation loop?
         self.yearly_degradation_report.name = "Yearly Degradation"
@@ -84,14 +84,13 @@ class IntermittentResourceSizing(PVSystem.PV, DERExtension, ContinuousSizing):
     def get_discharge(self, mask):
         """ The effective discharge of this DER
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the discharge as a function of time for the
 
         """
         if self.being_sized():
-            return cvx.Parameter(shape=sum(mask), name=f'{self.name}/rated gen', value=self.gen_per_rated.loc[mask].values) * self.rated_capacity
+            return cvx.Parameter(shape=mask.size, name=f'{self.name}/rated gen', value=mask.subset(self.gen_per_rated).values) * self.rated_capacity
         else:
             return super().get_discharge(mask)
 
@@ -118,7 +117,7 @@ class IntermittentResourceSizing(PVSystem.PV, DERExtension, ContinuousSizing):
         """ Generates the objective function related to a technology. Default includes O&M which can be 0
 
         Args:
-            mask (Series): Series of booleans used, the same length as case.power_kw
+            mask (OptimizationWindow): the timesteps of the optimization window
             annuity_scalar (float): a scalar value to be multiplied by any yearly cost or benefit that helps capture the cost/benefit over
                     the entire project lifetime (only to be set iff sizing, else alpha should not affect the aobject function)
 
@@ -126,8 +126,7 @@ class ControllableLoad(Load, DERExtension, ContinuousSizing):
     def get_charge(self, mask):
         """
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the charge as a function of time for the
 
@@ -143,14 +142,13 @@ class ControllableLoad(Load, DERExtension, ContinuousSizing):
         this DER can schedule to reserve
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
         """
         if self.duration:
-            return np.repeat(self.rated_power, sum(mask)) + self.variables_dict['power']
+            return np.repeat(self.rated_power, mask.size) + self.variables_dict['power']
         else:
             return super().get_charge_up_schedule(mask)
 
@@ -159,14 +157,13 @@ class ControllableLoad(Load, DERExtension, ContinuousSizing):
         this DER can schedule to reserve
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
         """
         if self.duration:
-            return np.repeat(self.rated_power, sum(mask)) - self.variables_dict['power']
+            return np.repeat(self.rated_power, mask.size) - self.variables_dict['power']
         else:
             return super().get_charge_up_schedule(mask)
 
@@ -207,8 +204,7 @@ class ControllableLoad(Load, DERExtension, ContinuousSizing):
     def get_state_of_energy(self, mask):
         """
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the state of energy as a function of time for the
 
@@ -222,8 +218,7 @@ class ControllableLoad(Load, DERExtension, ContinuousSizing):
         """Default build constraint list method. Used by services that do not have constraints.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns:
             A list of constraints that corresponds the battery's physical constraints and its service constraints
@@ -244,9 +239,8 @@ class ControllableLoad(Load, DERExtension, ContinuousSizing):
             # uene accounts for change in energy due to participating in sub timestep scale markets
             constraint_list += [cvx.Zero(uene + (self.dt * udis) - (self.dt * uch))]
 
-            sub = mask.loc[mask]
-            for day in sub.index.dayofyear.unique():
-                day_mask = (day == sub.index.dayofyear)
+            for day in mask.index.dayofyear.unique():
+                day_mask = (day == mask.index.dayofyear)
                 # general:  e_{t+1} = e_t + (charge_t - discharge_t) * dt = e_t + power_t * dt
                 constraint_list += [cvx.Zero(energy[day_mask][:-1] + (power[day_mask][:-1] * self.dt) - energy[day_mask][1:])]
                 # start of first timestep of the day
@@ -91,13 +91,12 @@ class Load(DER):
     def get_charge(self, mask):
         """
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the charge as a function of time for the
 
         """
-        return cvx.Parameter(value=self.value[mask].values, shape=sum(mask), name='SiteLoad')
+        return cvx.Parameter(value=mask.subset(self.value).values, shape=mask.size, name='SiteLoad')
 
     def effective_load(self):
         """ Returns the load that is seen by the microgrid or point of interconnection
@@ -34,6 +34,7 @@ MicrogridPOI.py
 
 import pandas as pd
 from storagevet.POI import POI
+from storagevet.OptimizationWindow import OptimizationWindow
 import cvxpy as cvx
 from storagevet.ErrorHandling import *
 import numpy as np
@@ -170,9 +171,7 @@ class MicrogridPOI(POI):
         technologies added by DERVET, and thermal recovery
 
         Args:
-            mask (DataFrame): DataFrame of booleans used, the same length as time_series. The value
-             is true if the corresponding column in time_series is included in the data to be
-             optimized.
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns:
             aggregation of loads
@@ -188,6 +187,7 @@ class MicrogridPOI(POI):
             aggregation of hotwater thermal heating power (heat recovered)
             aggregation of thermal cooling power (cold recovered)
         """
+        mask = OptimizationWindow.create(mask)
         # get values from storagevet/poi method
         load_sum, var_gen_sum, gen_sum, tot_net_ess, der_dispatch_net_power, \
             total_soe, agg_power_flows_in, agg_power_flows_out, \
@@ -253,8 +253,7 @@ class MicrogridPOI(POI):
         constraints for dervet
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to
-                time_series data included in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
             power_in (cvx.Expression):
             power_out (cvx.Expression):
             steam_in (cvx.Expression):
@@ -270,11 +269,12 @@ class MicrogridPOI(POI):
             A list of constraints being set by the POI: power reservations, control constraints
                 requirements, max import, max export, etc.
         """
+        mask = OptimizationWindow.create(mask)
         obj_expression, constraint_list = super().optimization_problem(mask, power_in, power_out,
                                                                        steam_in, hotwater_in,
                                                                        cold_in, annuity_scalar)
 
-        agg_heat_consumed_by_chillers = cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name='HeatUsedByChillersZero')
+        agg_heat_consumed_by_chillers = cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name='HeatUsedByChillersZero')
 
         # print parameters for each DER
         for der_instance in self.active_ders:
@@ -292,7 +292,7 @@ class MicrogridPOI(POI):
                 agg_heat_consumed_by_chillers += der_instance.get_heat_consumed(mask)
 
         ##NOTE: these print statements disclose info for these function arguments
-        #print('\nopt_size: ', sum(mask))
+        #print('\nopt_size: ', mask.size)
         #print(f'power_in:\n  {power_in.size}\n  {power_in.name()}\n  {power_in.value}')
         #print(f'power_out:\n  {power_out.size}\n  {power_out.name()}\n  {power_out.value}')
         #print(f'steam_in:\n  {steam_in.size}\n  {steam_in.name()}\n  {steam_in.value}')
@@ -304,11 +304,11 @@ class MicrogridPOI(POI):
         if self.site_steam_load is not None:
             if steam_in.variables():
                 TellUser.debug('adding steam thermal power balance constraint')
-                constraint_list += [cvx.NonPos(-1 * steam_in + self.site_steam_load[mask])]
+                constraint_list += [cvx.NonPos(-1 * steam_in + mask.subset(self.site_steam_load))]
         if self.site_hotwater_load is not None:
             if hotwater_in.variables():
                 TellUser.debug('adding hot water thermal power balance constraint')
-                constraint_list += [cvx.NonPos(-1 * hotwater_in + agg_heat_consumed_by_chillers + self.site_hotwater_load[mask])]
+                constraint_list += [cvx.NonPos(-1 * hotwater_in + agg_heat_consumed_by_chillers + mask.subset(self.site_hotwater_load))]
                 # NOTE:
                 # if a chiller is powered by heat, it will consume heat in the form of hotwater.
                 # this additional hot water must be generated by a technology that can produce heat (Boiler, CHP)
@@ -318,7 +318,7 @@ class MicrogridPOI(POI):
         if self.site_cooling_load is not None:
             if cold_in.variables():
                 TellUser.debug('adding thermal cooling power balance constraint')
-                constraint_list += [cvx.NonPos(-1 * cold_in + self.site_cooling_load[mask])]
+                constraint_list += [cvx.NonPos(-1 * cold_in + mask.subset(self.site_cooling_load))]
 
         return obj_expression, constraint_list
 
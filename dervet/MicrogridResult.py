@@ -53,6 +53,9 @@ class MicrogridResult(Result):
         self.reliability_sizing = scenario.reliability_sizing
         self.opt_engine = scenario.opt_engine
         self.sizing_df = pd.DataFrame()
+        self.representative_periods_error = None
+        if scenario.representative_sizing is not None:
+            self.representative_periods_error = scenario.representative_sizing.error
         for der in self.poi.der_list:
             if der.tag in ['Battery', 'ElectrolyzerSystem']:
                 # if degradation module is turned on, then reset all CBA attributes to reflect yearly cycle counts
@@ -109,6 +112,8 @@ class MicrogridResult(Result):
         else:
             savepath = self.dir_abs_path
         self.sizing_df.to_csv(path_or_buf=Path(savepath, 'size' + self.csv_label + '.csv'), index=False)
+        if self.representative_periods_error is not None:
+            self.representative_periods_error.to_csv(path_or_buf=Path(savepath, 'representative_periods' + self.csv_label + '.csv'))
         self.cost_benefit_analysis.equipment_lifetime_report.to_csv(path_or_buf=Path(savepath, 'equipment_lifetimes' + self.csv_label + '.csv'))
         if self.cost_benefit_analysis.tax_calculations is not None:
             # NOTE: we limit the dollar amount results here to 2 decimal places
@@ -63,6 +63,8 @@ from storagevet.Scenario import Scenario
 from dervet.CBA import CostBenefitAnalysis
 from dervet.MicrogridPOI import MicrogridPOI
 from dervet.MicrogridServiceAggregator import MicrogridServiceAggregator
+from dervet.RepresentativePeriods import RepresentativePeriods
+from storagevet.OptimizationWindow import OptimizationWindow
 from storagevet.ErrorHandling import *
 import numpy as np
 
@@ -89,6 +91,8 @@ class MicrogridScenario(Scenario):
         'ElectricVehicle2': ElectricVehicle2,
         'ElectrolyzerSystem': ElectrolyzerSystem,
     }
+    # key of the optimization window made of the representative periods (see size_on_representative_periods)
+    REPRESENTATIVE_WINDOW = 'representative periods'
     VS_CLASS_MAP = {  # value stream
         'Deferral': Deferral,
         'DR': DemandResponse,
@@ -131,6 +135,11 @@ class MicrogridScenario(Scenario):
         # flags to indicate which module dervet should go to
         self.deferral_sizing = False
         self.reliability_sizing = False
+        # size DERs on a few representative periods of the year, instead of the whole year
+        self.representative_periods = int(input_tree.Scenario.get('representative_periods') or 0)
+        self.representative_period_length = input_tree.Scenario.get('representative_period_length') or 'day'
+        self.time_series = input_tree.Scenario['time_series'] if self.representative_periods else None
+        self.representative_sizing = None  # the RepresentativePeriods the DERs were sized on
         TellUser.debug("ScenarioSizing initialized ...")
 
     def set_up_poi_and_service_aggregator(self, point_of_interconnection_class=MicrogridPOI,
@@ -216,7 +225,8 @@ class MicrogridScenario(Scenario):
                 self.check_opt_sizing_conditions()
 
         if self.reliability_sizing:
-            der_list = vs_dct['Reliability'].sizing_module(der_lst, self.optimization_levels.index, verbose_opt=self.verbose_opt)
+            der_list = vs_dct['Reliability'].sizing_module(der_lst, self.optimization_levels.index, verbose_opt=self.verbose_opt,
+                                                           solver_strategy=self.solver_strategy)
             if der_list is None:
                 TellUser.error(f'Sizing for Reliability is infeasible given the inputs and constraints. Please adjust the parameters and try again.')
                 TellUser.close_log()
@@ -253,8 +263,15 @@ class MicrogridScenario(Scenario):
                                 'off optimal sizing or using energy prices that are non-negative.')
         except KeyError:
             pass
-        # make sure the optimization horizon is the whole year
-        if self.n != 'year':
+        # make sure the optimization horizon is the whole year (unless sizing on representative periods)
+        if self.representative_periods:
+            unsupported = [name for name in self.service_agg.value_streams if name not in RepresentativePeriods.SERVICES]
+            if len(unsupported):
+                TellUser.error(f'Trying to size on representative periods with {", ".join(unsupported)}, which '
+                               f'depend on more than the representative periods. Only {", ".join(RepresentativePeriods.SERVICES)} '
+                               f'can be active.')
+                error = True
+        elif self.n != 'year':
             TellUser.error('Trying to size without setting the optimization window to \'year\'')
             error = True
         # any wholesale markets active?
@@ -353,7 +370,15 @@ class MicrogridScenario(Scenario):
             return
 
         TellUser.info("Starting optimization loop")
-        for opt_period in self.optimization_levels.predictive.unique():
+        self.resume_from_checkpoint()
+        window_kwargs = dict(annuity_scalar=alpha, ignore_der_costs=self.service_agg.post_facto_reliability_only(),
+                             force_glpk_mi=self.poi.has_thermal_load)
+        if self.poi.is_sizing_optimization and self.representative_periods and not self.deferral_sizing:
+            self.size_on_representative_periods(alpha)
+        if self.solve_windows_with_predicted_degradation(**window_kwargs) or \
+                self.solve_windows_in_parallel(**window_kwargs) or self.solve_windows_in_batches(**window_kwargs):
+            return
+        for opt_period in self.windows_to_solve():
 
             # setup + run optimization then return optimal objective costs
             functions, constraints, sub_index = self.set_up_optimization(opt_period,
@@ -378,8 +403,47 @@ class MicrogridScenario(Scenario):
                         #print(f'{k}: is_dpp? {v.is_dcp(dpp=True)} : {v}')
                 print()
 
-            cvx_problem, obj_expressions, cvx_error_msg = self.solve_optimization(functions, constraints, force_glpk_mi=self.poi.has_thermal_load)
+            cvx_problem, obj_expressions, cvx_error_msg = self.solve_optimization(functions, constraints, force_glpk_mi=self.poi.has_thermal_load,
+                                                                                  template_key=self.problem_template_key(sub_index),
+                                                                                  opt_window_num=opt_period)
             self.save_optimization_results(opt_period, sub_index, cvx_problem, obj_expressions, cvx_error_msg)
+            self.checkpoint_progress(opt_period)
+
+    def size_on_representative_periods(self, annuity_scalar=1):
+        """ Sizes the DERs on the representative periods of the first analysis year (with the operating
+        costs of each period weighted by the number of periods it stands for). The whole year is clustered,
+        whatever the optimization window length (n) is. Afterwards the DERs have fixed sizes, so every
+        optimization window is a regular dispatch problem at full resolution.
+
+        Args:
+            annuity_scalar (float): a scalar value to be multiplied by any yearly cost or benefit that helps capture
+                the cost/benefit over the entire project lifetime
+
+        """
+        levels_index = self.optimization_levels.index
+        window_index = levels_index[levels_index.year == levels_index.year[0]]
+        periods = RepresentativePeriods(self.time_series, window_index, self.dt, self.representative_periods,
+                                        self.representative_period_length)
+        TellUser.info(periods.summary())
+        TellUser.info(f"Representative periods clustering error:\n{periods.error.to_string()}")
+
+        self.optimization_windows[self.REPRESENTATIVE_WINDOW] = \
+            OptimizationWindow.from_index(self.optimization_levels.index, window_index[periods.positions])
+        functions, constraints, _ = self.set_up_optimization(self.REPRESENTATIVE_WINDOW, annuity_scalar=annuity_scalar)
+        del self.optimization_windows[self.REPRESENTATIVE_WINDOW]
+        self.optimization_profile.windows.pop(self.REPRESENTATIVE_WINDOW, None)
+        functions = {name: periods.weigh(function) for name, function in functions.items()}
+        constraints += periods.storage_constraints(self.poi.active_ders)
+        prob, _, cvx_error_msg = self.solve_optimization(functions, constraints, force_glpk_mi=self.poi.has_thermal_load)
+        if prob.status not in ['optimal', 'optimal_inaccurate']:
+            TellUser.error(cvx_error_msg)
+            TellUser.close_log()
+            raise SolverError(f'Sizing on representative periods was {prob.status}. No solution found. '
+                              f'Look in *.log for for information')
+        for der in self.poi.active_ders:
+            der.set_size()
+        self.poi.is_sizing_optimization = False
+        self.representative_sizing = periods
 
     def set_up_optimization(self, opt_window_num, annuity_scalar=1, ignore_der_costs=False):
         """ Sets up and runs optimization on a subset of time in a year. Called within a loop.
@@ -398,8 +462,7 @@ class MicrogridScenario(Scenario):
 
         """
         # used to select rows from time_series relevant to this optimization window
-        mask = self.optimization_levels.predictive == opt_window_num
-        sub_index = self.optimization_levels.loc[mask].index
+        sub_index = self.optimization_window(opt_window_num).index
         # drop any ders that are not operational
         self.poi.grab_active_ders(sub_index)
         # print(self.poi.active_ders)
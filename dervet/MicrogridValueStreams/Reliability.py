@@ -76,13 +76,15 @@ This Python class contains methods and attributes specific for service analysis
 """
 
 from storagevet.SystemRequirement import Requirement
+from storagevet.OptimizationWindow import OptimizationWindow
+from storagevet.SolverStrategy import SolverStrategy
 import storagevet.Library as Lib
 from storagevet.ValueStreams.ValueStream import ValueStream
 import numpy as np
 import cvxpy as cvx
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 import time
-import random
 from storagevet.ErrorHandling import *
 import copy
 
@@ -148,12 +150,13 @@ class Reliability(ValueStream):
         self.critical_load = Lib.fill_extra_data(self.critical_load, years, load_growth, frequency)
         self.critical_load = Lib.drop_extra_data(self.critical_load, years)
 
-    def sizing_module(self, der_lst, opt_index, verbose_opt=False):
+    def sizing_module(self, der_lst, opt_index, verbose_opt=False, solver_strategy=None):
         """ sizing module
 
         Args:
             der_lst: list of ders, where some ders need to be sized
             opt_index: pandas index of the full analysis horizon
+            solver_strategy (SolverStrategy): the solvers to try (defaults are used if None)
 
         Returns: list of ders with size solved for the objective of reliability
 
@@ -164,6 +167,7 @@ class Reliability(ValueStream):
         diurnal_period_hours = 72
         data_size = len(opt_index)
         first_fail_ind = 0
+        previous_der_mix = None
         diurnal_period_coverage = int(diurnal_period_hours / self.dt)
 
         # Sort the outages by max demand that is unserved
@@ -204,7 +208,8 @@ class Reliability(ValueStream):
         while first_fail_ind >= 0:
             if first_fail_ind != 0:
                 TellUser.debug(f"Sizing for Outages (again) - with an additional first failure index: {first_fail_ind}")
-            der_list = self.size_for_outages(opt_index, analysis_indices, der_list, verbose_opt=verbose_opt)
+            der_list = self.size_for_outages(opt_index, analysis_indices, der_list, verbose_opt=verbose_opt,
+                                             solver_strategy=solver_strategy)
 
             # Fix the size of Intermittent and Generator DERs after first optimization run.
             #   ES size will be iterated to meet the outage requirement
@@ -223,20 +228,16 @@ class Reliability(ValueStream):
                 der_props = None
             else:
                 soe = np.repeat(self.soc_init, data_size) * der_props['energy rating']
+            # outages that started before the last failure were covered by the previous DER mix,
+            # so they are still covered if this DER mix is at least as capable
+            der_mix = (dg_gen, total_pv_max, total_pv_vari, largest_gamma, der_props, soe)
             start = 0
-            first_fail_ind = 0
-            # note: if this is too large, then you will get a RecursionError
-            check_at_a_time = 500
-            while start == first_fail_ind:
-                first_fail_ind = self.find_first_uncovered(dg_gen,
-                                                           total_pv_max,
-                                                           total_pv_vari,
-                                                           largest_gamma,
-                                                           der_props, soe,
-                                                           start,
-                                                           check_at_a_time)
-                start += check_at_a_time
-                #print(start, first_fail_ind, '---\n')
+            if previous_der_mix is not None and self.covers_at_least_as_much(der_mix, previous_der_mix):
+                start = first_fail_ind
+            TellUser.debug(f"Reliability Sizing: checking outage coverage from index {start}")
+            first_fail_ind = self.find_first_uncovered(dg_gen, total_pv_max, total_pv_vari,
+                                                       largest_gamma, der_props, soe, start)
+            previous_der_mix = der_mix
 
             # if this is a non-unique index, break out of the method with an error
             #   (this avoids an infinite repeating loop)
@@ -288,7 +289,7 @@ class Reliability(ValueStream):
 
         return der_list
 
-    def size_for_outages(self, opt_index, outage_start_indices, der_list, verbose_opt=False):
+    def size_for_outages(self, opt_index, outage_start_indices, der_list, verbose_opt=False, solver_strategy=None):
         """ Sets up sizing optimization.
 
         Args:
@@ -296,6 +297,7 @@ class Reliability(ValueStream):
                 data being passed around
             der_list (list): list of initialized DERs from the POI class
             outage_start_indices
+            solver_strategy (SolverStrategy): the solvers to try (defaults are used if None)
 
         Returns: modified DER list
 
@@ -305,11 +307,8 @@ class Reliability(ValueStream):
         cost_funcs = sum([der_instance.get_capex() for der_instance in der_list])
         outage_length = int(self.coverage_dt)
 
-        # start with a boolean Series that is always False
-        mask = ~pd.Series(index=opt_index).astype(bool)
         for outage_ind in outage_start_indices:
-            mask.iloc[:] = False
-            mask.iloc[outage_ind: (outage_ind + outage_length)] = True
+            mask = OptimizationWindow(opt_index, slice(outage_ind, outage_ind + outage_length))
             # set up variables
             gen_sum = cvx.Parameter(value=np.zeros(outage_length),
                                     shape=outage_length, name='POI-Zero')
@@ -329,7 +328,7 @@ class Reliability(ValueStream):
                 if der_instance.technology_type == 'Intermittent Resource':
                     gen_sum += der_instance.get_discharge(mask) * \
                                der_instance.nu
-            critical_load = self.critical_load.loc[mask].values
+            critical_load = mask.subset(self.critical_load).values
             if self.load_shed:
                 critical_load = critical_load * (self.load_shed_data[0:outage_length].values / 100)
 
@@ -353,35 +352,22 @@ class Reliability(ValueStream):
         obj = cvx.Minimize(cost_funcs)
         prob = cvx.Problem(obj, consts)
         TellUser.info(f'Optimizing...  total constraints: {len(consts)}')
-        # order the solver_sequence list appropriately
-        solver_dict = {'GLPK_MI': cvx.GLPK_MI, 'ECOS_BB': cvx.ECOS_BB}
-        solver_list = ['GLPK_MI', 'ECOS_BB']
-        solver_sequence = solver_list.copy()
         #try:
         #    print(f'  cost_func: {cost_funcs.name()}')
         #except AttributeError:
         #    print(f'  cost_func: {cost_funcs}')
 
-        # try to solve using the first solver from solver_list
+        # try to solve using the first solver from the solver strategy
         #   if that fails, then move to the next solver, etc.
-        # TODO: if a third solver is added to the list, then this section of code will require a loop
+        if solver_strategy is None:
+            solver_strategy = SolverStrategy()
         try:
-            solver_name = solver_sequence.pop(0)
-            TellUser.debug(f"Using {solver_name} solver")
-            prob.solve(solver=solver_dict[solver_name], ignore_dpp=True, verbose=verbose_opt)
-        except (cvx.error.SolverError, RuntimeError) as e:
-            # if that solver fails, then try the other solver
-            try:
-                TellUser.debug(f"{e}")
-                TellUser.debug("The solver was unable to find a solution... let's try another solver.")
-                solver_name = solver_sequence.pop(0)
-                TellUser.debug(f"Using {solver_name} solver")
-                prob.solve(solver=solver_dict[solver_name], ignore_dpp=True, verbose=verbose_opt)
-            except Exception as e:
-                # record any error in the log file
-                TellUser.error(f'An error occurred in cvxpy while trying to solve an optimization problem:\n  {e}')
-                if 'DCP' in str(e):
-                    TellUser.error('Try turning the binary parameter off.')
+            solver_strategy.solve(prob, verbose=verbose_opt, ignore_dpp=True)
+        except Exception as e:
+            # record any error in the log file
+            TellUser.error(f'An error occurred in cvxpy while trying to solve an optimization problem:\n  {e}')
+            if 'DCP' in str(e):
+                TellUser.error('Try turning the binary parameter off.')
 
         # check here for non-optimal solution, and raise exception if so
         if prob.status != 'optimal':
@@ -509,9 +495,11 @@ class Reliability(ValueStream):
 
     def find_first_uncovered(self, generation, total_pv_max, total_pv_vari,
                              largest_gamma, ess_properties=None, soe=None,
-                             start_indx=0, stop_at=600):
+                             start_indx=0, batch_size=None):
         """ THis function will return the first outage that is not covered with
-         the given DERs
+         the given DERs. Outages are simulated a batch of start indices at a
+         time, so that the search can end early without simulating every
+         outage in the year.
 
         Args:
             generation:
@@ -524,52 +512,71 @@ class Reliability(ValueStream):
             soe (list, None): if ESSs are active, then this is an array
                 indicating the soe at the start of the outage
             start_indx (int): start index, idetifies the index of the start of
-                the outage we are going to simulate
-            stop_at (int): when the start_index is divisible by this number,
-                stop recursion
+                the first outage we are going to simulate (outages that start
+                before this index are assumed to be covered)
+            batch_size (int): number of outages to simulate at a time
+                (default is a week of start indices)
 
         Returns: index of the first outage that cannot be covered by the DER
             sizes, or -1 if none is found
 
         """
-        # base case 1: outage_init is beyond range of critical load
-        if start_indx >= (len(self.critical_load)):
-            #print(f'  (bc 1) {start_indx} returning: -1')
-            return -1
-        # find longest possible outage
-
+        data_length = len(self.critical_load)
+        if batch_size is None:
+            batch_size = int(7 * 24 / self.dt)
+        if soe is None:
+            soe = np.zeros(data_length)
         demand_left, reliability_check, energy_requirement_check = \
-            self.data_process(start_indx, generation, total_pv_max,
-                              ess_properties, total_pv_vari,
-                              largest_gamma)
-        ess_properties['init_soe'] = soe[start_indx]
-        soe_profile = self.simulate_outage(reliability_check, demand_left,
-                                           energy_requirement_check,
-                                           self.max_outage_duration / self.dt,
-                                           **ess_properties)
-
-        # longest_outage is the largest outage that can be covered
-        longest_outage = len(soe_profile)
-        # base case 2: longest outage is less than the outage duration target
-        if longest_outage < self.coverage_dt:
-            if longest_outage == 0:
-                # note: skip over when soe_profile is empty
-                #print(f'  (skip--bc 2) {start_indx} soe_profile is empty')
-                pass
-            elif longest_outage < (len(self.critical_load) - start_indx):
-                #print(f'  (bc 2) longest possible outage ({longest_outage}) does not provide the necessary coverage ({self.coverage_dt})... returning: {start_indx}')
-                return start_indx
-        # base case 3: break recursion when you get to this (like a limit to
-        # the resursion)
-        if (start_indx + 1) % stop_at == 0:
-            #print(f'  (bc 3) {start_indx} recursion-break, returning: {start_indx + 1}')
-            return start_indx + 1
-        # else, go on to test the next outage_init (increase index returned
-        return self.find_first_uncovered(generation, total_pv_max,
-                                         total_pv_vari, largest_gamma,
-                                         ess_properties=ess_properties,
-                                         soe=soe, start_indx=start_indx + 1,
-                                         stop_at=stop_at)
+            self.data_process_all(generation, total_pv_max, total_pv_vari,
+                                  largest_gamma)
+        for batch_start in range(max(start_indx, 0), data_length, batch_size):
+            batch = slice(batch_start, min(batch_start + batch_size, data_length))
+            # find longest possible outages
+            _, longest_outage = self.simulate_outages(reliability_check[batch],
+                                                      demand_left[batch],
+                                                      energy_requirement_check[batch],
+                                                      self.max_outage_duration / self.dt,
+                                                      soe[batch], ess_properties)
+            outages_left_in_data = data_length - np.arange(batch.start, batch.stop)
+            # an outage is uncovered if the longest outage is less than the outage duration
+            # target (skip over when the outage is not covered at all, or if the data ran out)
+            uncovered = (longest_outage < self.coverage_dt) & (longest_outage != 0) & \
+                        (longest_outage < outages_left_in_data)
+            if uncovered.any():
+                return batch.start + int(np.argmax(uncovered))
+        return -1
+
+    @staticmethod
+    def covers_at_least_as_much(der_mix, other_der_mix):
+        """ Checks if a DER mix can cover any outage that another DER mix
+        can, i.e. it has at least as much generation and storage capability
+
+        Args:
+            der_mix (tuple): generation, total_pv_max, total_pv_vari,
+                largest_gamma, ess_properties, and soe of the DER mix
+            other_der_mix (tuple): the same properties for the DER mix to
+                compare against
+
+        Returns (bool): True if DER_MIX is at least as capable as OTHER_DER_MIX
+
+        """
+        generation, pv_max, pv_vari, gamma, ess_props, soe = der_mix
+        other_generation, other_pv_max, other_pv_vari, other_gamma, other_ess_props, other_soe = \
+            other_der_mix
+        if not (np.all(generation >= other_generation) and np.all(pv_max >= other_pv_max)
+                and np.all(pv_vari >= other_pv_vari) and gamma <= other_gamma
+                and np.all(soe >= other_soe)):
+            return False
+        if other_ess_props is None:
+            return True
+        if ess_props is None or ess_props['rte list'] != other_ess_props['rte list']:
+            return False
+        return (ess_props['charge max'] >= other_ess_props['charge max']
+                and ess_props['discharge max'] >= other_ess_props['discharge max']
+                and np.all(ess_props['operation SOE max'] - soe >=
+                           other_ess_props['operation SOE max'] - other_soe)
+                and np.all(soe - ess_props['operation SOE min'] >=
+                           other_soe - other_ess_props['operation SOE min']))
 
     def data_process(self, ts_index, generation, total_pv_max,
                      ess_properties, total_pv_vari, largest_gamma):
@@ -613,6 +620,42 @@ class Reliability(ValueStream):
 
         return demand_left, reliability_check, energy_requirement_check
 
+    def data_process_all(self, generation, total_pv_max, total_pv_vari,
+                         largest_gamma):
+        """ Batched version of data_process: builds the arrays for outages
+        that start at every timestep at once. Row i holds what data_process
+        would return for ts_index=i; rows of outages that start near the end
+        of the data are padded with NaN once the data runs out.
+
+        Args:
+            generation:
+            total_pv_max:
+            total_pv_vari:
+            largest_gamma:
+
+        Returns: demand_left, reliability_check, energy_requirement_check, each
+            a (len(critical_load) x max_outage_duration) array
+
+        """
+        window = int(self.max_outage_duration)
+
+        def outage_windows(array):
+            padded = np.concatenate([np.asarray(array, dtype=float),
+                                     np.full(window - 1, np.nan)])
+            return sliding_window_view(padded, window)
+
+        critical_load = outage_windows(self.critical_load.values)
+        if self.load_shed:
+            critical_load = critical_load * \
+                (np.asarray(self.load_shed_data, dtype=float)[:window] / 100)
+        gen_windows = outage_windows(generation)
+        demand_left = np.around(critical_load - gen_windows -
+                                outage_windows(total_pv_max), decimals=5)
+        reliability_check = np.around(critical_load - gen_windows -
+                                      outage_windows(total_pv_vari), decimals=5)
+        energy_requirement_check = reliability_check * largest_gamma
+        return demand_left, reliability_check, energy_requirement_check
+
     def simulate_outage(self, reliability_check, demand_left, energy_check,
                         outage_left, **kwargs):
         """ Simulate an outage that starts with lasting only 1 hour and will
@@ -644,57 +687,100 @@ class Reliability(ValueStream):
         """
         # select init_soe if included, else use user defined soc
         init_soe = kwargs.get('init_soe', self.soc_init*kwargs.get('energy rating', 0))
-        # base case: when to terminate recursion
-        if outage_left == 0 or not len(reliability_check):
-            return []
-        current_reliability_check = self.get_first_data(reliability_check)
-        current_demand_left = self.get_first_data(demand_left)
-        current_energy_check = self.get_first_data(energy_check)
-        if 0 >= current_reliability_check:
-            # check to see if there is space to storage energy in the ESS to
-            # save extra generation
-            physical_energy_max = kwargs.get('operation SOE max', 0)
-            if physical_energy_max >= init_soe:
-                # the amount we can charge based on its current SOC
-                random_rte = random.choice(kwargs.get('rte list', []))
-                charge_possible = (physical_energy_max - init_soe) / (random_rte * self.dt)
-                charge = min(charge_possible, -current_demand_left, kwargs.get('charge max', 0))
-                # update the state of charge of the ESS
-                next_soe = init_soe + (charge * random_rte * self.dt)
-            else:
-                # there is no space to save the extra generation, so the ess
-                # will not do anything
-                next_soe = init_soe
-        # can reliably meet the outage in that timestep: jump to SIMULATE
-        # OUTAGE IN NEXT TIMESTEP
-        else:
-            # check that there is enough SOC in the ESS to satisfy worst case
-            energy_min = kwargs.get('operation SOE min')
-            if energy_min is not None:
-                if 0 >= np.around(current_energy_check * self.dt - init_soe, decimals=2):
-                    # so discharge to meet the load offset by all generation
-                    discharge_possible = (init_soe - energy_min) / self.dt
-                    discharge = min(discharge_possible, current_demand_left,
-                                    kwargs.get('discharge max', 0))
-                    if 0 < np.around(current_demand_left - discharge, decimals=2):
-                        # can't discharge enough to meet demand
-                        return []
-                    # update the state of charge of the ESS
-                    next_soe = init_soe - (discharge * self.dt)
-                    # we can reliably meet the outage in that timestep: jump to
-                    # SIMULATE OUTAGE IN NEXT TIMESTEP
+        soe_profiles, coverage = self.simulate_outages(
+            np.asarray(reliability_check, dtype=float).reshape(1, -1),
+            np.asarray(demand_left, dtype=float).reshape(1, -1),
+            np.asarray(energy_check, dtype=float).reshape(1, -1),
+            outage_left, init_soe, kwargs)
+        return list(soe_profiles[0, :coverage[0]])
+
+    def simulate_outages(self, reliability_check, demand_left, energy_check,
+                         outage_len, init_soe, ess_properties=None):
+        """ Simulates many outages at once (one per row of the array
+        arguments), stepping through time instead of recursing. Each outage
+        follows the same rules as simulate_outage and stops at its first
+        timestep that cannot be covered, or when its data runs out (NaN).
+        When there is more than one round trip efficiency, the one used by
+        each outage at each timestep it charges is drawn with numpy's global
+        random state (seed it with np.random.seed for repeatable results).
+
+        Args:
+            reliability_check (np.ndarray): (outages x timesteps) the amount of
+                load minus fuel generation and a percentage of PV generation
+            demand_left (np.ndarray): (outages x timesteps) the amount of load
+                minus fuel generation and all of PV generation
+            energy_check (np.ndarray): (outages x timesteps)
+            outage_len (int): the length of the outages to be simulated
+            init_soe (float, np.ndarray): the SOE of the ESS at the start of
+                each outage
+            ess_properties (dict, None): dictionary that describes the physical
+                properties of the ess in the analysis (see simulate_outage)
+
+        Returns: a (outages x outage_len) array of the SOE at the end of each
+            timestep that was covered (0 after the outage could no longer be
+            covered), and an array of the number of timesteps covered by each
+            outage
+
+        """
+        props = ess_properties or {}
+        num_outages, data_len = reliability_check.shape
+        outage_len = int(np.ceil(outage_len))
+        soe = np.broadcast_to(np.asarray(init_soe, dtype=float), num_outages).copy()
+        soe_profiles = np.zeros((num_outages, max(outage_len, 0)))
+        coverage = np.zeros(num_outages, dtype=int)
+        covered = np.ones(num_outages, dtype=bool)
+
+        physical_energy_max = props.get('operation SOE max', 0)
+        energy_min = props.get('operation SOE min')
+        rte_list = props.get('rte list', [])
+        with np.errstate(invalid='ignore'):
+            for step in range(min(outage_len, data_len)):
+                current_reliability_check = reliability_check[:, step]
+                current_demand_left = demand_left[:, step]
+                current_energy_check = energy_check[:, step]
+                covered &= ~np.isnan(current_reliability_check)
+                if not covered.any():
+                    break
+                next_soe = soe.copy()
+                extra_generation = 0 >= current_reliability_check
+
+                # check to see if there is space to storage energy in the ESS to
+                # save extra generation (otherwise the ESS will not do anything)
+                can_charge = extra_generation & (physical_energy_max >= soe)
+                if can_charge.any() and len(rte_list):
+                    if len(rte_list) == 1:
+                        random_rte = rte_list[0]
+                    else:
+                        random_rte = np.random.choice(rte_list, size=num_outages)
+                    charge_possible = (physical_energy_max - soe) / (random_rte * self.dt)
+                    charge = np.minimum(np.minimum(charge_possible, -current_demand_left),
+                                        props.get('charge max', 0))
+                    next_soe = np.where(can_charge, soe + (charge * random_rte * self.dt),
+                                        next_soe)
+
+                # check that there is enough SOC in the ESS to satisfy worst case
+                needs_energy = ~extra_generation
+                if energy_min is None:
+                    # there is no more that can be discharged to meet the load requirement
+                    failed = needs_energy
                 else:
-                    # there is not enough energy in the ESS to cover the load
-                    # reliability
-                    return []
-            else:
-                # there is no more that can be discharged to meet the load
-                # requirement
-                return []
-        # SIMULATE OUTAGE IN NEXT TIMESTEP
-        kwargs['init_soe'] = next_soe
-        return [next_soe] + self.simulate_outage(reliability_check[1:], demand_left[1:],
-                                                 energy_check[1:], outage_left - 1, **kwargs)
+                    enough_energy = 0 >= np.around(current_energy_check * self.dt - soe,
+                                                   decimals=2)
+                    # so discharge to meet the load offset by all generation
+                    discharge_possible = (soe - energy_min) / self.dt
+                    discharge = np.minimum(np.minimum(discharge_possible, current_demand_left),
+                                           props.get('discharge max', 0))
+                    # can't discharge enough to meet demand
+                    not_enough_power = 0 < np.around(current_demand_left - discharge,
+                                                     decimals=2)
+                    failed = needs_energy & (~enough_energy | not_enough_power)
+                    next_soe = np.where(needs_energy, soe - (discharge * self.dt), next_soe)
+
+                covered &= ~failed
+                soe = np.where(covered, next_soe, soe)
+                soe_profiles[covered, step] = soe[covered]
+                coverage += covered
+        return soe_profiles, coverage
 
     def min_soe_opt(self, opt_index, der_list):
         """ Calculates min SOE at every time step for the given DER size
@@ -720,14 +806,12 @@ class Reliability(ValueStream):
             min_soc = {}
             #ana_ind = [a for a in range(data_length) if outage_mask[a] is True]
             ana_ind = [i for i, k in enumerate(outage_mask) if k]
-            outage_mask = pd.Series(index=opt_index)
             print(ana_ind)
             for outage_ind in ana_ind:
                 outage_end_ind = outage_ind + self.outage_duration
                 if outage_end_ind > data_length:
                     continue
-                outage_mask.iloc[:] = False
-                outage_mask.iloc[outage_ind:outage_end_ind] = True
+                outage_mask = OptimizationWindow(opt_index, slice(outage_ind, outage_end_ind))
                 # set up variables
                 var_gen_sum = cvx.Parameter(
                     value=np.zeros(self.outage_duration),
@@ -775,14 +859,14 @@ class Reliability(ValueStream):
                     remaining_out_duration = data_length - outage_ind
                     crit_load_values = np.zeros(self.outage_duration)
                     crit_load_values[0:remaining_out_duration] = \
-                        self.critical_load.loc[outage_mask].values
+                        outage_mask.subset(self.critical_load).values
                     load = cvx.Parameter(value=crit_load_values,
                                          name='critical-load',
                                          shape=self.outage_duration)
 
                 else:
                     load = cvx.Parameter(
-                        value=self.critical_load.loc[outage_mask].values,
+                        value=outage_mask.subset(self.critical_load).values,
                         name='critical-load',
                         shape=self.outage_duration)
                 consts += [
@@ -850,22 +934,16 @@ class Reliability(ValueStream):
 
                     soe = np.repeat(self.soc_init*der_props['energy rating'],
                                     len(self.critical_load))
-                    for outage_init in range(len(opt_index)):
-                        demand, power_req, energy_req = \
-                            self.data_process(outage_init, dg_gen,
-                                              pv_max,
-                                              der_props,
-                                              pv_vari,
+                    demand, power_req, energy_req = \
+                        self.data_process_all(dg_gen, pv_max, pv_vari,
                                               largest_gamma)
-                        der_props['init_soe'] = soe[outage_init]
-                        outage_len = self.coverage_dt
-                        # FIXME: this may need changing
-                        soe_outage_profile = \
-                            self.simulate_outage(power_req, demand, energy_req,
-                                                 outage_len, **der_props)
-
-                        soe_outage_profile.insert(0, soe[outage_init])
-                        min_soe_array.append(self.soe_used(soe_outage_profile))
+                    outage_len = self.coverage_dt
+                    # FIXME: this may need changing
+                    soe_outage_profiles, coverage = \
+                        self.simulate_outages(power_req, demand, energy_req,
+                                              outage_len, soe, der_props)
+                    min_soe_array = self.soe_used_all(soe, soe_outage_profiles,
+                                                      coverage)
                     # TODO eventually going to give this to ESS to apply on
                     #  itself
                     self.min_soe_df = pd.DataFrame(min_soe_array,
@@ -897,6 +975,32 @@ class Reliability(ValueStream):
             self.soe_profile_all_1[dict_size] = 0
         return effective_soe
 
+    def soe_used_all(self, init_soe, soe_profiles, coverage):
+        """ Batched version of soe_used: the range that the battery system as
+        to be able to achieve during each simulated outage (the SOE at the
+        start of the outage is included in each profile)
+
+        Args:
+            init_soe (np.ndarray): the SOE at the start of each outage
+            soe_profiles (np.ndarray): result of simulate_outages
+            coverage (np.ndarray): result of simulate_outages
+
+        Returns (np.ndarray) : Maximum SOE of profile - Minimum SOE of profile
+
+        """
+        covered = np.arange(soe_profiles.shape[1]) < coverage[:, None]
+        max_soe = np.maximum(init_soe, np.where(covered, soe_profiles, -np.inf).max(axis=1, initial=-np.inf))
+        min_soe = np.minimum(init_soe, np.where(covered, soe_profiles, np.inf).min(axis=1, initial=np.inf))
+        effective_soe = max_soe - min_soe
+        # record the first 2 SOEs of outages that were covered for exactly 2 timesteps
+        first_two_soe = np.pad(soe_profiles, ((0, 0), (0, max(0, 2 - soe_profiles.shape[1]))))[:, :2]
+        first_two_soe = np.where((coverage == 2)[:, None], first_two_soe, 0)
+        dict_size = len(self.soe_profile_all_0)
+        new_keys = range(dict_size, dict_size + len(coverage))
+        self.soe_profile_all_0.update(zip(new_keys, first_two_soe[:, 0]))
+        self.soe_profile_all_1.update(zip(new_keys, first_two_soe[:, 1]))
+        return effective_soe
+
     def timeseries_report(self):
         """ Summaries the optimization results for this Value Stream.
 
@@ -1065,47 +1169,31 @@ class Reliability(ValueStream):
         # initialize a list to track the frequency of the results of the
         # simulate_outage method
         frequency_simulate_outage = np.zeros(outage_len + 1)
-        outage_init = 0
-        self.outage_soe_profile = {hour+1: [] for hour in range(outage_len)}
-        while outage_init < (len(self.critical_load)):
-            if no_storage_case==False:
-                if aggregate_soe is not None:
-                    der_props['init_soe'] = aggregate_soe.iloc[outage_init]
-            demand_left, reliability_check, energy_requirement_check = \
-                self.data_process(outage_init, dg_gen,
-                                  total_pv_max, der_props,
-                                  total_pv_vari, largest_gamma)
-            if no_storage_case==True:
-                # In case energy storage is not present, no outage simulation is required
-                #Is there a failure
-                if any(reliability_check>0)==True:
-                    failure_ind=np.where((reliability_check>0)==True)[0]
-                    coverage_length=failure_ind[0]
-                else:
-                    coverage_length=len(reliability_check)
-                # record value of foo in frequency count
-                frequency_simulate_outage[int(coverage_length)] += 1
-
+        demand_left, reliability_check, energy_requirement_check = \
+            self.data_process_all(dg_gen, total_pv_max, total_pv_vari,
+                                  largest_gamma)
+        if no_storage_case:
+            # In case energy storage is not present, no outage simulation is required
+            # the outage is covered until the first failure (or until the data runs out)
+            with np.errstate(invalid='ignore'):
+                stops = (reliability_check > 0) | np.isnan(reliability_check)
+            coverage_length = np.where(stops.any(axis=1), stops.argmax(axis=1),
+                                       reliability_check.shape[1])
+        else:
+            # Outage simulation in the presence of energy storage
+            if aggregate_soe is not None:
+                init_soe = aggregate_soe.values
             else:
-                #Outage simulation in the presence of energy storage
-                outage_soc_profile = self.simulate_outage(reliability_check,
-                                                          demand_left,
-                                                          energy_requirement_check,
-                                                          outage_len,
-                                                          **der_props)
-
-                # record value of foo in frequency count
-                coverage_length = len(outage_soc_profile)
-                for key, value in self.outage_soe_profile.items():
-                    value.append(outage_soc_profile[key-1] if key-1 < coverage_length else 0)
-
-                frequency_simulate_outage[int(coverage_length)] += 1
-            # start outage on next timestep
-            outage_init += 1
-        if no_storage_case==False:
-            self.outage_soe_profile = pd.DataFrame(self.outage_soe_profile,
-                                                   index=self.critical_load.index)
-            self.outage_soe_profile.fillna(0, inplace=True)
+                init_soe = self.soc_init * der_props.get('energy rating', 0)
+            outage_soc_profiles, coverage_length = \
+                self.simulate_outages(reliability_check, demand_left,
+                                      energy_requirement_check, outage_len,
+                                      init_soe, der_props)
+            self.outage_soe_profile = pd.DataFrame(outage_soc_profiles,
+                                                   index=self.critical_load.index,
+                                                   columns=range(1, outage_len + 1))
+        # record value of the coverage length in frequency count
+        frequency_simulate_outage += np.bincount(coverage_length, minlength=outage_len + 1)[:outage_len + 1]
         # 3) calculate probabilities
         load_coverage_prob = []
         length = self.dt
@@ -0,0 +1,199 @@
+"""
+Copyright (c) 2024, Electric Power Research Institute
+
+ All rights reserved.
+
+ Redistribution and use in source and binary forms, with or without modification,
+ are permitted provided that the following conditions are met:
+
+     * Redistributions of source code must retain the above copyright notice,
+       this list of conditions and the following disclaimer.
+     * Redistributions in binary form must reproduce the above copyright notice,
+       this list of conditions and the following disclaimer in the documentation
+       and/or other materials provided with the distribution.
+     * Neither the name of DER-VET nor the names of its contributors
+       may be used to endorse or promote products derived from this software
+       without specific prior written permission.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+ A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+ CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+ EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+ PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+ PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+ LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+ NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+"""
+RepresentativePeriods.py
+
+This file holds the RepresentativePeriods class, which reduces a year of time series data to a few typical
+days (or weeks), so that DERs can be sized on a much smaller optimization problem.
+"""
+
+import numpy as np
+import pandas as pd
+import cvxpy as cvx
+from scipy.cluster.vq import kmeans2
+from cvxpy.atoms.affine.sum import Sum
+from cvxpy.expressions.expression import Expression
+from storagevet.ErrorHandling import *
+
+
+class RepresentativePeriods:
+    """ Clusters the periods (days or weeks) of a sizing window by their time series profiles, and keeps the
+    period closest to the center of each cluster, weighted by the number of periods in its cluster. The period
+    with the peak of each load is always kept (with a weight of 1), so that DERs are sized to serve it.
+
+    """
+    PERIOD_HOURS = {'day': 24, 'week': 168}
+    # services whose costs and constraints are sums over timesteps (not monthly peaks, events, or upgrades)
+    SERVICES = ['DA', 'retailTimeShift', 'FR', 'SR', 'NSR', 'LF', 'User']
+
+    def __init__(self, time_series, window_index, dt, periods, period_length='day'):
+        """ Picks the representative periods
+
+        Args:
+            time_series (pd.DataFrame): the time series input of the case
+            window_index (pd.DatetimeIndex): the timesteps of the sizing window
+            dt (float): timestep (hours)
+            periods (int): number of representative periods to keep
+            period_length (str): 'day' or 'week'
+
+        """
+        self.period_length = period_length
+        self.length = int(round(self.PERIOD_HOURS[period_length] / dt))
+        self.count = len(window_index) // self.length
+        data = self.window_data(time_series, window_index)
+        self.columns = data.columns
+        values = data.values[:self.count * self.length]
+
+        self.peaks = sorted({int(np.argmax(values[:, i])) // self.length for i, column in enumerate(self.columns)
+                             if 'load' in column.lower()})
+        self.representative = self.cluster(values, max(periods - len(self.peaks), 1))
+        for peak in self.peaks:
+            self.representative[peak] = peak
+
+        # the representative of each period, and the number of periods each representative stands for
+        self.kept = np.array(sorted(set(self.representative.values())))
+        self.weights = pd.Series(self.representative.values()).value_counts().reindex(self.kept).values
+
+        # timesteps after the last whole period (ex. the 365th day of a year of weeks) are kept as they are
+        remainder = np.arange(self.count * self.length, len(window_index))
+        self.positions = np.concatenate([np.arange(period * self.length, (period + 1) * self.length)
+                                         for period in self.kept] + [remainder])
+        self.timestep_weights = np.concatenate([np.repeat(self.weights, self.length), np.ones(len(remainder))])
+        self.error = self.clustering_error(values)
+
+    @staticmethod
+    def window_data(time_series, window_index):
+        """ The numeric time series data of the sizing window. If the window is in a year that the time series
+        does not include (its data is grown from another year), then the first year of data is used
+
+        Args:
+            time_series (pd.DataFrame): the time series input of the case
+            window_index (pd.DatetimeIndex): the timesteps of the sizing window
+
+        Returns: DataFrame with a row for each timestep of the window and a column for each time series that varies
+
+        """
+        data = time_series.select_dtypes('number')
+        if window_index.isin(data.index).all():
+            data = data.loc[window_index]
+        elif len(data) >= len(window_index):
+            data = data.iloc[:len(window_index)].set_axis(window_index)
+        else:
+            raise ParameterError('Representative periods could not be picked, because the time series data is '
+                                 'shorter than the sizing window.')
+        data = data.fillna(0)
+        return data.loc[:, data.std() > 0]
+
+    def cluster(self, values, clusters):
+        """ Groups the periods with similar (normalized) profiles
+
+        Args:
+            values (np.ndarray): time series values of each timestep of the whole periods
+            clusters (int): the number of groups to make (of the periods that are not peaks)
+
+        Returns: dictionary of the period that represents each period, keyed by period number
+
+        """
+        others = [period for period in range(self.count) if period not in self.peaks]
+        if clusters >= len(others):
+            return {period: period for period in others}
+        spread = values.std(axis=0)
+        normalized = (values - values.mean(axis=0)) / np.where(spread > 0, spread, 1)
+        features = normalized.reshape(self.count, -1)[others]
+        centroids, labels = kmeans2(features, clusters, seed=0, minit='++')
+        representative = {}
+        for label in np.unique(labels):
+            members = np.flatnonzero(labels == label)
+            # the member closest to the center of the cluster stands for the others
+            medoid = members[np.argmin(np.linalg.norm(features[members] - centroids[label], axis=1))]
+            representative.update({others[member]: others[medoid] for member in members})
+        return representative
+
+    def clustering_error(self, values):
+        """ Compares each time series with the time series made by replacing each period with its representative
+
+        Args:
+            values (np.ndarray): time series values of each timestep of the whole periods
+
+        Returns: DataFrame of the error of each time series
+
+        """
+        periods = values.reshape(self.count, self.length, -1)
+        approximation = periods[[self.representative[period] for period in range(self.count)]]
+        errors = (approximation - periods).reshape(-1, len(self.columns))
+        rmse = np.sqrt(np.mean(errors ** 2, axis=0))
+        totals = values.sum(axis=0)
+        return pd.DataFrame({
+            'RMSE': rmse,
+            'Normalized RMSE (%)': 100 * rmse / (values.max(axis=0) - values.min(axis=0)),
+            'Total Error (%)': 100 * errors.sum(axis=0) / np.where(totals == 0, np.nan, np.abs(totals)),
+        }, index=pd.Index(self.columns, name='Time Series'))
+
+    def weigh(self, node):
+        """ Copies an objective function, weighting each timestep of its sums over time by the number of periods
+        the timestep stands for
+
+        Args:
+            node (cvx.Expression): an objective function of the representative window (or a part of one)
+
+        Returns: the weighted copy of NODE
+
+        """
+        if not isinstance(node, Expression) or not len(node.args):
+            return node
+        args = [self.weigh(arg) for arg in node.args]
+        if isinstance(node, Sum) and node.axis is None and node.args[0].shape == self.timestep_weights.shape:
+            return cvx.sum(cvx.multiply(self.timestep_weights, args[0]))
+        return node.copy(args)
+
+    def storage_constraints(self, ders):
+        """ Makes each representative period start with the same stored energy, so that energy is not moved from
+        one period to another (periods with different weights would make that an arbitrage)
+
+        Args:
+            ders (list): the active DERs of the representative window
+
+        Returns: list of constraints
+
+        """
+        starts = np.arange(self.length, len(self.positions), self.length)
+        if not len(starts):
+            return []
+        return [cvx.Zero(der.variables_dict['ene'][starts] - der.variables_dict['ene'][0])
+                for der in ders if 'ene' in der.variables_dict]
+
+    def summary(self):
+        """ Describes the representative periods for the log
+
+        Returns: str
+
+        """
+        return (f"{len(self.kept)} representative {self.period_length}s (including {len(self.peaks)} peak load "
+                f"{self.period_length}s) stand for the {self.count} {self.period_length}s of the first analysis year")
@@ -51,7 +51,13 @@ if __name__ == '__main__':
                         help='specify this flag for verbose output during execution')
     parser.add_argument('--gitlab-ci', action='store_true',
                         help='specify this flag for gitlab-ci testing to skip user input')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='specify the number of processes used to solve sensitivity cases concurrently')
+    parser.add_argument('--resume', default=None, metavar='RESULTS_FOLDER',
+                        help='specify the results folder of a run that stopped part way through to skip the '
+                             'optimization windows saved in its checkpoints')
     arguments = parser.parse_args()
 
-    case = DERVET(arguments.parameters_filename, verbose=arguments.verbose, ignore_cba_valuation=True)
+    case = DERVET(arguments.parameters_filename, verbose=arguments.verbose, workers=arguments.workers,
+                  resume=arguments.resume, ignore_cba_valuation=True)
     case.solve()
@@ -52,7 +52,10 @@ if __name__ == '__main__':
                         help='specify the filename of the CSV file defining the PARAMETERS dataframe')
     parser.add_argument('-v', '--verbose', action='store_true',
                         help='specify this flag for verbose output during execution')
+    parser.add_argument('--resume', default=None, metavar='RESULTS_FOLDER',
+                        help='specify the results folder of a run that stopped part way through to skip the '
+                             'optimization windows saved in its checkpoints')
     arguments = parser.parse_args()
 
-    case = StorageVET(arguments.parameters_filename, arguments.verbose)
+    case = StorageVET(arguments.parameters_filename, arguments.verbose, arguments.resume)
     case.solve()
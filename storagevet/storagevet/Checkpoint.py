@@ -0,0 +1,197 @@
+"""
+Copyright (c) 2024, Electric Power Research Institute
+
+ All rights reserved.
+
+ Redistribution and use in source and binary forms, with or without modification,
+ are permitted provided that the following conditions are met:
+
+     * Redistributions of source code must retain the above copyright notice,
+       this list of conditions and the following disclaimer.
+     * Redistributions in binary form must reproduce the above copyright notice,
+       this list of conditions and the following disclaimer in the documentation
+       and/or other materials provided with the distribution.
+     * Neither the name of DER-VET nor the names of its contributors
+       may be used to endorse or promote products derived from this software
+       without specific prior written permission.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+ A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+ CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+ EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+ PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+ PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+ LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+ NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+"""
+Checkpoint.py
+
+This file holds the Checkpoint class, which saves the progress of a Scenario's optimization loop, so that a run
+that stops part way through can resume from the last optimization window that was saved.
+"""
+
+import os
+import pickle
+import time
+import hashlib
+import pandas as pd
+from pathlib import Path
+from storagevet.ErrorHandling import *
+
+
+class Checkpoint:
+    """ Periodically saves (pickles) what the optimization loop has solved so far: the optimization windows that
+    were solved, the state of each DER and value stream (their results so far, and any degradation), the objective
+    values of each window, and the optimization profile.
+
+    """
+    VERSION = 1  # increase when what is saved changes, so that old checkpoints are not used
+    INTERVAL = 300  # seconds between checkpoints
+
+    def __init__(self, path, fingerprint, resume_path=None, interval=None):
+        """ Initialize the checkpoint
+
+        Args:
+            path (str, Path): file the progress is saved to
+            fingerprint (str): identifies the inputs of the case (a checkpoint is only resumed from if it was
+                saved with the same fingerprint)
+            resume_path (str, Path): checkpoint file to resume from. If None, then nothing is resumed
+            interval (float): the least number of seconds between checkpoints (defaults to INTERVAL)
+
+        """
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self.resume_path = None if resume_path is None else Path(resume_path)
+        self.interval = self.INTERVAL if interval is None else interval
+        self.last_save = time.time()
+
+    @classmethod
+    def for_case(cls, results_path, key, case, resume_path=None):
+        """ Creates the checkpoint of a sensitivity case. Checkpoints are saved in a 'checkpoints' folder of the
+        results folder, and are only resumed from if the model parameters file and every data file the case
+        references (time series, monthly, tariff, yearly, cycle life, etc.) are unchanged.
+
+        Args:
+            results_path (Path): the results folder of the run
+            key (int): the case number
+            case (Params): the input parameters of the case
+            resume_path (str, Path): results folder of the run to resume from. If None, then nothing is resumed
+
+        Returns: the Checkpoint of the case
+
+        """
+        filename = f'case{key}.pkl'
+        fingerprint = hashlib.sha256(str(key).encode())
+        fingerprint.update(Path(case.filename).read_bytes())
+        for tag_key, data_filename in sorted(cls.referenced_filenames(vars(case))):
+            fingerprint.update(f"{tag_key}={data_filename}".encode())
+            try:
+                fingerprint.update(Path(data_filename).read_bytes())
+            except OSError:
+                pass
+        if resume_path is not None:
+            resume_path = Path(resume_path) / 'checkpoints' / filename
+        return cls(Path(results_path) / 'checkpoints' / filename, fingerprint.hexdigest(), resume_path)
+
+    @classmethod
+    def referenced_filenames(cls, tag_tree):
+        """ Finds every data file referenced by a case (the values of its '..._filename' keys)
+
+        Args:
+            tag_tree (dict): the inputs of a case, or of one of its tags
+
+        Returns: set of (key, filename) tuples
+
+        """
+        filenames = set()
+        for key, value in tag_tree.items():
+            if isinstance(value, dict):
+                filenames |= cls.referenced_filenames(value)
+            elif isinstance(key, str) and key.endswith('_filename') and isinstance(value, str) \
+                    and not pd.isnull(value):
+                filenames.add((key, value.replace('\\', '/')))
+        return filenames
+
+    @staticmethod
+    def resume_folder(resume):
+        """ Checks the results folder that a run is asked to resume from
+
+        Args:
+            resume (str, Path): results folder of the run that stopped part way through (None to not resume)
+
+        Returns: the results folder as a Path, or None
+
+        """
+        if resume is None:
+            return None
+        # the default results folder is new for every run, so the folder to resume from must be given
+        if isinstance(resume, bool) or not Path(resume).is_dir():
+            TellUser.close_log()
+            raise FilenameError(f"Cannot resume from '{resume}'. Give the results folder of the run that "
+                                "stopped part way through.")
+        return Path(resume)
+
+    def load(self):
+        """ Reads the checkpoint to resume from
+
+        Returns: the progress that was saved (see Scenario.checkpoint_state), or None if there is nothing to resume
+
+        """
+        if self.resume_path is None:
+            return None
+        try:
+            with open(self.resume_path, 'rb') as file:
+                saved = pickle.load(file)
+        except FileNotFoundError:
+            TellUser.info(f"No checkpoint found at {self.resume_path}, so every optimization window will be solved")
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            TellUser.warning(f"Could not read the checkpoint at {self.resume_path} ({e}), so every optimization window will be solved")
+            return None
+        if saved.get('version') != self.VERSION or saved.get('fingerprint') != self.fingerprint:
+            TellUser.warning(f"The checkpoint at {self.resume_path} was saved from different inputs, so every optimization window will be solved")
+            return None
+        TellUser.info(f"Resuming from the checkpoint at {self.resume_path}")
+        return saved['state']
+
+    def save(self, state_function, force=False):
+        """ Saves the progress of the optimization loop, if INTERVAL seconds have passed since the last checkpoint
+
+        Args:
+            state_function (callable): returns the progress to save (only called if a checkpoint is due)
+            force (bool): save even if INTERVAL seconds have not passed
+
+        """
+        if not force and time.time() - self.last_save < self.interval:
+            return
+        saved = {'version': self.VERSION, 'fingerprint': self.fingerprint, 'state': state_function()}
+        # write to a temporary file first, so that a run that stops while saving does not leave a partial checkpoint
+        temporary = self.path.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temporary, 'wb') as file:
+                pickle.dump(saved, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self.path)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+            # pickle raises TypeError or AttributeError for some objects it can not save (ex. a lock, or a local
+            # function); the run goes on without a checkpoint either way
+            TellUser.warning(f"Could not save a checkpoint to {self.path}: {e}")
+            try:
+                temporary.unlink()
+            except OSError:
+                pass
+            return
+        self.last_save = time.time()
+        TellUser.debug(f"Saved a checkpoint to {self.path}")
+
+    def remove(self):
+        """ Deletes the checkpoint (once the optimization loop has finished, it is not needed) """
+        try:
+            self.path.unlink()
+            self.path.parent.rmdir()
+        except OSError:
+            pass
@@ -0,0 +1,212 @@
+"""
+Copyright (c) 2024, Electric Power Research Institute
+
+ All rights reserved.
+
+ Redistribution and use in source and binary forms, with or without modification,
+ are permitted provided that the following conditions are met:
+
+     * Redistributions of source code must retain the above copyright notice,
+       this list of conditions and the following disclaimer.
+     * Redistributions in binary form must reproduce the above copyright notice,
+       this list of conditions and the following disclaimer in the documentation
+       and/or other materials provided with the distribution.
+     * Neither the name of DER-VET nor the names of its contributors
+       may be used to endorse or promote products derived from this software
+       without specific prior written permission.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+ A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+ CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+ EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+ PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+ PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+ LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+ NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+"""
+CycleCounting.py
+
+This file holds the RainflowCounter class, which counts the cycles of a DER's dispatch (with rainflow counting) one
+optimization window at a time, and sorts them into the bins of a cycle life table.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class RainflowCounter:
+    """ Counts cycles with the rainflow algorithm, one optimization window at a time. The reversals that have not
+    closed a cycle yet (the rainflow residual) are carried from one window to the next, so a cycle that spans
+    windows is counted as if the dispatch of every window had been counted as one series.
+
+    Cycles are sorted into bins by their depth and added to a running count of cycles per bin. Each cycle can also be
+    kept in an append-only log, which is only turned into a DataFrame when it is reported.
+
+    """
+    LOG_COLUMNS = ['rng', 'mean', 'count', 'i_start', 'i_end']
+
+    def __init__(self, depth_limits, log_cycles=True):
+        """ Initialize the counter
+
+        Args:
+            depth_limits (list, np.ndarray): the upper limit on cycle depth of each bin, as a fraction of the SCALE
+                given to count (ex. the 'Cycle Depth Upper Limit' column of a cycle life table)
+            log_cycles (bool): keep every cycle counted, so that they can be reported
+
+        """
+        self.depth_limits = np.asarray(depth_limits, dtype=float)
+        self.cycle_counts = np.zeros(len(self.depth_limits))  # closed cycles in each bin
+        self.residual_counts = np.zeros(len(self.depth_limits))  # half cycles of the residual in each bin
+        self.residual = []  # (index, value) of the reversals that have not closed a cycle yet
+        self.direction = 0  # sign of the last change in value counted
+        self.steps = 0  # number of values counted so far
+        self.log_cycles = log_cycles
+        self.log = []  # (cycles, label, bins, scale) of each window counted
+        self.last_label = None
+        self.last_scale = 1
+
+    @staticmethod
+    def reversals(series, direction=0):
+        """ Finds the reversals of SERIES (the points where it changes direction, like rainflow.reversals)
+
+        Args:
+            series (np.ndarray): values
+            direction (int): sign of the change in value right before SERIES, or 0 if SERIES is the start of the data
+
+        Returns: positions of the reversals in SERIES. The first point is included if SERIES is the start of the data
+            (or if it turns around right away), and the last point is always included
+
+        """
+        changes = np.diff(series)
+        moves = np.flatnonzero(changes)
+        signs = np.sign(changes[moves])
+        # a turn happens at the last point before a move with the opposite sign of the move before it
+        turns = moves[1:][signs[1:] != signs[:-1]]
+        if not direction and not len(moves):
+            # nothing has changed yet, so there is only the first point
+            return np.array([0])
+        if not direction:
+            first = [0]
+        elif len(moves) and signs[0] != direction:
+            first = [moves[0]]
+        else:
+            first = []
+        positions = np.r_[first, turns].astype(int)
+        if not len(positions) or positions[-1] != len(series) - 1:
+            positions = np.r_[positions, len(series) - 1].astype(int)
+        return positions
+
+    def count(self, values, scale, label=None):
+        """ Counts the cycles of the next optimization window
+
+        Args:
+            values (np.ndarray): the values of the window (ex. state of energy), which continue from the values of the
+                last window counted
+            scale (float): the value that cycle depths are a fraction of (ex. effective energy capacity)
+            label: the optimization window, recorded in the cycle log
+
+        Returns: the number of cycles added to each bin by VALUES -- the cycles that were closed, plus the change in
+            the half cycles of the residual
+
+        """
+        values = np.asarray(values, dtype=float)
+        if not len(values):
+            return np.zeros(len(self.depth_limits))
+        start = self.steps
+        if len(self.residual):
+            # the last value counted is only a reversal if the values turn around after it, so count it again
+            index, value = self.residual.pop()
+            series = np.r_[value, values]
+            indices = np.r_[index, np.arange(start, start + len(values))]
+        else:
+            series = values
+            indices = np.arange(start, start + len(values))
+        positions = self.reversals(series, self.direction)
+        changes = np.diff(series)
+        moves = changes[changes != 0]
+        if len(moves):
+            self.direction = np.sign(moves[-1])
+        self.steps += len(values)
+
+        cycles = []
+        points = self.residual
+        for index, value in zip(indices[positions], series[positions]):
+            points.append((index, value))
+            while len(points) >= 3:
+                x1, x2, x3 = points[-3][1], points[-2][1], points[-1][1]
+                if abs(x3 - x2) < abs(x2 - x1):
+                    break
+                if len(points) == 3:
+                    # the range contains the first point, so it is a half cycle
+                    (i1, x1), (i2, x2) = points[0], points[1]
+                    cycles.append((abs(x1 - x2), (x1 + x2) / 2, 0.5, i1, i2))
+                    points.pop(0)
+                else:
+                    (i1, x1), (i2, x2) = points[-3], points[-2]
+                    cycles.append((abs(x1 - x2), (x1 + x2) / 2, 1.0, i1, i2))
+                    del points[-3:-1]
+        cycles = np.array(cycles, dtype=float).reshape(-1, len(self.LOG_COLUMNS))
+
+        bins = self.digitize(cycles[:, 0], scale)
+        closed_counts = np.bincount(bins, weights=cycles[:, 2], minlength=len(self.depth_limits))
+        residual_counts = 0.5 * np.bincount(self.digitize(self.residual_ranges(), scale),
+                                            minlength=len(self.depth_limits))
+        added = closed_counts + residual_counts - self.residual_counts
+        self.cycle_counts += closed_counts
+        self.residual_counts = residual_counts
+        if self.log_cycles:
+            self.log.append((cycles, label, bins, scale))
+        self.last_label = label
+        self.last_scale = scale
+        return added
+
+    def residual_ranges(self):
+        """ Returns: the range of each half cycle left in the residual
+
+        """
+        return np.abs(np.diff([value for _, value in self.residual]))
+
+    def digitize(self, ranges, scale):
+        """ Sorts cycles into bins by their depth
+
+        Args:
+            ranges (np.ndarray): the range of each cycle
+            scale (float): the value that cycle depths are a fraction of
+
+        Returns: the bin of each cycle (cycles deeper than every bin are put in the last bin)
+
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            depths = np.minimum(np.asarray(ranges, dtype=float) / scale, 1)
+        bins = np.searchsorted(self.depth_limits, depths, side='left')
+        return np.minimum(bins, len(self.depth_limits) - 1)
+
+    def cycle_log(self):
+        """ Makes a report of every cycle counted. The residual is reported as half cycles of the last window counted.
+
+        Returns: DataFrame with the range, mean, count, and first and last (absolute) timestep of each cycle, the
+            optimization window it was counted in ('Opt window'), the bin it was sorted into ('bin'), and the SCALE
+            of its depth ('scale')
+
+        """
+        frames = [pd.DataFrame(cycles, columns=self.LOG_COLUMNS).assign(**{'Opt window': label, 'bin': bins,
+                                                                           'scale': scale})
+                  for cycles, label, bins, scale in self.log]
+        if len(self.residual) > 1:
+            (starts, values) = zip(*self.residual)
+            values = np.array(values)
+            residual = pd.DataFrame({'rng': self.residual_ranges(), 'mean': (values[:-1] + values[1:]) / 2,
+                                     'count': 0.5, 'i_start': starts[:-1], 'i_end': starts[1:],
+                                     'Opt window': self.last_label,
+                                     'bin': self.digitize(self.residual_ranges(), self.last_scale),
+                                     'scale': self.last_scale})
+            frames.append(residual)
+        if not len(frames):
+            return pd.DataFrame(columns=self.LOG_COLUMNS + ['Opt window', 'bin', 'scale'])
+        log = pd.concat(frames, ignore_index=True)
+        log[['i_start', 'i_end']] = log[['i_start', 'i_end']].astype(int)
+        return log
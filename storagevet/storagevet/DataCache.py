@@ -0,0 +1,155 @@
+"""
+Copyright (c) 2024, Electric Power Research Institute
+
+ All rights reserved.
+
+ Redistribution and use in source and binary forms, with or without modification,
+ are permitted provided that the following conditions are met:
+
+     * Redistributions of source code must retain the above copyright notice,
+       this list of conditions and the following disclaimer.
+     * Redistributions in binary form must reproduce the above copyright notice,
+       this list of conditions and the following disclaimer in the documentation
+       and/or other materials provided with the distribution.
+     * Neither the name of DER-VET nor the names of its contributors
+       may be used to endorse or promote products derived from this software
+       without specific prior written permission.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+ A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+ CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+ EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+ PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+ PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+ LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+ NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+"""
+DataCache.py
+
+This file holds the DataCache class, which keeps the DataFrames parsed from referenced data files (time series,
+monthly data, tariffs, cycle life, etc.) on disk, so that an unchanged file does not have to be parsed again.
+"""
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+import pandas as pd
+from storagevet.DiskCache import DiskCache
+from storagevet.ErrorHandling import *
+
+
+class DataCache(DiskCache):
+    """ An on-disk cache of parsed input data files. Each DataFrame is saved (pickled) under a key made from
+    the contents of the file it was read from and how it was read, so editing a file (or upgrading pandas)
+    makes its old entry unused.
+
+    The cache directory is DERVET_DATA_CACHE (if that environment variable is set), otherwise ~/.cache/dervet.
+    Setting DERVET_DATA_CACHE to 'off' turns the cache off. Once the cache is larger than DERVET_DATA_CACHE_SIZE
+    (in MB, MAX_SIZE by default), the least recently used entries are deleted.
+
+    """
+    VERSION = 1  # increase when the way files are parsed changes, so that old entries are not reused
+    ENVIRONMENT_VARIABLE = 'DERVET_DATA_CACHE'
+    SIZE_ENVIRONMENT_VARIABLE = 'DERVET_DATA_CACHE_SIZE'
+
+    def __init__(self, directory=None, max_size=None):
+        """ Initialize the cache
+
+        Args:
+            directory (str, Path): where the cache is kept. If None, then the environment variable
+                DERVET_DATA_CACHE, or ~/.cache/dervet, is used
+            max_size (float): the size (MB) the cache is kept under. If None, then the environment variable
+                DERVET_DATA_CACHE_SIZE, or MAX_SIZE, is used
+
+        """
+        if directory is None:
+            directory = os.environ.get(self.ENVIRONMENT_VARIABLE, Path.home() / '.cache' / 'dervet')
+        if max_size is None:
+            try:
+                max_size = float(os.environ.get(self.SIZE_ENVIRONMENT_VARIABLE, self.MAX_SIZE))
+            except ValueError:
+                TellUser.warning(f"{self.SIZE_ENVIRONMENT_VARIABLE} is not a number, so the data cache is kept "
+                                 f"under {self.MAX_SIZE} MB")
+                max_size = self.MAX_SIZE
+        self.enabled = str(directory).lower() not in ['off', 'none', '0', '']
+        super().__init__(directory, max_size)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, name, filename, ind_col=None):
+        """ Key of a file's entry in the cache
+
+        Args:
+            name (str): name of the data (ex. 'time_series')
+            filename (str): the file the data is read from
+            ind_col (str or list): column(s) used as the index
+
+        Returns: hex digest of the contents of the file and how it is read, or None if the cache is off
+            (or the file cannot be opened)
+
+        """
+        if not self.enabled:
+            return None
+        digest = hashlib.sha256()
+        digest.update(repr((self.VERSION, pd.__version__, name, ind_col, Path(filename).suffix)).encode())
+        try:
+            with open(filename, 'rb') as file:
+                for block in iter(lambda: file.read(1 << 20), b''):
+                    digest.update(block)
+        except OSError:
+            return None
+        return digest.hexdigest()
+
+    def load(self, key, filename):
+        """ Finds the DataFrame that was parsed from a file before
+
+        Args:
+            key (str): result of the key method
+            filename (str): the file the data is read from (for the log)
+
+        Returns: the parsed DataFrame, or None if it is not in the cache
+
+        """
+        if key is None:
+            return None
+        path = self.directory / f'{key}.pkl'
+        try:
+            frame = pd.read_pickle(path)
+        except (OSError, ValueError, EOFError, AttributeError, ImportError, pickle.UnpicklingError):
+            # a missing or corrupt entry is parsed again (and overwritten)
+            self.misses += 1
+            TellUser.info(f"Data cache miss: {filename} will be parsed")
+            return None
+        self.touch(path)
+        self.hits += 1
+        TellUser.info(f"Data cache hit: {filename} (its parsed data was reused)")
+        return frame
+
+    def save(self, key, frame, filename):
+        """ Saves the DataFrame parsed from a file, so that the file does not need to be parsed again, then evicts
+        the least recently used entries if the cache is too big
+
+        Args:
+            key (str): result of the key method
+            frame (pd.DataFrame): the parsed data
+            filename (str): the file the data was read from (for the log)
+
+        """
+        if key is None:
+            return
+        path = self.directory / f'{key}.pkl'
+        # write to a temporary file first, so that another run never reads a partial entry
+        temporary = path.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            frame.to_pickle(temporary)
+            os.replace(temporary, path)
+        except OSError as e:
+            TellUser.warning(f"Could not save {filename} to the data cache ({self.directory}): {e}")
+            return
+        self.saved(path)
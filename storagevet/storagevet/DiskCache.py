@@ -0,0 +1,111 @@
+"""
+Copyright (c) 2024, Electric Power Research Institute
+
+ All rights reserved.
+
+ Redistribution and use in source and binary forms, with or without modification,
+ are permitted provided that the following conditions are met:
+
+     * Redistributions of source code must retain the above copyright notice,
+       this list of conditions and the following disclaimer.
+     * Redistributions in binary form must reproduce the above copyright notice,
+       this list of conditions and the following disclaimer in the documentation
+       and/or other materials provided with the distribution.
+     * Neither the name of DER-VET nor the names of its contributors
+       may be used to endorse or promote products derived from this software
+       without specific prior written permission.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+ A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+ CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+ EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+ PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+ PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+ LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+ NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+"""
+DiskCache.py
+
+This file holds the DiskCache class, the size limit shared by the on-disk caches (DataCache and SolutionCache):
+once a cache is larger than its limit, its least recently used entries are deleted.
+"""
+
+import os
+from pathlib import Path
+from storagevet.ErrorHandling import *
+
+
+class DiskCache:
+    """ A directory of cache entries (one .pkl file per entry) that is kept under a size limit. Entries are
+    marked as used when they are read, and the least recently used entries are deleted first.
+
+    """
+    MAX_SIZE = 1024  # MB
+
+    def __init__(self, directory, max_size=None):
+        """ Initialize the cache
+
+        Args:
+            directory (str, Path): where the cache is kept
+            max_size (float): the size (MB) the cache is kept under (defaults to MAX_SIZE)
+
+        """
+        self.directory = Path(directory)
+        self.max_bytes = (self.MAX_SIZE if max_size is None else max_size) * 2**20
+        self.size = None  # bytes used by the cache (found the first time an entry is saved)
+
+    def touch(self, path):
+        """ Marks an entry as recently used, so it is evicted last
+
+        Args:
+            path (Path): the file of the entry
+
+        """
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def saved(self, path):
+        """ Adds a newly saved entry to the size of the cache, then evicts the least recently used entries if the
+        cache is too big
+
+        Args:
+            path (Path): the file of the entry
+
+        """
+        if self.size is None:
+            self.size = sum(entry.stat().st_size for entry in self.entries())
+        else:
+            self.size += path.stat().st_size
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def entries(self):
+        """ The files of the cache (entries saved by any run) """
+        try:
+            return [entry for entry in os.scandir(self.directory) if entry.name.endswith('.pkl')]
+        except OSError:
+            return []
+
+    def evict(self):
+        """ Deletes the least recently used entries until the cache is under three quarters of its size limit
+        (so that it is not scanned again after every save)
+
+        """
+        entries = sorted(((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in self.entries()))
+        self.size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self.size <= 0.75 * self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # another process evicted it first
+                pass
+            self.size -= size
+        TellUser.debug(f"Evicted the least recently used entries from {self.directory}")
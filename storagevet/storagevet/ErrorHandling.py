@@ -90,15 +90,17 @@ class InputDataError(ValueError):
 
 
 class TellUser:
+    logger = None
+
     @classmethod
-    def create_log(cls, logs_path, verbose):
+    def create_log(cls, logs_path, verbose, log_name='dervet_log.log'):
         try:
             os.makedirs(logs_path)
         except OSError:
             print("Creation of the logs_path directory %s failed. Possibly already created." % logs_path) if verbose else None
         else:
             print("Successfully created the logs_path directory %s " % logs_path) if verbose else None
-        log_filename = logs_path / 'dervet_log.log'
+        log_filename = logs_path / log_name
         handler = logging.FileHandler(log_filename, mode='w')
         formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
         handler.setFormatter(formatter)
@@ -115,8 +117,21 @@ class TellUser:
             cls.logger.addHandler(ch)
         cls.logger.info('Started logging...')
 
+    @classmethod
+    def create_null_log(cls):
+        """ Discards every message (used in worker processes, which would otherwise write into the
+        log file of the main process)
+        """
+        cls.close_log()
+        cls.logger = logging.getLogger('Error')
+        cls.logger.setLevel(logging.DEBUG)
+        cls.logger.propagate = False
+        cls.logger.addHandler(logging.NullHandler())
+
     @classmethod
     def close_log(cls):
+        if cls.logger is None:
+            return
         for i in list(cls.logger.handlers):
             #print(i)
             cls.logger.removeHandler(i)
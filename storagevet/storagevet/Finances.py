@@ -141,69 +141,85 @@ class Financial:
         # get optimization years
         analysis_years = base_load.index.year.unique()
         base_year = min(analysis_years)
-        # add rows for the tariff, one set of new rows per optimized year (make sure to record
-        # the year)
-        tariff_year = tariff.copy(deep=True)
-        input_tariff = tariff.copy(deep=True)
-        index_max = int(input_tariff.index.astype(int).max())
-        # add "Year" column
-        tariff_year["Year"] = base_year
-        for yr in analysis_years:
-            if yr == base_year:
-                continue
-            change_in_yrs = yr - base_year
-            # move index values into dataframe value
-            add_tariff = input_tariff.reset_index()
-            # add "Year" column
-            add_tariff["Year"] = yr
-            # iterate through each row
-            for i, row in add_tariff.iterrows():
-                # grow the value based on the corresponding growth rate
-                charge = row.Charge.lower()
-                growth = charge_growth_rates[charge]
-                add_tariff.loc[i, 'Value'] = row['Value'] * (1 + growth) ** change_in_yrs
-            # give the new row new billing period labels
-            add_tariff.loc[:, 'Billing Period'] = (input_tariff.index.astype(int) + index_max).astype(str)
-            add_tariff = add_tariff.set_index('Billing Period', drop=True)
-            # add the new tariff to the rest
-            tariff_year = pd.concat([tariff_year, add_tariff], sort=True)
-            index_max = int(tariff_year.index.astype(int).max())
-
-        he = base_load.index.hour + 1
-        month = base_load.index.month
-        year = base_load.index.year
-
-        # 2) Calculate energy charge per billing period: since overlapping energy charges are
-        # added, we must calculate energy charges the "long way"
-        monthly_bill = pd.DataFrame()
-        for item in tariff_year.index:
-            # determine mask to select subset of data that applies to the selected billing period
-            bill = tariff_year.loc[item, :]
-            billing_pd_mask = self.create_bill_period_mask(bill, month, he,
-                                                           base_load.index.weekday, year)
-
-            temp_df = pd.DataFrame()
-            # determine if energy charge or demand charge
-            if bill['Charge'].lower() == 'energy':
-                # Add energy prices
-                energy_price = bill['Value']
-                # calculate energy cost by month (within billing period)
-                temp_df['Energy Charge ($)'] = self.dt * energy_price * net_load.loc[billing_pd_mask]
-                temp_df['Original Energy Charge ($)'] = self.dt * energy_price * base_load.loc[billing_pd_mask]
-                retail_period = temp_df.groupby(by=lambda x: x.to_period('M'))[['Energy Charge ($)', 'Original Energy Charge ($)']].sum()
-                # add billing period column to df
-                retail_period.loc[:, 'Billing Period'] = item
-                monthly_bill = pd.concat([monthly_bill, retail_period])
-            elif bill['Charge'].lower() == 'demand':
-                # Add demand prices
-                demand_price = bill['Value']
-                # calculate energy cost by month (within billing period)
-                temp_df['Demand Charge ($)'] = net_load.loc[billing_pd_mask]
-                temp_df['Original Demand Charge ($)'] = base_load.loc[billing_pd_mask]
-                retail_period = temp_df.groupby(by=lambda x: x.to_period('M'))[['Demand Charge ($)', 'Original Demand Charge ($)']].max() * demand_price
-                # add billing period column to df
-                retail_period.loc[:, 'Billing Period'] = item
-                monthly_bill = pd.concat([monthly_bill, retail_period])
+        # each optimized year gets its own set of billing periods (with new billing period
+        # labels) whose charges have been grown from the base year
+        index_max = int(tariff.index.astype(int).max())
+        year_labels = {base_year: tariff.index.values}
+        for i, yr in enumerate(yr for yr in analysis_years if yr != base_year):
+            year_labels[yr] = (tariff.index.astype(int) + index_max * (i + 1)).astype(str).values
+        charge = tariff['Charge'].str.lower()
+        growth = charge.map(charge_growth_rates).values.astype(float)
+        values = tariff['Value'].values.astype(float)
+
+        # timesteps x billing periods of the base tariff, the year is accounted for by grouping
+        # by month (each month belongs to a single year)
+        billing_periods = self.create_bill_period_table(tariff, base_load.index).values
+        months = base_load.index.to_period('M')
+        month_index = pd.PeriodIndex(months.unique().sort_values(), name='Month-Year')
+        # the growth of the charges in every timestep (timesteps x billing periods)
+        years = base_load.index.year.values
+        timestep_values = values * (1 + growth) ** (years - base_year)[:, np.newaxis]
+        month_values = values * (1 + growth) ** (month_index.year.values - base_year)[:, np.newaxis]
+
+        # 2) Calculate the charges of every billing period at once (months x billing periods)
+        # the months that each billing period applies to
+        applies = pd.DataFrame(billing_periods).groupby(months).any().reindex(month_index).values
+        is_energy = (charge == 'energy').values
+        is_demand = (charge == 'demand').values
+        charges = {}
+        if is_energy.any():
+            # energy charges are added, so sum the cost of each timestep a billing period applies to
+            energy_price = self.dt * timestep_values[:, is_energy]
+            energy_mask = billing_periods[:, is_energy]
+            for col, load in [('Energy Charge ($)', net_load), ('Original Energy Charge ($)', base_load)]:
+                energy_cost = np.where(energy_mask, energy_price * load.values[:, np.newaxis], 0)
+                charges[col] = (pd.DataFrame(energy_cost).groupby(months).sum()
+                                .reindex(month_index).values, is_energy)
+        if is_demand.any():
+            # demand charges are applied to the max load within the billing period of each month
+            demand_mask = billing_periods[:, is_demand]
+            for col, load in [('Demand Charge ($)', net_load), ('Original Demand Charge ($)', base_load)]:
+                peak_load = np.where(demand_mask, load.values[:, np.newaxis], np.nan)
+                charges[col] = (pd.DataFrame(peak_load).groupby(months).max()
+                                .reindex(month_index).values * month_values[:, is_demand], is_demand)
+
+        # build one row per billing period that applies to each month, ordered like the
+        # (grown) tariff: by year, then by billing period, then by month
+        month_order = np.argsort(month_index.year.values, kind='stable')
+        rows_month, rows_period = [], []
+        for yr in year_labels.keys():
+            yr_months = month_order[month_index.year.values[month_order] == yr]
+            for period in range(len(tariff.index)):
+                applies_months = yr_months[applies[yr_months, period]]
+                rows_month.append(applies_months)
+                rows_period.append(np.full(len(applies_months), period))
+        rows_month = np.concatenate(rows_month) if rows_month else np.array([], dtype=int)
+        rows_period = np.concatenate(rows_period) if rows_period else np.array([], dtype=int)
+        row_years = month_index.year.values[rows_month]
+        billing_period_label = np.empty(len(rows_month), dtype=object)
+        for yr, labels in year_labels.items():
+            in_year = row_years == yr
+            billing_period_label[in_year] = labels[rows_period[in_year]]
+
+        monthly_bill = pd.DataFrame(index=month_index[rows_month])
+        charge_columns = [['Energy Charge ($)', 'Original Energy Charge ($)'],
+                          ['Demand Charge ($)', 'Original Demand Charge ($)']]
+        # the columns are ordered by the first type of charge in the tariff
+        if charge.loc[charge.isin(['energy', 'demand'])].iloc[:1].eq('demand').any():
+            charge_columns.reverse()
+        for i, columns in enumerate(charge_columns):
+            for col in columns:
+                if col not in charges:
+                    continue
+                month_charges, charge_type = charges[col]
+                # map the billing periods of this charge type into the rows
+                column = np.full(len(rows_month), np.nan)
+                of_type = charge_type[rows_period]
+                position_in_type = np.cumsum(charge_type) - 1
+                column[of_type] = month_charges[rows_month[of_type], position_in_type[rows_period[of_type]]]
+                monthly_bill[col] = column
+            if not i:
+                monthly_bill['Billing Period'] = billing_period_label
         monthly_bill_index_name = 'Month-Year'
         monthly_bill.index.name = monthly_bill_index_name
         adv_monthly_bill = monthly_bill.sort_values(by=[monthly_bill_index_name, 'Billing Period'])
@@ -261,6 +277,27 @@ class Financial:
             billing_pd_mask = (tariff_row['Year'] == year) & billing_pd_mask
         return billing_pd_mask
 
+    @staticmethod
+    def create_bill_period_table(tariff, index):
+        """ Given a tariff and a datetime index, create a DataFrame of booleans that indicate
+        where each billing period (each row of the TARIFF) applies
+
+        Args:
+            tariff (DataFrame): tariff dataframe indexed by Billing Period
+            index (pd.DatetimeIndex): the timesteps to build the billing periods for
+
+        Returns: a DataFrame of booleans, indexed by INDEX, with a column for each billing period
+
+        """
+        he = (index + pd.Timedelta('1s')).hour + 1
+        month = index.month
+        weekday = index.weekday
+        billing_periods = {}
+        for p in tariff.index:
+            bill = tariff.loc[p, :]
+            billing_periods[p] = Financial.create_bill_period_mask(bill, month, he, weekday)
+        return pd.DataFrame(billing_periods, index=index, columns=tariff.index, dtype=bool)
+
     @staticmethod
     def calc_retail_energy_price(tariff, freq, analysis_yr, non_zero=True):
         """ transforms tariff data file into time series dataFrame
@@ -274,38 +311,23 @@ class Financial:
 
         """
         temp = pd.DataFrame(index=Lib.create_timeseries_index([analysis_yr], freq))
-        size = len(temp)
 
         # Build Energy Price Vector
         temp['he'] = (temp.index + pd.Timedelta('1s')).hour + 1
-        temp.loc[:, 'p_energy'] = np.zeros(shape=size)
-
-        billing_period = [[] for _ in range(size)]
+        billing_periods = Financial.create_bill_period_table(tariff, temp.index)
+        charge_type = tariff['Charge'].str.lower()
 
-        for p in tariff.index:
-            # edit the pricedf energy price and period values for all of the periods defined
-            # in the tariff input file
-            bill = tariff.loc[p, :]
-            mask = Financial.create_bill_period_mask(bill, temp.index.month, temp['he'], temp.index.weekday)
-            if bill['Charge'].lower() == 'energy':
-                current_energy_prices = temp.loc[mask, 'p_energy'].values
-                if np.any(np.greater(current_energy_prices, 0)):
-                    # More than one energy price applies to the same time step
-                    TellUser.warning('More than one energy price applies to the same time step.')
-                # Add energy prices
-                temp.loc[mask, 'p_energy'] += bill['Value']
-            elif bill['Charge'].lower() == 'demand':
-                # record billing period
-                for i, true_false in enumerate(mask):
-                    if true_false:
-                        billing_period[i].append(p)
-        billing_period = pd.DataFrame({'billing_period': billing_period}, dtype='object')
-        temp = temp.assign(billing_period=billing_period['billing_period'].values)
+        energy_periods = billing_periods.loc[:, (charge_type == 'energy').values]
+        if np.any(energy_periods.sum(axis=1) > 1):
+            # More than one energy price applies to the same time step
+            TellUser.warning('More than one energy price applies to the same time step.')
+        # Add energy prices
+        temp.loc[:, 'p_energy'] = energy_periods.values.astype(float) @ \
+            tariff.loc[(charge_type == 'energy').values, 'Value'].values.astype(float)
 
         # ADD CHECK TO MAKE SURE ENERGY PRICES ARE THE SAME FOR EACH OVERLAPPING BILLING PERIOD
         # Check to see that each timestep has a period assigned to it
-
-        if (not billing_period.apply(len).all() or np.any(np.equal(temp.loc[:, 'p_energy'].values, 0))) and non_zero:
+        if np.any(np.equal(temp.loc[:, 'p_energy'].values, 0)) and non_zero:
             TellUser.error('The billing periods in the input file do not partition the year, '
                            + 'please check the tariff input file')
             TellUser.close_log()
@@ -375,12 +397,14 @@ class Financial:
 
         # add tax incentives if user wants to consider them
         if self.external_incentives:
-            for year in self.yearly_data.index:
-                if self.start_year.year <= year <= self.end_year.year:
-                    pro_forma.loc[pd.Period(year=year, freq='Y'), 'Tax Credit'] = \
-                        self.yearly_data.loc[year, 'Tax Credit (nominal $)']
-                    pro_forma.loc[pd.Period(year=year, freq='Y'), 'Other Incentives'] = \
-                        self.yearly_data.loc[year, 'Other Incentive (nominal $)']
+            incentive_years = [year for year in self.yearly_data.index
+                               if self.start_year.year <= year <= self.end_year.year]
+            if incentive_years:
+                incentives = pd.DataFrame({
+                    'Tax Credit': self.yearly_data.loc[incentive_years, 'Tax Credit (nominal $)'].values,
+                    'Other Incentives': self.yearly_data.loc[incentive_years, 'Other Incentive (nominal $)'].values
+                }, index=Lib.yearly_index(incentive_years))
+                pro_forma = pd.concat([pro_forma, incentives], axis=1)
 
         # fill in zero columns
         pro_forma = pro_forma.fillna(value=0)
@@ -405,7 +429,6 @@ class Financial:
 
         Returns: a df that can be concatinated with the profroma
         """
-        avoided_cost_df = pd.DataFrame()
         # splice labels with CHARGE_TYPE string
         original_cost = f'Original {charge_type} Charge ($)'
         new_cost = f'{charge_type} Charge ($)'
@@ -413,8 +436,7 @@ class Financial:
 
         yr_costs = self.monthly_bill.groupby(by=lambda x: x.year)[[new_cost, original_cost]].sum()
         avoided_cost = yr_costs.loc[:, original_cost] - yr_costs.loc[:, new_cost]
-        for year, value in avoided_cost.items():
-            avoided_cost_df.loc[pd.Period(year, freq='Y'), avoided_cost_name] = value
+        avoided_cost_df = pd.DataFrame({avoided_cost_name: avoided_cost.values}, index=Lib.yearly_index(avoided_cost.index))
         avoided_cost_df = self.fill_non_optimization_years(avoided_cost_df, growth_rate)
         return avoided_cost_df
 
@@ -432,12 +454,8 @@ class Financial:
         # if escalation_rate is not given, use user given inflation rate
         if escalation_rate is None:
             escalation_rate = self.inflation_rate
-        # find max year in index (there might be string in index so we find it by hand)
-        for yr in df.index:
-            if isinstance(yr, str):
-                continue
-            t = yr.year - base_year
-            df.loc[yr, :] = df.loc[yr, :] * ((1 + escalation_rate) ** t)
+        # rows labeled with a string (there might be string in index) are not escalated
+        df[df.columns] = df.mul(Lib.escalation_factors(df.index, escalation_rate, base_year), axis=0)
         return df
 
     def fill_non_optimization_years(self, df, escalation_rate, is_om_cost = False):
@@ -464,15 +482,10 @@ class Financial:
         last_optimization_year = max(df.index.values)
         if not is_om_cost:
             if first_optimization_year != self.start_year:
-                fill_back_years = pd.period_range(self.start_year, first_optimization_year, freq='Y')
                 # back fill until you hit start year
-                i = len(fill_back_years) - 1
-                while i > 0:
-                    year_with_data = fill_back_years[i]
-                    fill_year = fill_back_years[i - 1]
-                    prev_years = filled_df.loc[year_with_data, :].copy(deep=True)
-                    filled_df.loc[fill_year, :] = prev_years / (1 + escalation_rate)
-                    i -= 1
+                fill_back_years = pd.period_range(self.start_year, first_optimization_year - 1, freq='Y')
+                factors = Lib.escalation_factors(fill_back_years, escalation_rate, first_optimization_year.year)
+                filled_df.loc[fill_back_years, :] = np.outer(factors, filled_df.loc[first_optimization_year, :].values)
 
         # use linear interpolation for growth in between optimization years
         filled_df = \
@@ -480,8 +493,9 @@ class Financial:
 
         if not is_om_cost:
             # forward fill growth columns with inflation
-            for yr in pd.period_range(last_optimization_year + 1, self.end_year, freq='Y'):
-                filled_df.loc[yr, :] = filled_df.loc[yr - 1, :] * (1 + escalation_rate)
+            fill_forward_years = pd.period_range(last_optimization_year + 1, self.end_year, freq='Y')
+            factors = Lib.escalation_factors(fill_forward_years, escalation_rate, last_optimization_year.year)
+            filled_df.loc[fill_forward_years, :] = np.outer(factors, filled_df.loc[last_optimization_year, :].values)
         else:
             # special case for O&M rates
             # backward fill
@@ -192,6 +192,45 @@ def drop_extra_data(df, years_need_data_for):
     return df
 
 
+def yearly_sum(data):
+    """ Sums time series data within each year with one groupby (instead of selecting each year's data in turn)
+
+    Args:
+        data (DataFrame, Series): time series data with a DatetimeIndex
+
+    Returns: the sum of DATA in each year, indexed by Period (year)
+
+    """
+    return data.groupby(data.index.to_period('Y')).sum()
+
+
+def yearly_index(years):
+    """ Creates the index of a proforma type DataFrame
+
+    Args:
+        years (list): the years (int) to index
+
+    Returns: a PeriodIndex of YEARS
+
+    """
+    return pd.PeriodIndex([pd.Period(year=year, freq='Y') for year in years])
+
+
+def escalation_factors(index, escalation_rate, base_year):
+    """ Finds how much a value in BASE_YEAR has escalated by each year of INDEX
+
+    Args:
+        index (Index): proforma type index of Period years (rows labeled with a string are not escalated)
+        escalation_rate (float): the yearly escalation rate
+        base_year (int): the year that is not escalated
+
+    Returns: an array of (1 + ESCALATION_RATE) ** (year - BASE_YEAR) for each row of INDEX
+
+    """
+    years = np.array([base_year if isinstance(yr, str) else yr.year for yr in index])
+    return (1 + escalation_rate) ** (years - base_year)
+
+
 def is_leap_yr(year):
     """ Determines whether given year is leap year or not.
 
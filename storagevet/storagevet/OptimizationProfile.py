@@ -0,0 +1,114 @@
+"""
+Copyright (c) 2024, Electric Power Research Institute
+
+ All rights reserved.
+
+ Redistribution and use in source and binary forms, with or without modification,
+ are permitted provided that the following conditions are met:
+
+     * Redistributions of source code must retain the above copyright notice,
+       this list of conditions and the following disclaimer.
+     * Redistributions in binary form must reproduce the above copyright notice,
+       this list of conditions and the following disclaimer in the documentation
+       and/or other materials provided with the distribution.
+     * Neither the name of DER-VET nor the names of its contributors
+       may be used to endorse or promote products derived from this software
+       without specific prior written permission.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+ A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+ CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+ EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+ PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+ PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+ LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+ NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+"""
+OptimizationProfile.py
+
+This file holds the OptimizationProfile class, which records how long each optimization window took to
+build and solve, and how big its problem was.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class OptimizationProfile:
+    """ Timings, problem size, solver, and status of each optimization window (one row per window),
+    saved as optimization_profile.csv with the rest of the results
+
+    """
+
+    def __init__(self):
+        self.windows = {}
+
+    def record(self, opt_window_num, **values):
+        """ Adds values to the row of an optimization window
+
+        Args:
+            opt_window_num (int): the optimization window number
+            **values: column names and their values
+
+        """
+        self.windows.setdefault(opt_window_num, {}).update(values)
+
+    def record_build_times(self, opt_window_num, build_times, kind):
+        """ Adds the time it took each DER or value stream to build its part of the problem
+
+        Args:
+            opt_window_num (int): the optimization window number
+            build_times (dict): seconds spent on each DER or value stream, keyed by its name
+            kind (str): 'DER' or 'Value Stream'
+
+        """
+        self.record(opt_window_num, **{f'{kind} build: {name} (s)': seconds for name, seconds in build_times.items()})
+
+    @staticmethod
+    def problem_size(prob):
+        """ Counts the scalar variables, scalar constraints, and nonzeros (in the constraint matrix given to the solver)
+        of a problem that has been solved
+
+        Args:
+            prob (cvx.Problem): the optimization problem
+
+        Returns: dict of the size of the problem
+
+        """
+        size_metrics = prob.size_metrics
+        return {'variables': size_metrics.num_scalar_variables,
+                'constraints': size_metrics.num_scalar_eq_constr + size_metrics.num_scalar_leq_constr,
+                'nonzeros': OptimizationProfile.nonzeros(prob)}
+
+    @staticmethod
+    def nonzeros(prob):
+        """ Number of nonzeros in the constraint matrix of a problem, taken from the parametric program that CVXPY
+        kept from the solve. A problem whose compiled form CVXPY did not keep (one that is not DPP) is not compiled
+        again just to count them, since that would take as long as its compile did.
+
+        Args:
+            prob (cvx.Problem): the optimization problem (after it has been solved)
+
+        Returns: the number of nonzeros, or NaN if it is not known
+
+        """
+        param_prog = getattr(getattr(prob, '_cache', None), 'param_prog', None)
+        if param_prog is None:
+            return np.nan
+        try:
+            # the constraint matrix is the second to last item for both cone and quadratic programs
+            return param_prog.apply_parameters()[-2].nnz
+        except (AttributeError, TypeError, ValueError):
+            return np.nan
+
+    def to_dataframe(self):
+        """ DataFrame of the profile, with a row for each optimization window that was solved """
+        if not len(self.windows):
+            return pd.DataFrame()
+        profile = pd.DataFrame.from_dict(self.windows, orient='index')
+        profile.index.name = 'Optimization Window'
+        return profile
@@ -0,0 +1,221 @@
+"""
+Copyright (c) 2024, Electric Power Research Institute
+
+ All rights reserved.
+
+ Redistribution and use in source and binary forms, with or without modification,
+ are permitted provided that the following conditions are met:
+
+     * Redistributions of source code must retain the above copyright notice,
+       this list of conditions and the following disclaimer.
+     * Redistributions in binary form must reproduce the above copyright notice,
+       this list of conditions and the following disclaimer in the documentation
+       and/or other materials provided with the distribution.
+     * Neither the name of DER-VET nor the names of its contributors
+       may be used to endorse or promote products derived from this software
+       without specific prior written permission.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+ A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+ CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+ EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+ PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+ PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+ LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+ NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+"""
+OptimizationWindow.py
+
+This file holds the OptimizationWindow class, which describes the timesteps of a single
+optimization window.
+"""
+
+import weakref
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+class OptimizationWindow:
+    """ Describes the timesteps of an optimization window by their positions within the analysis
+    horizon, so that time series data can be subset with a positional slice (instead of with a
+    boolean mask that is the length of the entire analysis horizon)
+
+    """
+    # day aggregation matrices, shared by every window with the same days (see day_aggregation)
+    DAY_AGGREGATIONS = {}
+    # indexes found to be equal to the index of an analysis horizon, shared by every window of that horizon:
+    # {id(horizon index): {id(index): index}}. Entries are dropped when their index is deleted, so an id is never
+    # reused for another index
+    ALIGNED = {}
+
+    def __init__(self, horizon_index, positions):
+        """ Initialize the window
+
+        Args:
+            horizon_index (pd.Index): the index of the entire analysis horizon
+            positions (slice, np.ndarray): the positions of the window's timesteps within
+                HORIZON_INDEX (a slice if the timesteps are contiguous)
+
+        """
+        self.horizon_index = horizon_index
+        self.positions = positions
+        self.index = horizon_index[positions]
+        self.size = len(self.index)
+        self._mask = None
+        self._day_aggregation = None
+
+    @classmethod
+    def split(cls, window_numbers):
+        """ Describes every optimization window in the analysis horizon at once
+
+        Args:
+            window_numbers (pd.Series): the optimization window number of each timestep in the
+                analysis horizon (i.e. the 'predictive' column of the optimization levels)
+
+        Returns: dictionary of OptimizationWindows, keyed by their window number
+
+        """
+        horizon_index = window_numbers.index
+        windows = {}
+        for window_num, positions in window_numbers.groupby(window_numbers.values, sort=False).indices.items():
+            windows[window_num] = cls(horizon_index, cls.as_slice(positions))
+        return windows
+
+    @classmethod
+    def from_mask(cls, mask):
+        """ Describes the window selected by a boolean mask
+
+        Args:
+            mask (pd.Series): Series of booleans, the same length as the analysis horizon. The value is
+                true if the corresponding timestep is included in the optimization window
+
+        Returns: an OptimizationWindow
+
+        """
+        return cls(mask.index, cls.as_slice(np.flatnonzero(mask.values)))
+
+    @classmethod
+    def from_index(cls, horizon_index, window_index):
+        """ Describes the window made up of the timesteps in WINDOW_INDEX
+
+        Args:
+            horizon_index (pd.Index): the index of the entire analysis horizon
+            window_index (pd.Index): the timesteps of the optimization window
+
+        Returns: an OptimizationWindow
+
+        """
+        return cls(horizon_index, cls.as_slice(horizon_index.get_indexer(window_index)))
+
+    @classmethod
+    def create(cls, window):
+        """ Compatibility with code that selects optimization windows with a boolean mask
+
+        Args:
+            window (OptimizationWindow, pd.Series): a window or a boolean mask of the window
+
+        Returns: an OptimizationWindow
+
+        """
+        if isinstance(window, cls):
+            return window
+        return cls.from_mask(window)
+
+    @staticmethod
+    def as_slice(positions):
+        """ Converts an ordered array of positions into a slice, if they are contiguous
+
+        Args:
+            positions (np.ndarray): integer positions
+
+        Returns: a slice if the positions are contiguous, otherwise POSITIONS
+
+        """
+        if not len(positions):
+            return slice(0, 0)
+        if positions[-1] - positions[0] + 1 == len(positions) and np.all(np.diff(positions) == 1):
+            return slice(int(positions[0]), int(positions[-1]) + 1)
+        return positions
+
+    @property
+    def mask(self):
+        """ Compatibility with code that expects a boolean mask of the analysis horizon
+
+        Returns: Series of booleans, true if the corresponding timestep is included in the window
+
+        """
+        if self._mask is None:
+            mask = np.zeros(len(self.horizon_index), dtype=bool)
+            mask[self.positions] = True
+            self._mask = pd.Series(mask, index=self.horizon_index)
+        return self._mask
+
+    def day_aggregation(self):
+        """ Sparse matrix (days x timesteps) that sums the values of the window's timesteps by the day of the
+        year they fall on. It is built once for each shape of days (the number of timesteps in each day) and
+        reused by every window with that shape
+
+        Returns: scipy.sparse.csr_matrix of ones and zeros
+
+        """
+        if self._day_aggregation is None:
+            days, _ = pd.factorize(self.index.dayofyear)
+            key = (self.size, days.astype(np.int32).tobytes())
+            if key not in self.DAY_AGGREGATIONS:
+                self.DAY_AGGREGATIONS[key] = sp.csr_matrix((np.ones(self.size), (days, np.arange(self.size))),
+                                                           shape=(days.max() + 1, self.size))
+            self._day_aggregation = self.DAY_AGGREGATIONS[key]
+        return self._day_aggregation
+
+    def subset(self, data):
+        """ Selects the rows of DATA that fall within the optimization window. If DATA has the same
+        index as the analysis horizon, then this is a positional slice
+
+        Args:
+            data (pd.Series, pd.DataFrame): time series data indexed by the analysis horizon
+
+        Returns: the rows of DATA within the window (the same type as DATA)
+
+        """
+        if self.is_aligned(data.index):
+            return data.iloc[self.positions]
+        return data.loc[self.index]
+
+    def values(self, data):
+        """ Selects the values of DATA that fall within the optimization window
+
+        Args:
+            data (pd.Series, pd.DataFrame): time series data indexed by the analysis horizon
+
+        Returns: numpy array of the values of DATA within the window
+
+        """
+        return self.subset(data).values
+
+    def is_aligned(self, index):
+        """ Checks whether INDEX is the index of the analysis horizon. Each index is only compared with the
+        horizon's index timestep by timestep the first time any window of the horizon sees it
+
+        Args:
+            index (pd.Index): index of some time series data
+
+        Returns: True if the positions of this window can be used to index into INDEX
+
+        """
+        if index is self.horizon_index:
+            return True
+        aligned = self.ALIGNED.get(id(self.horizon_index))
+        if aligned is None:
+            aligned = self.ALIGNED[id(self.horizon_index)] = weakref.WeakValueDictionary()
+            weakref.finalize(self.horizon_index, self.ALIGNED.pop, id(self.horizon_index), None)
+        if aligned.get(id(index)) is index:
+            return True
+        if not index.equals(self.horizon_index):
+            return False
+        aligned[id(index)] = index
+        return True
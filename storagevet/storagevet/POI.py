@@ -31,9 +31,11 @@ Copyright (c) 2024, Electric Power Research Institute
 POI.py
 
 """
+import time
 import numpy as np
 import cvxpy as cvx
 import pandas as pd
+from storagevet.OptimizationWindow import OptimizationWindow
 from storagevet.ErrorHandling import *
 
 
@@ -59,6 +61,7 @@ class POI:
         self.der_list = []
         self.der_summary = {}  # keys= names of DERs, values= DER type  (basically tech summary output)
         self.active_ders = []
+        self.build_times = {}  # seconds each active DER took to build its constraints and costs (last window built)
 
         # initialize all DERs
         for der, params_input in technology_inputs_map.items():
@@ -106,8 +109,7 @@ class POI:
         """ POI method to measure the state of POI depending on available types of DERs. used in SET_UP_OPTIMIZATION
 
         Args:
-            mask (DataFrame): DataFrame of booleans used, the same length as time_series. The value is true if the
-                        corresponding column in time_series is included in the data to be optimized.
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns:
             aggregation of loads
@@ -123,7 +125,8 @@ class POI:
             aggregation of hotwater thermal heating power (heat recovered)
             aggregation of thermal cooling power (cold recovered)
         """
-        opt_var_size = sum(mask)
+        mask = OptimizationWindow.create(mask)
+        opt_var_size = mask.size
         load_sum = cvx.Parameter(value=np.zeros(opt_var_size), shape=opt_var_size, name='POI-Zero')  # at POI
         var_gen_sum = cvx.Parameter(value=np.zeros(opt_var_size), shape=opt_var_size, name='POI-Zero')  # at POI
         gen_sum = cvx.Parameter(value=np.zeros(opt_var_size), shape=opt_var_size, name='POI-Zero')
@@ -194,8 +197,7 @@ class POI:
             Due to VS power reservations, control constraints, import/export constraints, and energy throughput requirements
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
             power_in (cvx.Expression):
             power_out (cvx.Expression):
             steam_in (cvx.Expression):
@@ -209,8 +211,9 @@ class POI:
             A list of constraints being set by the POI: power reservations, control constraints requirements,
                 max import, max export, etc.
         """
+        mask = OptimizationWindow.create(mask)
         constraint_list = []
-        opt_size = sum(mask)
+        opt_size = mask.size
         obj_expression = {}  # dict of objective costs
 
         # deal with grid_charge constraint btw ESS and PV
@@ -223,11 +226,14 @@ class POI:
         agg_inv_max = 0
         dc_coupled_pvs = False
 
+        self.build_times = {}
         for der_instance in self.active_ders:
+            start = time.time()
             # add all operational constraints
             constraint_list += der_instance.constraints(mask)
             # add DER cost funcs
             obj_expression.update(der_instance.objective_function(mask, annuity_scalar))
+            self.build_times[der_instance.unique_tech_id()] = time.time() - start
             if der_instance.tag == 'PV':
                 if not der_instance.grid_charge:
                     allow_charge_from_grid = False
@@ -284,8 +290,7 @@ class POI:
         DERVET's logic does not allow intermittent resources to participate in ancillary markets
 
         Args:
-            mask (DataFrame): DataFrame of booleans used, the same length as time_series. The value is true if the
-                        corresponding column in time_series is included in the data to be optimized.
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns:
             total ability to pull power down from the grid by discharging less
@@ -294,14 +299,15 @@ class POI:
             total ability to push power up into the grid by charging less
             total energy stored/delivered during sub-time-step activities
         """
-        opt_size = sum(mask)
+        mask = OptimizationWindow.create(mask)
+        opt_size = mask.size
         agg_dis_up = cvx.Parameter(value=np.zeros(opt_size), shape=opt_size, name='POI-Zero')
         agg_dis_down = cvx.Parameter(value=np.zeros(opt_size), shape=opt_size, name='POI-Zero')
         agg_ch_up = cvx.Parameter(value=np.zeros(opt_size), shape=opt_size, name='POI-Zero')
         agg_ch_down = cvx.Parameter(value=np.zeros(opt_size), shape=opt_size, name='POI-Zero')
         uenergy_incr = cvx.Parameter(value=np.zeros(opt_size), shape=opt_size, name='POI-Zero')
         uenergy_decr = cvx.Parameter(value=np.zeros(opt_size), shape=opt_size, name='POI-Zero')
-        uenergy_thru = cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name='ServiceAggZero')
+        uenergy_thru = cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name='ServiceAggZero')
 
         for der_in_market_participation in self.active_ders:
             if der_in_market_participation.can_participate_in_market_services:
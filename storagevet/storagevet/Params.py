@@ -42,6 +42,7 @@ import numpy as np
 import pandas as pd
 
 from storagevet.ErrorHandling import *
+from storagevet.DataCache import DataCache
 from storagevet.Finances import Financial
 from storagevet.Library import create_timeseries_index, is_leap_yr, truncate_float
 
@@ -71,6 +72,7 @@ class Params:
     instances = None
     template = None
     referenced_data = None  # for a scenario in the sensitivity analysis
+    data_cache = None  # parsed referenced data files, kept on disk between runs
 
     results_inputs = None
 
@@ -84,7 +86,8 @@ class Params:
     def initialize(cls, filename, verbose):
         """ This function 1) converts CSV into JSON; 2) read in the JSON; 3) convert indirect data
         references into direct data; 4) create instances from Sensitivity Analysis and Coupling
-        values
+        values; 5) check the inputs of every instance, and prepare the first one (the rest are prepared by
+        load_and_prepare, as they are run)
 
             Args:
                 filename (string): filename of JSON or CSV model parameter
@@ -111,6 +114,7 @@ class Params:
             "customer_tariff": dict(),
             "cycle_life": dict(),
             "yearly_data": dict()}
+        cls.data_cache = DataCache()
 
         timestamp_now = datetime.now().strftime('%Y-%m-%d_%H%M%S%f')[:19]
         cls.results_inputs = {'label': '',
@@ -175,7 +179,9 @@ class Params:
         # build each of the cases that need to be run based on the model parameter inputed
         cls.build_case_definitions()
         cls.case_builder()
-        cls.load_and_prepare()
+
+        # 5) CHECK EVERY CASE, so that errors in the input data are reported before any case is solved
+        cls.validate_cases()
 
         return cls.instances
 
@@ -323,6 +329,7 @@ class Params:
         # attributes to be set after datasets are loaded and all instances are made
         self.POI = None
         self.Load = None
+        self.prepared = False  # True once prepare_case has loaded this instance's data
 
     @classmethod
     def read_and_validate(cls, name):
@@ -998,10 +1005,12 @@ class Params:
             TellUser.warning(message)
             return False
 
-    @staticmethod
-    def read_from_file(name, filename, ind_col=None):
+    @classmethod
+    def read_from_file(cls, name, filename, ind_col=None):
         """ Read data from csv or excel file.
             This is how we read in data that is not the model parameter file.
+            If the file has not changed since it was last parsed, then the parsed data is taken
+            from the data cache instead.
 
         Args:
             name (str): name of data to read
@@ -1019,6 +1028,13 @@ class Params:
             # replace any backslashes with forward slash
             filename = filename.replace('\\', '/')
 
+            if cls.data_cache is None:
+                cls.data_cache = DataCache()
+            cache_key = cls.data_cache.key(name, filename, ind_col)
+            cached = cls.data_cache.load(cache_key, filename)
+            if cached is not None:
+                return cls.make_read_only(cached)
+
             # logic for time_series data
             parse_dates = name == 'time_series'
             # only pd.read_csv() can handle parse_dates=True
@@ -1068,7 +1084,33 @@ class Params:
             # NOTE: the GUI uses unique strings (not integers) for the Billing Period
             raw.index = raw.index.astype(str)
 
-        return raw
+        if not raw.empty:
+            cls.data_cache.save(cache_key, raw, filename)
+        return cls.make_read_only(raw)
+
+    @staticmethod
+    def make_read_only(frame):
+        """ Rebuilds FRAME from read-only views of its columns. Referenced data is shared by every case
+        that references it (each case gets a shallow copy), so an in-place write to the shared values
+        raises instead of changing the data of other cases. A case that needs to change its data gets its
+        own copy by assigning whole columns (or by copying the frame).
+
+        Args:
+            frame (DataFrame): referenced data
+
+        Returns: a DataFrame with the same labels and values as FRAME
+
+        """
+        columns = {}
+        for position, dtype in enumerate(frame.dtypes):
+            column = frame.iloc[:, position]
+            if isinstance(dtype, np.dtype):
+                column = column.to_numpy(copy=False)
+                column.flags.writeable = False
+            columns[position] = column
+        read_only = pd.DataFrame(columns, index=frame.index, copy=False)
+        read_only.columns = frame.columns
+        return read_only
 
     @classmethod
     def case_builder(cls):
@@ -1110,26 +1152,111 @@ class Params:
 
     @classmethod
     def load_and_prepare(cls):
-        """ Flattens each tag that the Schema has defined to only have 1 allowed.
+        """ Generator of the cases to run, in order. Each case is prepared just before it is yielded, and
+        let go of once the next case is asked for (after the case has been solved and its results have been
+        saved), so only one case's data is held at a time no matter how many cases there are.
+
+        Yields: the key of the case and its prepared instance of Params
+
+        """
+        for case in list(cls.instances.keys()):
+            yield case, cls.prepare_case(case)
+            cls.instances[case] = None
+
+    @classmethod
+    def validate_cases(cls):
+        """ Checks the inputs of every case that do not need any data (see check_inputs), so that errors in
+        them are reported before any case is solved, then prepares the first case (it is run first). The other
+        cases are prepared once, as they are run, by load_and_prepare.
 
-        Returns a params class where the tag attributes that are not allowed to have more than one
-        set of key inputs are just dictionaries of their key inputs (while the rest remain
-        dictionaries of the sets of key inputs)
         """
-        tag_tree = cls.schema_dct.get("tags")
         for case, slf in cls.instances.items():
-            TellUser.info(f"Loading case {case}...")
-            for tag, tag_attr in tag_tree.items():
-                if tag not in ['Results']:
-                    max_num = tag_attr.get('max_num')
-                    if max_num is not None and int(max_num) == 1:
-                        setattr(slf, tag, slf.flatten_tag_id(getattr(slf, tag)))
-            slf.load_data_sets()
-            slf.load_scenario()
-            slf.load_finance()
-            slf.load_technology()
-            slf.load_services()
-        # report back any warning
+            TellUser.debug(f"Checking the inputs of case {case}...")
+            slf.check_inputs()
+        cls.raise_recorded_errors()
+        cls.prepare_case(next(iter(cls.instances)))
+
+    @classmethod
+    def prepare_case(cls, case):
+        """ Prepares a case (see prepare) and raises an error if any were recorded while doing so
+
+        Args:
+            case (int): key of the case in INSTANCES
+
+        Returns: the prepared instance of Params
+
+        """
+        slf = cls.instances[case]
+        if slf.prepared:
+            return slf
+        TellUser.info(f"Loading case {case}...")
+        slf.prepare()
+        cls.raise_recorded_errors()
+        slf.prepared = True
+        return slf
+
+    def check_inputs(self):
+        """ Error checks the inputs of the case that can be checked without loading any data (ex. that a
+        maximum rating is not less than its minimum rating). Errors found are recorded.
+
+        """
+        # validation checks for a CAES's parameters
+        for id_str, caes_inputs in self.CAES.items():
+            if caes_inputs['ch_min_rated'] > caes_inputs['ch_max_rated']:
+                self.record_input_error(f"CAES #{id_str} ch_max_rated < " +
+                                        f"ch_min_rated. ch_max_rated should " +
+                                        f"be greater than ch_min_rated")
+
+            if caes_inputs['dis_min_rated'] > caes_inputs['dis_max_rated']:
+                self.record_input_error(f"CAES #{id_str} dis_max_rated < " +
+                                        f"dis_min_rated. dis_max_rated " +
+                                        f"should be greater than " +
+                                        f"dis_min_rated")
+
+        # validation checks for a Battery's parameters
+        for id_str, bat_input in self.Battery.items():
+            # max ratings should be greater than min rating - power and energy
+            if bat_input['ch_min_rated'] > bat_input['ch_max_rated']:
+                self.record_input_error(f"Battery #{id_str} ch_max_rated < " +
+                                        f"ch_min_rated. ch_max_rated should " +
+                                        f"be greater than ch_min_rated")
+
+            if bat_input['dis_min_rated'] > bat_input['dis_max_rated']:
+                self.record_input_error(
+                    f"Battery #{id_str} dis_max_rated < dis_min_rated. dis_max_rated should be greater than dis_min_rated")
+
+            if bat_input['ulsoc'] < bat_input['llsoc']:
+                self.record_input_error(
+                    f"Battery #{id_str} ulsoc < llsoc. ulsoc should be greater than llsoc")
+
+            if bat_input['soc_target'] < bat_input['llsoc']:
+                self.record_input_error(
+                    f"Battery #{id_str} soc_target < llsoc. soc_target should be greater than llsoc")
+
+    def prepare(self):
+        """ Flattens each tag that the Schema has defined to only have 1 allowed, and loads the case's data
+        sets, scenario, finance, technology, and service inputs. Errors found in them are recorded.
+
+        Tag attributes that are not allowed to have more than one set of key inputs become just
+        dictionaries of their key inputs (while the rest remain dictionaries of the sets of key inputs)
+
+        """
+        tag_tree = self.schema_dct.get("tags")
+        for tag, tag_attr in tag_tree.items():
+            if tag not in ['Results']:
+                max_num = tag_attr.get('max_num')
+                if max_num is not None and int(max_num) == 1:
+                    setattr(self, tag, self.flatten_tag_id(getattr(self, tag)))
+        self.load_data_sets()
+        self.load_scenario()
+        self.load_finance()
+        self.load_technology()
+        self.load_services()
+
+    @classmethod
+    def raise_recorded_errors(cls):
+        """ Raises an error if any were recorded while preparing a case
+        """
         if cls.input_error_raised:
             TellUser.close_log()
             raise ModelParameterError(
@@ -1179,26 +1306,29 @@ class Params:
         scenario = self.Scenario
         finance = self.Finance
 
-        self.set_copy_of_referenced_data("time_series", scenario)
-        self.set_copy_of_referenced_data("monthly_data", scenario)
-        self.set_copy_of_referenced_data("customer_tariff", finance)
-        self.set_copy_of_referenced_data("yearly_data", finance)
+        self.set_view_of_referenced_data("time_series", scenario)
+        self.set_view_of_referenced_data("monthly_data", scenario)
+        self.set_view_of_referenced_data("customer_tariff", finance)
+        self.set_view_of_referenced_data("yearly_data", finance)
         if self.Battery is not None:
             # iterate through sets of Battery inputs
             for battery_input_tree in self.Battery.values():
-                self.set_copy_of_referenced_data("cycle_life", battery_input_tree)
+                self.set_view_of_referenced_data("cycle_life", battery_input_tree)
 
         TellUser.info("Data sets are loaded successfully.")
 
-    def set_copy_of_referenced_data(self, filename, tag_tree):
+    def set_view_of_referenced_data(self, filename, tag_tree):
         """ Grabs referenced data and adds it to the TAG_TREE dictionary with the key FILENAME
+        The data is a shallow copy, so every case that references the same file shares its (read-only)
+        values, and only the labels (index and columns) belong to this case.
+
             Args:
                 filename (str): name of the file to be added (FILENAME + "_filename")
                 tag_tree (dict): tag to save data in
 
         """
         filepath = tag_tree[f"{filename}_filename"]
-        tag_tree[filename] = copy.deepcopy(self.referenced_data[filename][filepath])
+        tag_tree[filename] = self.referenced_data[filename][filepath].copy(deep=False)
 
     def load_scenario(self):
         """ Error checks, interprets user given data and prepares it for Scenario initialization.
@@ -1229,6 +1359,7 @@ class Params:
         # set dt to be exactly dt
         scenario['dt'] = dt_exact
         # process time series and save it in place of the raw data
+        # (sort_index copies the shared, read-only data, so each case owns its time series)
         time_series = self.process_time_series(raw_time_series, freq, dt_exact, opt_years)
         scenario["time_series"] = time_series
         # report on any missing values from each time series
@@ -1420,6 +1551,8 @@ class Params:
 
         """
         if not monthly_data.empty:
+            # relabel a view, so that the referenced data (shared with other cases) keeps its index
+            monthly_data = monthly_data.copy(deep=False)
             monthly_data.index = pd.PeriodIndex.from_fields(
                 year=monthly_data.index.get_level_values(0).values,
                 month=monthly_data.index.get_level_values(1).values,
@@ -1504,42 +1637,13 @@ class Params:
             # then no name_lst was inherited so initialize as list type
             names_list = []
 
-        # validation checks for a CAES's parameters
+        # the inputs that need no data were checked by check_inputs
         for id_str, caes_inputs in self.CAES.items():
             names_list.append(caes_inputs['name'])
-            if caes_inputs['ch_min_rated'] > caes_inputs['ch_max_rated']:
-                self.record_input_error(f"CAES #{id_str} ch_max_rated < " +
-                                        f"ch_min_rated. ch_max_rated should " +
-                                        f"be greater than ch_min_rated")
-
-            if caes_inputs['dis_min_rated'] > caes_inputs['dis_max_rated']:
-                self.record_input_error(f"CAES #{id_str} dis_max_rated < " +
-                                        f"dis_min_rated. dis_max_rated " +
-                                        f"should be greater than " +
-                                        f"dis_min_rated")
             # add scenario case parameters to CAES dictionary
             caes_inputs.update({'binary': binary, 'dt': dt})
 
-        # validation checks for a Battery's parameters
         for id_str, bat_input in self.Battery.items():
-            # max ratings should be greater than min rating - power and energy
-            if bat_input['ch_min_rated'] > bat_input['ch_max_rated']:
-                self.record_input_error(f"Battery #{id_str} ch_max_rated < " +
-                                        f"ch_min_rated. ch_max_rated should " +
-                                        f"be greater than ch_min_rated")
-
-            if bat_input['dis_min_rated'] > bat_input['dis_max_rated']:
-                self.record_input_error(
-                    f"Battery #{id_str} dis_max_rated < dis_min_rated. dis_max_rated should be greater than dis_min_rated")
-
-            if bat_input['ulsoc'] < bat_input['llsoc']:
-                self.record_input_error(
-                    f"Battery #{id_str} ulsoc < llsoc. ulsoc should be greater than llsoc")
-
-            if bat_input['soc_target'] < bat_input['llsoc']:
-                self.record_input_error(
-                    f"Battery #{id_str} soc_target < llsoc. soc_target should be greater than llsoc")
-
             # add scenario case parameters to battery parameter dictionary
             bat_input.update({'binary': binary,
                               'dt': dt})
@@ -1790,10 +1894,10 @@ class Params:
                                                  (lambda x: x.lower())) == 'energy', :],
                                              'dt': dt})
             if self.DCM is not None:
-                self.DCM.update({'tariff': tariff.loc[
-                                           tariff.Charge.apply((lambda x: x.lower())) == 'demand',
-                                           :],
-                                 'billing_period': retail_prices.loc[:, 'billing_period'],
+                demand_tariff = tariff.loc[tariff.Charge.apply((lambda x: x.lower())) == 'demand', :]
+                self.DCM.update({'tariff': demand_tariff,
+                                 'billing_period': Financial.create_bill_period_table(demand_tariff,
+                                                                                      retail_prices.index),
                                  'dt': dt})
 
         TellUser.info("Successfully prepared the value-stream (services)")
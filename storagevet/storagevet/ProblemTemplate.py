@@ -0,0 +1,263 @@
+"""
+Copyright (c) 2024, Electric Power Research Institute
+
+ All rights reserved.
+
+ Redistribution and use in source and binary forms, with or without modification,
+ are permitted provided that the following conditions are met:
+
+     * Redistributions of source code must retain the above copyright notice,
+       this list of conditions and the following disclaimer.
+     * Redistributions in binary form must reproduce the above copyright notice,
+       this list of conditions and the following disclaimer in the documentation
+       and/or other materials provided with the distribution.
+     * Neither the name of DER-VET nor the names of its contributors
+       may be used to endorse or promote products derived from this software
+       without specific prior written permission.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+ A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+ CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+ EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+ PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+ PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+ LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+ NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+"""
+ProblemTemplate.py
+
+This file holds the ProblemTemplate class, which lets optimization windows with the same structure
+share one parametric (DPP) CVXPY problem.
+"""
+
+import numpy as np
+import scipy.sparse as sp
+import cvxpy as cvx
+from cvxpy.constraints.constraint import Constraint
+from cvxpy.expressions.constants import Constant, Parameter
+from cvxpy.expressions.expression import Expression
+from cvxpy.expressions.variable import Variable
+
+
+class TemplateMismatch(Exception):
+    """ Raised when an optimization window does not have the same structure as another """
+    pass
+
+
+class ProblemTemplate:
+    """ A parametric copy of the optimization problem of a window. Any part of the problem that does not
+    depend on an optimization variable (prices, loads, limits, etc.) and was found to change between
+    windows is replaced with a cvx.Parameter. Windows with the same structure only have to update the
+    values of these parameters, so CVXPY only has to canonicalize the problem once.
+
+    The objective and constraints of a window are compared with the template by walking the expression
+    trees of both together, so the template never has to know how the DERs and value streams built them.
+    This means every window still builds its own CVXPY problem (only the canonicalization is shared), and
+    that the parts that change are only known from the windows compared so far (see Scenario.problem_template).
+
+    """
+    CONSTRAINT_TYPES = (cvx.constraints.Zero, cvx.constraints.NonPos, cvx.constraints.NonNeg,
+                        cvx.constraints.Inequality, cvx.constraints.Equality)
+
+    def __init__(self, objective, constraints, varying):
+        """ Builds the template from the objective and constraints of an optimization window
+
+        Args:
+            objective (cvx.Minimize): objective of the optimization window
+            constraints (list): constraints of the optimization window
+            varying (set): the variable-free parts of the problem (numbered in the order they are walked)
+                that change from window to window. Only these become parameters
+
+        """
+        self.varying = varying
+        self.variables = {}  # template variables, keyed by the id of the window's variable
+        self.window_variables = {}  # variables of the window last loaded, keyed by the id of the template variable
+        self.has_variables = {}
+        self.count = 0
+        self.problem = cvx.Problem(self.template(objective), [self.template(constraint) for constraint in constraints])
+        self.has_variables = {}
+
+    @classmethod
+    def create(cls, previous_window, objective, constraints, varying=frozenset()):
+        """ Builds a template from two optimization windows
+
+        Args:
+            previous_window (tuple): the objective and constraints of an earlier window (or of a template)
+            objective (cvx.Minimize): objective of the current optimization window
+            constraints (list): constraints of the current optimization window
+            varying (set): parts of the problem that are known to change, even if they are the same in both
+                windows (the parameters of an earlier template)
+
+        Returns: a ProblemTemplate loaded with the current window, or None if the parametric problem does not
+            follow the DPP rules
+
+        Raises: TemplateMismatch if the two windows do not have the same structure
+
+        """
+        comparison = cls.__new__(cls)
+        comparison.has_variables = {}
+        comparison.window_variables = {}
+        changes = []
+        comparison.walk_problem(previous_window[0], previous_window[1], objective, constraints,
+                                lambda node1, node2: changes.append(not cls.same_value(node1.value, node2.value)))
+        try:
+            template = cls(objective, constraints, {number for number, changed in enumerate(changes) if changed} | set(varying))
+        except (ValueError, TypeError):
+            return None
+        if not template.problem.is_dcp(dpp=True) or not template.load(objective, constraints):
+            return None
+        return template
+
+    def contains_variables(self, node):
+        """ True if an expression depends on an optimization variable (results are memoized) """
+        key = id(node)
+        if key not in self.has_variables:
+            if isinstance(node, Variable):
+                self.has_variables[key] = True
+            else:
+                self.has_variables[key] = any(self.contains_variables(arg) for arg in node.args)
+        return self.has_variables[key]
+
+    def template(self, node):
+        """ Copies an objective, constraint, or expression -- replacing its variables with template variables
+        and the parts of it that change between windows with parameters
+
+        Args:
+            node (cvx.Canonical): the objective, constraint, or expression to copy
+
+        Returns: the template copy of NODE
+
+        """
+        if isinstance(node, Variable):
+            key = id(node)
+            if key not in self.variables:
+                attributes = {name: value for name, value in node.attributes.items() if value is not None and value is not False}
+                self.variables[key] = Variable(node.shape, name=node.name(), **attributes)
+            return self.variables[key]
+        if isinstance(node, Expression) and not self.contains_variables(node):
+            value = node.value
+            self.count += 1
+            if value is None:
+                raise TemplateMismatch
+            if self.count - 1 not in self.varying:
+                return Constant(value)
+            if sp.issparse(value):
+                # CVXPY parameters can not be sparse
+                raise TemplateMismatch
+            nonneg = node.is_nonneg()
+            return Parameter(node.shape, value=value, nonneg=nonneg, nonpos=node.is_nonpos() and not nonneg)
+        args = [self.template(arg) for arg in node.args]
+        if isinstance(node, Constraint):
+            if not isinstance(node, self.CONSTRAINT_TYPES):
+                raise TemplateMismatch
+            return type(node)(*args)
+        return node.copy(args)
+
+    def load(self, objective, constraints):
+        """ Fits an optimization window to this template: updates the parameter values and matches the window's
+        variables to the template's variables
+
+        Args:
+            objective (cvx.Minimize): objective of the optimization window
+            constraints (list): constraints of the optimization window
+
+        Returns: True if the window fits the template, False otherwise
+
+        """
+        self.window_variables = {}
+        try:
+            self.walk_problem(self.problem.objective, self.problem.constraints, objective, constraints, self.update)
+        except (TemplateMismatch, ValueError):
+            return False
+        finally:
+            self.has_variables = {}
+        return True
+
+    @classmethod
+    def update(cls, template_node, node):
+        """ Gives a parameter of the template the value of the same part of the window's problem """
+        value = node.value
+        if isinstance(template_node, Parameter) and value is not None:
+            # raises a ValueError if VALUE does not have the same sign as the parameter
+            template_node.value = value
+        elif not cls.same_value(template_node.value, value):
+            raise TemplateMismatch
+
+    def walk_problem(self, objective1, constraints1, objective2, constraints2, visit):
+        """ Walks the expression trees of two problems together
+
+        Args:
+            objective1 (cvx.Minimize): the objective of the first problem
+            constraints1 (list): the constraints of the first problem
+            objective2 (cvx.Minimize): the objective of the second problem
+            constraints2 (list): the constraints of the second problem
+            visit (function): called on each pair of variable-free parts of the problems
+
+        Raises: TemplateMismatch if the problems do not have the same structure
+
+        """
+        if len(constraints1) != len(constraints2):
+            raise TemplateMismatch
+        paired = {}
+        self.walk(objective1, objective2, visit, paired)
+        for constraint1, constraint2 in zip(constraints1, constraints2):
+            self.walk(constraint1, constraint2, visit, paired)
+
+    def walk(self, node1, node2, visit, paired):
+        """ Walks two expressions together
+
+        Args:
+            node1 (cvx.Canonical): part of the first problem
+            node2 (cvx.Canonical): the same part of the second problem
+            visit (function): called on each pair of variable-free parts of the expressions
+            paired (dict): the variables of the first problem matched to a variable of the second so far
+
+        Raises: TemplateMismatch if the expressions do not have the same structure
+
+        """
+        if getattr(node1, 'shape', None) != getattr(node2, 'shape', None):
+            raise TemplateMismatch
+        if isinstance(node1, Variable):
+            if not isinstance(node2, Variable) or self.window_variables.setdefault(id(node1), node2) is not node2 \
+                    or paired.setdefault(id(node2), node1) is not node1:
+                raise TemplateMismatch
+            if any(node1.attributes[name] != value for name, value in node2.attributes.items() if name != 'sparsity'):
+                raise TemplateMismatch
+            return
+        if isinstance(node1, Expression) and not self.contains_variables(node1):
+            if not isinstance(node2, Expression) or self.contains_variables(node2):
+                raise TemplateMismatch
+            visit(node1, node2)
+            return
+        if type(node1) is not type(node2) or len(node1.args) != len(node2.args):
+            raise TemplateMismatch
+        if not isinstance(node1, Constraint) and not self.same_value(node1.get_data(), node2.get_data()):
+            raise TemplateMismatch
+        for arg1, arg2 in zip(node1.args, node2.args):
+            self.walk(arg1, arg2, visit, paired)
+
+    @classmethod
+    def same_value(cls, data1, data2):
+        """ Compares two values (or the data -- axis, indices, etc. -- that describes two atoms) """
+        if isinstance(data1, (list, tuple)) and isinstance(data2, (list, tuple)):
+            return len(data1) == len(data2) and all(cls.same_value(d1, d2) for d1, d2 in zip(data1, data2))
+        if sp.issparse(data1) or sp.issparse(data2):
+            return sp.issparse(data1) and sp.issparse(data2) and data1.shape == data2.shape and \
+                (data1 != data2).nnz == 0
+        if isinstance(data1, np.ndarray) or isinstance(data2, np.ndarray):
+            return np.array_equal(data1, data2)
+        try:
+            return bool(data1 == data2)
+        except (ValueError, TypeError):
+            return False
+
+    def save_window_solution(self):
+        """ Copies the optimal values of the template's variables to the variables of the window last loaded """
+        for template_variable in self.variables.values():
+            window_variable = self.window_variables.get(id(template_variable))
+            if window_variable is not None:
+                window_variable.save_value(template_variable.value)
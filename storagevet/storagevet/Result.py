@@ -62,7 +62,7 @@ class Result:
         cls.instances = {}
         cls.dir_abs_path = Path(results_params['dir_absolute_path'])
         cls.csv_label = results_params.get('label', '') # optional parameter
-        cls.sensitivity_df = case_definitions
+        cls.sensitivity_df = case_definitions.copy()  # Params still needs the original column names
 
         # data frame of all the sensitivity instances
         cls.sensitivity = (not cls.sensitivity_df.empty)
@@ -73,6 +73,47 @@ class Result:
             cls.sensitivity_df.columns = human_readable_names
             cls.sensitivity_df.index.name = 'Case Number'
 
+    @classmethod
+    def class_inputs(cls):
+        """ Collects the class attributes that every instance relies on, so that the class can be
+        rebuilt within a worker process (see set_class_inputs)
+
+        Returns: dictionary of class attribute names and their values
+
+        """
+        return {'dir_abs_path': cls.dir_abs_path,
+                'csv_label': cls.csv_label,
+                'sensitivity': cls.sensitivity,
+                'sensitivity_df': cls.sensitivity_df}
+
+    @classmethod
+    def set_class_inputs(cls, class_inputs):
+        """ Sets the class attributes collected by class_inputs (in another process) without
+        re-applying the human readable sensitivity column names that initialize creates.
+
+        Args:
+            class_inputs (Dict): result of the class_inputs method
+
+        """
+        cls.instances = {}
+        for attribute, value in class_inputs.items():
+            setattr(cls, attribute, value)
+
+    @classmethod
+    def add_finished_instance(cls, key, template):
+        """ Keep track of a Result instance that has already collected its results, calculated its
+        CBA, and saved its CSVs (i.e. add_instance was called within a worker process)
+
+        Args:
+            key (int): the key that corresponds to the value this instance corresponds to within
+                the df_analysis dataFrame from the Params class.
+            template (Result): the finished Result instance
+
+        """
+        cls.instances.update({key: template})
+        # sensitivity_summary expects the instances to be in case order
+        cls.instances = dict(sorted(cls.instances.items()))
+
     @classmethod
     def add_instance(cls, key, scenario):
         """
@@ -115,6 +156,7 @@ class Result:
         self.poi = scenario.poi
         self.service_agg = scenario.service_agg
         self.objective_values = scenario.objective_values
+        self.optimization_profile = scenario.optimization_profile.to_dataframe()
         self.cost_benefit_analysis = scenario.cost_benefit_analysis
         self.opt_engine = scenario.opt_engine
 
@@ -202,6 +244,9 @@ class Result:
         self.time_series_data.index.rename('Start Datetime (hb)', inplace=True)
         self.time_series_data.sort_index(axis=1, inplace=True)  # sorts by column name alphabetically
         self.time_series_data.to_csv(path_or_buf=Path(savepath, f'timeseries_results{suffix}'))
+        # build and solve times of each optimization window
+        if not self.optimization_profile.empty:
+            self.optimization_profile.to_csv(path_or_buf=Path(savepath, f'optimization_profile{suffix}'))
         # monthly data
         self.monthly_data.to_csv(path_or_buf=Path(savepath, f'monthly_data{suffix}'))
         # technology summary
@@ -0,0 +1,167 @@
+"""
+Copyright (c) 2024, Electric Power Research Institute
+
+ All rights reserved.
+
+ Redistribution and use in source and binary forms, with or without modification,
+ are permitted provided that the following conditions are met:
+
+     * Redistributions of source code must retain the above copyright notice,
+       this list of conditions and the following disclaimer.
+     * Redistributions in binary form must reproduce the above copyright notice,
+       this list of conditions and the following disclaimer in the documentation
+       and/or other materials provided with the distribution.
+     * Neither the name of DER-VET nor the names of its contributors
+       may be used to endorse or promote products derived from this software
+       without specific prior written permission.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+ A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+ CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+ EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+ PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+ PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+ LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+ NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+"""
+ResultsBuffer.py
+
+This file holds the ResultsBuffer class, which collects the solution of each optimization window.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class ResultsBuffer:
+    """ Collects the values of optimization variables, window by window, into NumPy arrays that are
+    allocated for the entire optimization horizon (instead of concatenating a DataFrame for every
+    optimization window). The DataFrame is only built when it is asked for.
+
+    """
+
+    def __init__(self, horizon_index=None, columns=None):
+        """ Initialize the buffer
+
+        Args:
+            horizon_index (pd.Index): the index of every timestep that could be optimized. If None,
+                then the solution of each window is kept as is, and concatenated once when asked for
+            columns (list): names of variables to include in the DataFrame, even if they are never saved
+
+        """
+        self.horizon_index = horizon_index
+        self.columns = list(columns) if columns is not None else []
+        self.arrays = {}
+        self.windows = []
+        self.solved = None
+        if horizon_index is not None:
+            self.solved = np.zeros(len(horizon_index), dtype=bool)
+        self._frame = None
+
+    @classmethod
+    def from_frame(cls, frame):
+        """ Compatibility with code that assigns a DataFrame of variable values directly
+
+        Args:
+            frame (pd.DataFrame): variable values, indexed by timestep
+
+        Returns: a ResultsBuffer that holds FRAME
+
+        """
+        buffer = cls(columns=frame.columns)
+        if not frame.empty:
+            buffer.windows.append(frame)
+        buffer._frame = frame
+        return buffer
+
+    def save(self, values, subs_index):
+        """ Saves the values of the variables that were solved for in an optimization window
+
+        Args:
+            values (dict): variable values (arrays the length of SUBS_INDEX), keyed by variable name
+            subs_index (pd.Index): index of the subset of data for which the variables were solved for
+
+        """
+        self._frame = None
+        positions = self.positions(subs_index)
+        if positions is None:
+            self.windows.append(pd.DataFrame(values, index=subs_index))
+            return
+        for name, value in values.items():
+            if name not in self.arrays:
+                self.arrays[name] = np.full(len(self.horizon_index), np.nan)
+            self.arrays[name][positions] = value
+        self.solved[positions] = True
+
+    def positions(self, subs_index):
+        """ Finds where the timesteps in SUBS_INDEX are in the optimization horizon
+
+        Args:
+            subs_index (pd.Index): index of the subset of data for which the variables were solved for
+
+        Returns: a slice (or array of positions) into the horizon, or None if there is no horizon or
+            SUBS_INDEX does not fall within it
+
+        """
+        if self.horizon_index is None or not len(subs_index) or self.windows:
+            return None
+        start = self.horizon_index.get_indexer(subs_index[:1])[0]
+        if start >= 0 and start + len(subs_index) <= len(self.horizon_index) and \
+                self.horizon_index[start + len(subs_index) - 1] == subs_index[-1]:
+            return slice(start, start + len(subs_index))
+        positions = self.horizon_index.get_indexer(subs_index)
+        if np.any(positions < 0):
+            return None
+        return positions
+
+    def frame(self, sort=True):
+        """ Builds the DataFrame of every variable value saved so far
+
+        Args:
+            sort (bool): sort the columns by name
+
+        Returns: DataFrame indexed by the timesteps that have been solved for, with a column per variable
+
+        """
+        if self._frame is not None:
+            return self._frame
+        frames = []
+        if self.solved is not None and self.solved.any():
+            frames.append(pd.DataFrame({name: array[self.solved] for name, array in self.arrays.items()},
+                                       index=self.horizon_index[self.solved]))
+        frames += self.windows
+        if not frames:
+            frame = pd.DataFrame(columns=self.columns)
+        elif len(frames) > 1:
+            frame = pd.concat(frames, sort=sort)
+        else:
+            frame = frames[0].sort_index(axis=1) if sort else frames[0]
+        self._frame = frame
+        return frame
+
+    def between(self, name, start, end):
+        """ The values of a single variable between two timesteps (without building the DataFrame)
+
+        Args:
+            name (str): the variable
+            start (pd.Timestamp): the first timestep
+            end (pd.Timestamp): the last timestep
+
+        Returns: pd.Series of the solved values of NAME from START to END (inclusive)
+
+        """
+        if self.windows or self.solved is None:
+            return self.frame().loc[start:end, name]
+        positions = self.horizon_index.slice_indexer(start, end)
+        solved = self.solved[positions]
+        return pd.Series(self.arrays[name][positions][solved], index=self.horizon_index[positions][solved],
+                         name=name)
+
+    @property
+    def empty(self):
+        """ True if no variable values have been saved """
+        return not self.windows and (self.solved is None or not self.solved.any())
@@ -101,6 +101,12 @@ from storagevet.Technology.InternalCombustionEngine import ICE
 from storagevet.Technology.Load import Load
 from storagevet.ServiceAggregator import ServiceAggregator
 from storagevet.POI import POI
+from storagevet.OptimizationWindow import OptimizationWindow
+from storagevet.ProblemTemplate import ProblemTemplate, TemplateMismatch
+from storagevet.SolverStrategy import SolverStrategy
+from storagevet.OptimizationProfile import OptimizationProfile
+from storagevet.WindowPool import WindowSolution, solve_windows
+from storagevet.SolutionCache import SolutionCache, CachedSolution
 import storagevet.Finances as Fin
 import storagevet.Library as Lib
 from storagevet.ErrorHandling import *
@@ -132,6 +138,10 @@ class Scenario(object):
         'DCM': DemandChargeReduction,
         'retailTimeShift': EnergyTimeShift,
     }
+    # when batching windows, windows are stacked into one problem until it has about this many timesteps
+    BATCH_TIMESTEPS = 744
+    # most passes over the optimization windows when solving them in parallel with a predicted degradation
+    DEGRADATION_PASSES = 3
 
     def __init__(self, input_tree):
         """ Initialize a scenario.
@@ -158,6 +168,16 @@ class Scenario(object):
         self.opt_years = input_tree.Scenario['opt_years']
         self.incl_binary = input_tree.Scenario['binary']
         self.incl_slack = input_tree.Scenario['slack']
+        self.solver_strategy = SolverStrategy.from_params(input_tree.Scenario)
+        self.solution_cache = SolutionCache.from_params(input_tree.Scenario)
+        self.window_workers = int(input_tree.Scenario.get('window_workers') or 1)
+        self.batch_windows = bool(input_tree.Scenario.get('batch_windows'))
+        # degradation progress that each optimization window is solved with, keyed by window, then by the position
+        # of the DER in the POI's der_list (see solve_windows_with_predicted_degradation)
+        self.window_degradation = {}
+        # saves the progress of the optimization loop, if set by StorageVET or DERVET (see Checkpoint)
+        self.checkpoint = None
+        self.solved_windows = []
         self.def_growth = input_tree.Scenario['def_growth']/100
         self.frequency = input_tree.Scenario['frequency']
 
@@ -189,11 +209,14 @@ class Scenario(object):
 
         # these are attributes that are changed as the scenario is solved
         self.solvers = []
+        self.optimization_profile = OptimizationProfile()  # build and solve times, size, solver, and status of each window
         self.poi = None
         self.service_agg = None
         self.cost_benefit_analysis = None
         self.optimization_levels = pd.DataFrame()
-        self.objective_values = pd.DataFrame()
+        self.optimization_windows = {}
+        self.window_objective_values = []  # objective values of each optimization window, in the order solved
+        self.problem_templates = {}  # parametric problems shared by optimization windows with the same structure
         self.system_requirements = None
         self.opt_engine = True  # indicates that dervet should go to the optimization module and size there
 
@@ -239,6 +262,13 @@ class Scenario(object):
 
         # create optimization levels
         self.optimization_levels = self.assign_optimization_level(self.opt_years, self.n, 0, self.frequency, self.dt)
+        self.optimization_windows = OptimizationWindow.split(self.optimization_levels.predictive)
+
+        # allocate room for the optimization results of every timestep that will be optimized over
+        for der in self.poi.der_list:
+            der.initialize_variable_results(self.optimization_levels.index)
+        for service in self.service_agg.value_streams.values():
+            service.initialize_variable_results(self.optimization_levels.index)
 
         # initialize degredation module in Battery/Electrolzyer objects (NOTE: if no degredation module applies to specific tech, then nothing happens)
         for der in self.poi.der_list:
@@ -248,6 +278,13 @@ class Scenario(object):
         # calculate and check that system requirement set by value streams can be met
         self.system_requirements = self.service_agg.identify_system_requirements(self.poi.der_list, self.opt_years, self.frequency)
 
+    @property
+    def objective_values(self):
+        """ DataFrame of the value of each objective function (columns) in each optimization window solved (rows) """
+        if not len(self.window_objective_values):
+            return pd.DataFrame()
+        return pd.concat(self.window_objective_values)
+
     @staticmethod
     def assign_optimization_level(analysis_years, control_horizon, predictive_horizon, frequency, dt):
         """ creates an index based on the opt_years presented and then
@@ -338,7 +375,11 @@ class Scenario(object):
             return
 
         TellUser.info("Starting optimization loop")
-        for opt_period in self.optimization_levels.predictive.unique():
+        self.resume_from_checkpoint()
+        if self.solve_windows_with_predicted_degradation() or self.solve_windows_in_parallel() or \
+                self.solve_windows_in_batches():
+            return
+        for opt_period in self.windows_to_solve():
             # setup + run optimization then return optimal objective costs
             functions, constraints, sub_index = self.set_up_optimization(opt_period)
 
@@ -350,8 +391,364 @@ class Scenario(object):
             #print('\n'.join([f'{k}: {v}' for k, v in functions.items()]))
             #print()
 
-            cvx_problem, obj_expressions, cvx_error_msg = self.solve_optimization(functions, constraints)
+            cvx_problem, obj_expressions, cvx_error_msg = self.solve_optimization(functions, constraints,
+                                                                                  template_key=self.problem_template_key(sub_index),
+                                                                                  opt_window_num=opt_period)
             self.save_optimization_results(opt_period, sub_index, cvx_problem, obj_expressions, cvx_error_msg)
+            self.checkpoint_progress(opt_period)
+
+    def windows_are_independent(self):
+        """ Optimization windows can be solved in any order (or at the same time) unless the solution of one
+        window changes the problem of the windows after it: when DERs degrade, when DERs are sized, or when
+        Deferral is active
+
+        Returns: True if the optimization windows are independent problems
+
+        """
+        if getattr(self.poi, 'is_sizing_optimization', False):
+            return False
+        if 'Deferral' in self.service_agg.value_streams:
+            return False
+        return not any(getattr(der, 'incl_degradation', False) for der in self.poi.der_list)
+
+    def solve_windows_in_parallel(self, annuity_scalar=1, ignore_der_costs=False, force_glpk_mi=False):
+        """ Solves the optimization windows with a pool of WINDOW_WORKERS processes, if the user asked for
+        more than one and the windows are independent. The solution of each window is saved in order, as
+        each window finishes.
+
+        Args:
+            annuity_scalar (float): passed to set_up_optimization
+            ignore_der_costs (bool): passed to set_up_optimization
+            force_glpk_mi (bool): passed to solve_optimization
+
+        Returns: True if the windows were solved, False if they should be solved one at a time
+
+        """
+        windows = self.windows_to_solve()
+        if self.window_workers <= 1 or len(windows) <= 1:
+            return False
+        if not self.windows_are_independent():
+            TellUser.info("Optimization windows will be solved one at a time, because the solution of each window "
+                          "changes the next (DER degradation, DER sizing, or Deferral)")
+            return False
+        TellUser.info(f"Solving {len(windows)} optimization windows with {self.window_workers} workers")
+        for opt_period, solution in solve_windows(self, windows, self.window_workers, annuity_scalar=annuity_scalar,
+                                                  ignore_der_costs=ignore_der_costs, force_glpk_mi=force_glpk_mi):
+            sub_index = self.optimization_window(opt_period).index
+            if solution is None:
+                TellUser.info(f"Optimization window #{opt_period} does not have any constraints or objectives to minimize -- SKIPPING...")
+                continue
+            TellUser.info(f"Optimization Problem starting at {sub_index[0]} hb was solved by a worker")
+            solution.load(self, len(sub_index))
+            self.save_optimization_results(opt_period, sub_index, solution, solution.objective_values, solution.cvx_error_msg)
+            self.checkpoint_progress(opt_period)
+        return True
+
+    def degradation_can_be_predicted(self):
+        """ The optimization windows of DERs that degrade can be solved in parallel (with a predicted degradation)
+        if every DER that degrades has a parallel_degradation_tolerance, and nothing else links the windows
+
+        Returns: dictionary of the DERs that degrade, keyed by their position in the POI's der_list (empty if the
+            windows should be solved one at a time)
+
+        """
+        degrading = {index: der for index, der in enumerate(self.poi.der_list)
+                     if getattr(der, 'incl_degradation', False)}
+        if not len(degrading) or not all(der.parallel_degradation_tolerance for der in degrading.values()):
+            return {}
+        if getattr(self.poi, 'is_sizing_optimization', False) or 'Deferral' in self.service_agg.value_streams:
+            return {}
+        return degrading
+
+    def apply_window_degradation(self, opt_window_num):
+        """ Sets the degradation that the DERs should be solved with in an optimization window, if one was planned
+
+        Args:
+            opt_window_num (int): the optimization window number
+
+        """
+        for index, degrade_perc in self.window_degradation.get(opt_window_num, {}).items():
+            self.poi.der_list[index].set_degradation(degrade_perc)
+
+    def solve_windows_with_predicted_degradation(self, annuity_scalar=1, ignore_der_costs=False,
+                                                 force_glpk_mi=False):
+        """ Solves the optimization windows of DERs that degrade with a pool of WINDOW_WORKERS processes, if the
+        DERs opted in with a parallel_degradation_tolerance.
+
+        The first pass solves every window with the degradation predicted by the yearly degradation rate alone.
+        Then the degradation is calculated from the dispatch of the windows, in order, like it would be after
+        solving them one at a time. The windows whose effective capacity (with that degradation) is more than the
+        tolerance away from the capacity they were solved with are solved again, and so on for at most
+        DEGRADATION_PASSES passes.
+
+        Each DER reports the degradation each window was solved with and the degradation of the final dispatch
+        (its degradation_reconciliation).
+
+        Args:
+            annuity_scalar (float): passed to set_up_optimization
+            ignore_der_costs (bool): passed to set_up_optimization
+            force_glpk_mi (bool): passed to solve_optimization
+
+        Returns: True if the windows were solved, False if they should be solved one at a time
+
+        """
+        windows = self.windows_to_solve()
+        degrading = self.degradation_can_be_predicted()
+        if self.window_workers <= 1 or len(windows) <= 1 or not len(degrading):
+            return False
+        # the degradation before the first window, which every pass starts again from
+        start_state = {index: der.degradation_state() for index, der in degrading.items()}
+        first_objective, first_solver = len(self.window_objective_values), len(self.solvers)
+        first_start = self.optimization_window(windows[0]).index[0]
+        for opt_period in windows:
+            years = (self.optimization_window(opt_period).index[0] - first_start) / pd.Timedelta(365, unit='d')
+            self.window_degradation[opt_period] = {index: der.degrade_perc + der.yearly_degrade * years
+                                                   for index, der in degrading.items()}
+        solutions = {}
+        solved_in_pass = {}
+        to_solve = windows
+        for pass_num in range(1, self.DEGRADATION_PASSES + 1):
+            TellUser.info(f"Degradation pass {pass_num}: solving {len(to_solve)} optimization windows with "
+                          f"{self.window_workers} workers")
+            for opt_period, solution in solve_windows(self, to_solve, self.window_workers,
+                                                      annuity_scalar=annuity_scalar,
+                                                      ignore_der_costs=ignore_der_costs, force_glpk_mi=force_glpk_mi):
+                solutions[opt_period] = solution
+                solved_in_pass[opt_period] = pass_num
+            # save every window again, in order, so the degradation is calculated from the dispatch of this pass
+            for index, der in degrading.items():
+                der.restore_degradation_state(start_state[index])
+            del self.window_objective_values[first_objective:]
+            del self.solvers[first_solver:]
+            dispatch_degradation = {}
+            for opt_period in windows:
+                dispatch_degradation[opt_period] = {index: der.degrade_perc for index, der in degrading.items()}
+                solution = solutions[opt_period]
+                if solution is None:
+                    continue
+                sub_index = self.optimization_window(opt_period).index
+                solution.load(self, len(sub_index))
+                self.save_optimization_results(opt_period, sub_index, solution, solution.objective_values,
+                                               solution.cvx_error_msg)
+            to_solve = [opt_period for opt_period in windows if solutions[opt_period] is not None and
+                        any(der.capacity_difference(dispatch_degradation[opt_period][index],
+                                                    self.window_degradation[opt_period][index])
+                            > der.parallel_degradation_tolerance for index, der in degrading.items())]
+            if not len(to_solve) or pass_num == self.DEGRADATION_PASSES:
+                break
+            for opt_period in to_solve:
+                self.window_degradation[opt_period] = dispatch_degradation[opt_period]
+        if len(to_solve):
+            TellUser.warning(f"{len(to_solve)} optimization windows were solved with a degradation more than the "
+                             f"parallel_degradation_tolerance away from the degradation of the final dispatch")
+        for index, der in degrading.items():
+            report = pd.DataFrame({
+                'predicted degradation progress %': [self.window_degradation[opt][index] for opt in windows],
+                'degradation progress %': [dispatch_degradation[opt][index] for opt in windows],
+                'solved in pass': [solved_in_pass[opt] for opt in windows]}, index=windows)
+            report['difference %'] = report['predicted degradation progress %'] - report['degradation progress %']
+            der.degradation_reconciliation = report
+            TellUser.info(f"{der.name}: the degradation each optimization window was solved with is at most "
+                          f"{Lib.truncate_float(report['difference %'].abs().max())} away from the degradation of the "
+                          f"final dispatch")
+        self.solved_windows += windows
+        self.save_checkpoint()
+        return True
+
+    def solve_windows_in_batches(self, annuity_scalar=1, ignore_der_costs=False, force_glpk_mi=False):
+        """ Stacks consecutive optimization windows into one problem (with a block for each window, as they share no
+        variables), if the user asked to batch windows and the windows are independent. Batches have about
+        BATCH_TIMESTEPS timesteps, so many short windows are solved with a few solver calls.
+
+        Args:
+            annuity_scalar (float): passed to set_up_optimization
+            ignore_der_costs (bool): passed to set_up_optimization
+            force_glpk_mi (bool): passed to solve_optimization
+
+        Returns: True if the windows were solved, False if they should be solved one at a time
+
+        """
+        windows = self.windows_to_solve()
+        if not self.batch_windows or len(windows) <= 1:
+            return False
+        if not self.windows_are_independent():
+            TellUser.info("Optimization windows will not be batched, because the solution of each window "
+                          "changes the next (DER degradation, DER sizing, or Deferral)")
+            return False
+        for batch in self.window_batches(windows):
+            self.solve_window_batch(batch, annuity_scalar, ignore_der_costs, force_glpk_mi)
+        return True
+
+    def window_batches(self, windows):
+        """ Groups consecutive optimization windows so that each group has at most BATCH_TIMESTEPS timesteps (or
+        is a single window that is longer than that)
+
+        Args:
+            windows (list): the optimization window numbers, in order
+
+        Returns: list of lists of optimization window numbers
+
+        """
+        batches = []
+        batch_size = 0
+        for opt_period in windows:
+            window_size = self.optimization_window(opt_period).size
+            if not len(batches) or batch_size + window_size > self.BATCH_TIMESTEPS:
+                batches.append([])
+                batch_size = 0
+            batches[-1].append(opt_period)
+            batch_size += window_size
+        return batches
+
+    def solve_window_batch(self, batch, annuity_scalar=1, ignore_der_costs=False, force_glpk_mi=False):
+        """ Sets up each optimization window of a batch, solves them as one problem, then saves the results of
+        each window like they had been solved on their own. Mixed-integer windows are solved one at a time (after
+        all are set up), since branch and bound does not split the problem back into its blocks.
+
+        Args:
+            batch (list): the optimization window numbers of the batch
+            annuity_scalar (float): passed to set_up_optimization
+            ignore_der_costs (bool): passed to set_up_optimization
+            force_glpk_mi (bool): passed to solve_optimization
+
+        """
+        functions = {}
+        constraints = []
+        windows = []
+        for opt_period in batch:
+            window_functions, window_constraints, sub_index = self.set_up_optimization(opt_period, annuity_scalar, ignore_der_costs)
+            if not len(window_constraints) and not len(window_functions.values()):
+                TellUser.info(f"Optimization window #{opt_period} does not have any constraints or objectives to minimize -- SKIPPING...")
+                continue
+            # setting up the next window replaces the variables of the DERs and value streams, so keep this window's
+            windows.append((opt_period, sub_index, window_functions, window_constraints, self.window_variables(),
+                            self.problem_template_key(sub_index)))
+            functions.update({f'{opt_period} {name}': function for name, function in window_functions.items()})
+            constraints += window_constraints
+        if not len(windows):
+            return
+        if cvx.Problem(cvx.Minimize(0), constraints).is_mixed_integer():
+            for opt_period, sub_index, window_functions, window_constraints, variables, template_key in windows:
+                self.load_window_variables(variables)
+                prob, _, cvx_error_msg = self.solve_optimization(window_functions, window_constraints, force_glpk_mi=force_glpk_mi,
+                                                                 template_key=template_key, opt_window_num=opt_period)
+                self.save_optimization_results(opt_period, sub_index, prob, window_functions, cvx_error_msg)
+                self.checkpoint_progress(opt_period)
+            return
+        TellUser.info(f"Solving optimization windows {', '.join(str(window[0]) for window in windows)} as one problem")
+        template_key = (sum(len(window[1]) for window in windows), tuple(window[-1] for window in windows))
+        prob, _, cvx_error_msg = self.solve_optimization(functions, constraints, force_glpk_mi=force_glpk_mi,
+                                                         template_key=template_key, opt_window_num=windows[0][0])
+        for opt_period, sub_index, window_functions, _, variables, _ in windows:
+            self.load_window_variables(variables)
+            self.optimization_profile.record(opt_period, **{'batch': windows[0][0]})
+            self.save_optimization_results(opt_period, sub_index, prob, window_functions, cvx_error_msg)
+            self.checkpoint_progress(opt_period)
+
+    def window_variables(self):
+        """ The active DERs and the optimization variables of the DERs and value streams, for the window that was
+        set up last
+
+        Returns: tuple of the active DERs, each DER's variables, and each value stream's variables
+
+        """
+        return (list(self.poi.active_ders), [der.variables_dict for der in self.poi.der_list],
+                {name: vs.variables for name, vs in self.service_agg.value_streams.items()})
+
+    def load_window_variables(self, variables):
+        """ Gives the DERs and value streams back the optimization variables of a window (see window_variables)
+
+        Args:
+            variables (tuple): result of window_variables
+
+        """
+        active_ders, der_variables, value_stream_variables = variables
+        self.poi.active_ders = active_ders
+        for der, variables_dict in zip(self.poi.der_list, der_variables):
+            der.variables_dict = variables_dict
+        for name, vs_variables in value_stream_variables.items():
+            self.service_agg.value_streams[name].variables = vs_variables
+
+    def windows_to_solve(self):
+        """ The optimization windows that have not been solved yet (all of them, unless resuming from a checkpoint)
+
+        Returns: list of optimization window numbers, in order
+
+        """
+        return [opt_period for opt_period in self.optimization_levels.predictive.unique()
+                if opt_period not in self.solved_windows]
+
+    def checkpoint_state(self):
+        """ Everything the optimization loop has changed so far: the results (and any degradation) saved by each
+        DER and value stream, the objective values and profile of each window, and the windows that were solved
+
+        Returns: dictionary that is pickled by the Checkpoint
+
+        """
+        return {
+            'solved windows': self.solved_windows,
+            'ders': [der.__dict__ for der in self.poi.der_list],
+            'value streams': {name: vs.__dict__ for name, vs in self.service_agg.value_streams.items()},
+            'objective values': self.window_objective_values,
+            'optimization profile': self.optimization_profile.windows,
+            'solvers': self.solvers
+        }
+
+    def checkpoint_progress(self, opt_window_num):
+        """ Records that an optimization window was solved (and its results saved), and saves a checkpoint if
+        one is due
+
+        Args:
+            opt_window_num (int): the optimization window number that was solved
+
+        """
+        self.solved_windows.append(opt_window_num)
+        self.save_checkpoint()
+
+    def save_checkpoint(self, force=False):
+        """ Saves the progress of the optimization loop, if there is a checkpoint and any window has been solved
+
+        Args:
+            force (bool): save even if a checkpoint is not due (i.e. before the run stops on an error)
+
+        """
+        if self.checkpoint is not None and len(self.solved_windows):
+            self.checkpoint.save(self.checkpoint_state, force)
+
+    def resume_from_checkpoint(self):
+        """ Restores the progress saved in the checkpoint to resume from (if any), so that the optimization
+        windows that were solved are skipped
+
+        """
+        if self.checkpoint is None:
+            return
+        state = self.checkpoint.load()
+        if state is None:
+            return
+        # update (instead of replace) each instance, so the POI and service aggregator still reference them
+        for der, der_state in zip(self.poi.der_list, state['ders']):
+            der.__dict__.update(der_state)
+        for name, vs_state in state['value streams'].items():
+            self.service_agg.value_streams[name].__dict__.update(vs_state)
+        self.window_objective_values = state['objective values']
+        self.optimization_profile.windows = state['optimization profile']
+        self.solvers = state['solvers']
+        self.solved_windows = state['solved windows']
+        TellUser.info(f"{len(self.solved_windows)} optimization windows were already solved, and will be skipped")
+
+    def optimization_window(self, opt_window_num):
+        """ Describes the timesteps of an optimization window (by their position within the analysis horizon)
+
+        Args:
+            opt_window_num (int): the optimization window number
+
+        Returns: an OptimizationWindow, which is passed to the POI, DERs, and value streams as their MASK
+
+        """
+        if opt_window_num not in self.optimization_windows:
+            mask = self.optimization_levels.predictive == opt_window_num
+            self.optimization_windows[opt_window_num] = OptimizationWindow.from_mask(mask)
+        return self.optimization_windows[opt_window_num]
 
     def set_up_optimization(self, opt_window_num, annuity_scalar=1, ignore_der_costs=False):
         """ Sets up and runs optimization on a subset of time in a year. Called within a loop.
@@ -370,14 +767,16 @@ class Scenario(object):
 
         """
         # used to select rows from time_series relevant to this optimization window
-        mask = self.optimization_levels.predictive == opt_window_num
-        sub_index = self.optimization_levels.loc[mask].index
+        mask = self.optimization_window(opt_window_num)
+        sub_index = mask.index
         TellUser.info(f"{time.strftime('%H:%M:%S')} Running Optimization Problem starting at {sub_index[0]} hb")
-        opt_var_size = int(np.sum(mask))
+        opt_var_size = mask.size
 
         # set up variables
+        start = time.time()
         self.poi.initialize_optimization_variables(opt_var_size)
         self.service_agg.initialize_optimization_variables(opt_var_size)
+        self.optimization_profile.record(opt_window_num, **{'variables (s)': time.time() - start})
 
         # grab values from the POI that is required to know calculate objective functions and constraints
         load_sum, var_gen_sum, gen_sum, tot_net_ess, der_dispatch_net_power, total_soe, agg_p_in, agg_p_out, agg_steam, agg_hotwater, agg_cold = self.poi.get_state_of_system(mask)
@@ -385,9 +784,14 @@ class Scenario(object):
 
         # set up controller first to collect and provide inputs to the POI
         funcs, consts = self.service_agg.optimization_problem(mask, load_sum, var_gen_sum, gen_sum, tot_net_ess, combined_rating, annuity_scalar)
+        self.optimization_profile.record_build_times(opt_window_num, self.service_agg.build_times, 'Value Stream')
 
         # add optimization problem portion from the POI
+        start = time.time()
         temp_objectives, temp_consts = self.poi.optimization_problem(mask, agg_p_in, agg_p_out, agg_steam, agg_hotwater, agg_cold, annuity_scalar)
+        self.optimization_profile.record_build_times(opt_window_num, self.poi.build_times, 'DER')
+        # the rest of the POI's constraints are counted with the system constraints
+        start += sum(self.poi.build_times.values())
         if not ignore_der_costs:
             #  don't ignore der costs
             funcs.update(temp_objectives)
@@ -479,70 +883,192 @@ class Scenario(object):
         _, _, soe_limits = self.poi.calculate_system_size()
         consts += [cvx.NonPos(total_soe + worst_ue_sto - soe_limits[0])]
         consts += [cvx.NonPos(soe_limits[1] + worst_ue_pro + (-1)*total_soe)]
+        self.optimization_profile.record(opt_window_num, **{'system constraints (s)': time.time() - start})
 
         return funcs, consts, sub_index
 
-    def solve_optimization(self, obj_expression, obj_const, force_glpk_mi=False):
+    def problem_template_key(self, sub_index):
+        """ Optimization windows can only share a parametric problem if they are the same length and have the
+        same DERs and value streams active
+
+        Args:
+            sub_index (pd.Index): index of the optimization window
+
+        Returns: a key into PROBLEM_TEMPLATES
+
+        """
+        return len(sub_index), tuple((der.tag, der.name) for der in self.poi.active_ders), tuple(self.service_agg.value_streams)
+
+    def problem_template(self, template_key, objective, constraints, opt_window_num=None):
+        """ Finds the parametric problem that optimization windows with the same structure as this one share.
+        A template is made once two windows with the same key have been set up (so that it is known which
+        parts of the problem change from window to window). Each window still builds its own problem, which is
+        compared with the template part by part.
+
+        Which parts change is only known from the windows seen so far: a window that changes a part of the problem
+        that was the same in every earlier window does not fit the template, so the template is made again with
+        that part as a parameter too (and the window is solved with it). How each window used the template is
+        recorded in the 'problem template' column of the optimization profile.
+
+        Args:
+            template_key (tuple): key into PROBLEM_TEMPLATES (see problem_template_key)
+            objective (cvx.Minimize): objective of the optimization window
+            constraints (list): constraints of the optimization window
+            opt_window_num (int): the optimization window number (used to profile the use of the template)
+
+        Returns: a ProblemTemplate loaded with this window, or None if this window should be solved on its own
+
+        """
+        cached = self.problem_templates.get(template_key)
+        template = None
+        if cached is False:
+            # windows with this key do not make a DPP problem
+            usage = 'not DPP'
+        elif isinstance(cached, ProblemTemplate):
+            if cached.load(objective, constraints):
+                TellUser.debug(f"Reusing the parametric problem for {template_key[0]} timestep windows")
+                template, usage = cached, 'reused'
+            else:
+                try:
+                    template = ProblemTemplate.create((cached.problem.objective, cached.problem.constraints),
+                                                      objective, constraints, cached.varying)
+                except TemplateMismatch:
+                    pass
+                if template is None:
+                    # keep the template for the windows that do fit it
+                    TellUser.debug(f"This window does not fit the parametric problem for {template_key[0]} timestep windows")
+                    usage = 'miss'
+                else:
+                    TellUser.debug(f"Made the parametric problem for {template_key[0]} timestep windows again with more parameters")
+                    self.problem_templates[template_key] = template
+                    usage = 'widened'
+        elif cached is None:
+            usage = 'first of its shape'
+            self.problem_templates[template_key] = (objective, constraints)
+        else:
+            try:
+                template = ProblemTemplate.create(cached, objective, constraints)
+            except TemplateMismatch:
+                usage = 'miss'
+                self.problem_templates[template_key] = (objective, constraints)
+            else:
+                if template is None:
+                    TellUser.debug(f"Optimization windows of {template_key[0]} timesteps are not DPP, so each will be solved on its own")
+                    self.problem_templates[template_key] = False
+                    usage = 'not DPP'
+                else:
+                    TellUser.debug(f"Created a parametric problem for {template_key[0]} timestep windows")
+                    self.problem_templates[template_key] = template
+                    usage = 'created'
+        if opt_window_num is not None:
+            self.optimization_profile.record(opt_window_num, **{'problem template': usage})
+        return template
+
+    def solve_optimization(self, obj_expression, obj_const, force_glpk_mi=False, template_key=None, opt_window_num=None):
         """ Sets up and runs optimization on a subset of time in a year. Called within a loop.
 
         Args:
             obj_expression (dict): functions or objectives of the optimization
             obj_const (list): constraints that define behaviors, constrain variables, etc. that the optimization must meet
+            template_key (tuple): if given, the problem is solved with the parametric problem shared by windows with
+                the same key (see problem_template_key)
+            opt_window_num (int): the optimization window number (used to profile the time spent setting up the problem)
 
         Returns:
             objective_values (DataFrame): the minimum values for each cost function subject to constraints
 
         """
         # summary of objective expressions to set up optimization problem
+        start = time.time()
         obj = cvx.Minimize(sum(obj_expression.values()))
         prob = cvx.Problem(obj, obj_const)
         #print("Is DPP? ", prob.is_dcp(dpp=True))
         #print("Is DCP? ", prob.is_dcp(dpp=False))
         TellUser.info("Finished setting up the problem. Solving now.")
         cvx_error_msg = ''
-        # order the solver_sequence list appropriately
-        solver_dict = {'GLPK_MI': cvx.GLPK_MI, 'ECOS_BB': cvx.ECOS_BB}
-        solver_list = ['GLPK_MI', 'ECOS_BB']
-        solver_sequence = solver_list.copy()
+
+        # reuse the solution of a window with the same problem (from any sensitivity case or run)
+        cache_key = None
+        if self.solution_cache is not None:
+            strategy = self.solver_strategy
+            cache_key, cache_variables = self.solution_cache.key(prob, (strategy.solvers, strategy.time_limit,
+                                                                        strategy.mip_gap, strategy.threads))
+            solution = self.solution_cache.load(cache_key)
+            if solution is not None and not solution.fits(cache_variables):
+                solution = None
+            if opt_window_num is not None:
+                self.optimization_profile.record(opt_window_num, **{'solution cache': 'miss' if solution is None else 'hit'})
+            if solution is not None:
+                TellUser.info("The solution of this problem was found in the solution cache")
+                solution.load(cache_variables)
+                return solution, obj_expression, cvx_error_msg
+
+        # solve the parametric problem shared by windows like this one (only its parameters change)
+        template = None
+        if template_key is not None:
+            template = self.problem_template(template_key, obj, obj_const, opt_window_num)
+        if template is not None:
+            prob = template.problem
+        if opt_window_num is not None:
+            self.optimization_profile.record(opt_window_num, **{'problem setup (s)': time.time() - start})
 
         # suppress the UserWarning about the problem not being DPP
-        # the basic DA service objective_function() is always not DPP
+        # the basic DA service objective_function() is always not DPP (but its ProblemTemplate is)
         # message='You are solving a parameterized problem that is not DPP. Because the problem is not DPP,
         #          subsequent solves will not be faster than the first one.'
-        # TODO: make this more performant by making the problem DPP
         with warnings.catch_warnings():
             warnings.filterwarnings(
                 action='ignore',
                 category=UserWarning,
             )
 
-            # try to solve using the first solver from solver_list
+            # try to solve using the first solver from the solver strategy
             #   if that fails, then move to the next solver, etc.
-            # TODO: if a third solver is added to the list, then this section of code will require a loop
             try:
-                solver_name = solver_sequence.pop(0)
-                start = time.time()
-                TellUser.debug(f"Using {solver_name} solver")
-                prob.solve(verbose=self.verbose_opt, solver=solver_dict[solver_name])
-                end = time.time()
-                TellUser.info("Time (seconds) for solver to finish: " + str(end - start))
+                # consecutive windows are alike, so each starts from the solution of the window before it
+                solver_name = self.solver_strategy.solve(prob, verbose=self.verbose_opt, warm_start=True)
+                TellUser.info(f"Time (seconds) for {solver_name} to finish: {self.solver_strategy.last_solve['solve time (s)']}")
             except (cvx.error.SolverError, RuntimeError) as e:
-                # if that solver fails, then try the other solver
-                try:
-                    TellUser.debug(f"{e}")
-                    TellUser.debug("The solver was unable to find a solution... let's try another solver.")
-                    solver_name = solver_sequence.pop(0)
-                    start = time.time()
-                    TellUser.debug(f"Using {solver_name} solver")
-                    prob.solve(verbose=self.verbose_opt, solver=solver_dict[solver_name])
-                    end = time.time()
-                    TellUser.info("Time (seconds) for solver to finish: " + str(end - start))
-                except (cvx.error.SolverError, RuntimeError) as e:
-                    # both solvers have failed, so we error out of the program, and report the error e
-                    TellUser.error("The solver was unable to find a solution; the program will exit.")
-                    cvx_error_msg = e
+                # every solver has failed, so we error out of the program, and report the error e
+                TellUser.error("The solver was unable to find a solution; the program will exit.")
+                cvx_error_msg = e
+        if template is not None:
+            template.save_window_solution()
+        if cache_key is not None:
+            self.solution_cache.save(cache_key, prob, cache_variables)
         return prob, obj_expression, cvx_error_msg
 
+    def record_solve(self, opt_window_num, prob):
+        """ Saves the solver used, and adds the solver's timing, the size of the problem, and its status to the
+        optimization profile
+
+        Args:
+            opt_window_num (int): the optimization window number
+            prob: the solved cvx.Problem (or the WindowSolution of a window solved in a worker process, or the
+                CachedSolution of a window found in the solution cache)
+
+        """
+        if isinstance(prob, WindowSolution):
+            # the worker process already profiled the window
+            self.solvers += prob.solvers
+            self.optimization_profile.record(opt_window_num, **prob.profile)
+            return
+        if isinstance(prob, CachedSolution):
+            self.solvers.append(prob.solver_name)
+            self.optimization_profile.record(opt_window_num, status=prob.status)
+            return
+        # save solver used
+        try:
+            self.solvers.append(prob.solver_stats.solver_name)
+        except AttributeError:
+            pass
+        # save the solver's timing, the size of the problem, and its status
+        solve_profile = dict(self.solver_strategy.last_solve, status=prob.status)
+        solve_profile['compile (s)'] = prob.compilation_time
+        solve_profile['solver (s)'] = getattr(prob.solver_stats, 'solve_time', None) or prob._solve_time
+        solve_profile.update(OptimizationProfile.problem_size(prob))
+        self.optimization_profile.record(opt_window_num, **solve_profile)
+
     def save_optimization_results(self, opt_window_num, sub_index, prob, obj_expression, cvx_error_msg):
         """ Checks if there was a solution to the optimization. If not, report the problem
          to the user. If there was a solution, then saves results within each instance.
@@ -550,17 +1076,13 @@ class Scenario(object):
         Args:
             opt_window_num:
             sub_index:
-            prob:
+            prob: the solved cvx.Problem (or a WindowSolution or CachedSolution that stands in for it)
             obj_expression:
             cvx_error_msg: any error message that might have occurred during problem solve
 
         """
         TellUser.info(f'Optimization problem was {prob.status}')
-        # save solver used
-        try:
-            self.solvers.append(prob.solver_stats.solver_name)
-        except AttributeError:
-            pass
+        self.record_solve(opt_window_num, prob)
 
         if (prob.status == 'infeasible') or (prob.status == 'unbounded') or (prob.status is None):
             # tell the user and throw an error specific to the problem being infeasible/unbounded
@@ -582,7 +1104,7 @@ class Scenario(object):
 
         obj_values = pd.DataFrame(obj_expression, index=[opt_window_num])
         # then add objective expressions to financial obj_val
-        self.objective_values = pd.concat([self.objective_values, obj_values])
+        self.window_objective_values.append(obj_values)
 
         # GENERAL CHECK ON SOLUTION: check for non zero slack
         if np.any(abs(obj_values.filter(regex="_*slack$")) >= 1):
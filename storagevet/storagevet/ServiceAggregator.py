@@ -27,10 +27,12 @@ Copyright (c) 2024, Electric Power Research Institute
  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
+import time
 import pandas as pd
 import numpy as np
 import cvxpy as cvx
 from storagevet.SystemRequirement import SystemRequirement
+from storagevet.OptimizationWindow import OptimizationWindow
 from storagevet.ErrorHandling import *
 
 
@@ -59,6 +61,7 @@ class ServiceAggregator:
 
         self.sys_requirements = {}
         self.system_requirements_conflict = False
+        self.build_times = {}  # seconds each value stream took to build its costs and constraints (last window built)
 
     def update_analysis_years(self, end_year, poi, frequency, opt_years, def_load_growth):
         if 'Deferral' in self.value_streams.keys():
@@ -154,8 +157,7 @@ class ServiceAggregator:
         """ Generates the full objective function, including the optimization variables.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
             tot_variable_gen (Expression): the sum of the variable/intermittent generation sources
             load_sum (Expression): the sum of load within the system
             generator_out_sum (Expression): the sum of conventional generation within the system
@@ -169,11 +171,15 @@ class ServiceAggregator:
             A dictionary with the portion of the objective function that it affects, labeled by the expression's key.
             A list of optimization constraints.
         """
+        mask = OptimizationWindow.create(mask)
         opt_functions = {}
         opt_constraints = []
-        for value_stream in self.value_streams.values():
+        self.build_times = {}
+        for name, value_stream in self.value_streams.items():
+            start = time.time()
             opt_functions.update(value_stream.objective_function(mask, load_sum, tot_variable_gen, generator_out_sum, net_ess_power, annuity_scalar))
             opt_constraints += value_stream.constraints(mask, load_sum, tot_variable_gen, generator_out_sum, net_ess_power, combined_rating)
+            self.build_times[name] = time.time() - start
         return opt_functions, opt_constraints
 
     def aggregate_reservations(self, mask):
@@ -184,8 +190,7 @@ class ServiceAggregator:
             - worst case uE throughput
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns:
             reservation to pull power down from the grid by discharging less
@@ -196,14 +201,15 @@ class ServiceAggregator:
             worst case energy provided due to sub-time-step activities
             worst case energy stored due to sub-time-step activities
         """
-        charge_up = cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name='ServiceAggZero')
-        charge_down = cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name='ServiceAggZero')
-        discharge_up = cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name='ServiceAggZero')
-        discharge_down = cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name='ServiceAggZero')
-        uenergy_stored = cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name='ServiceAggZero')
-        uenergy_provided = cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name='ServiceAggZero')
-        worst_ue_stored = cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name='ServiceAggZero')
-        worst_ue_provided = cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name='ServiceAggZero')
+        mask = OptimizationWindow.create(mask)
+        charge_up = cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name='ServiceAggZero')
+        charge_down = cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name='ServiceAggZero')
+        discharge_up = cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name='ServiceAggZero')
+        discharge_down = cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name='ServiceAggZero')
+        uenergy_stored = cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name='ServiceAggZero')
+        uenergy_provided = cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name='ServiceAggZero')
+        worst_ue_stored = cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name='ServiceAggZero')
+        worst_ue_provided = cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name='ServiceAggZero')
 
         for value_stream in self.value_streams.values():
             charge_up += value_stream.p_reservation_charge_up(mask)
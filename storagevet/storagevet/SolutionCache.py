@@ -0,0 +1,238 @@
+"""
+Copyright (c) 2024, Electric Power Research Institute
+
+ All rights reserved.
+
+ Redistribution and use in source and binary forms, with or without modification,
+ are permitted provided that the following conditions are met:
+
+     * Redistributions of source code must retain the above copyright notice,
+       this list of conditions and the following disclaimer.
+     * Redistributions in binary form must reproduce the above copyright notice,
+       this list of conditions and the following disclaimer in the documentation
+       and/or other materials provided with the distribution.
+     * Neither the name of DER-VET nor the names of its contributors
+       may be used to endorse or promote products derived from this software
+       without specific prior written permission.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+ A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+ CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+ EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+ PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+ PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+ LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+ NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+"""
+SolutionCache.py
+
+This file holds the SolutionCache class, which keeps the solutions of optimization windows on disk, keyed by the
+data of each window's problem, so that a window with the same problem (in another sensitivity case or another run)
+is not solved again.
+"""
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+import numpy as np
+import scipy.sparse as sp
+import cvxpy as cvx
+from cvxpy.constraints.constraint import Constraint
+from cvxpy.expressions.leaf import Leaf
+from cvxpy.expressions.variable import Variable
+from storagevet.DiskCache import DiskCache
+from storagevet.ErrorHandling import *
+
+
+class CachedSolution:
+    """ The solved values of the variables of an optimization problem. It stands in for the solved cvx.Problem in
+    Scenario.save_optimization_results when a window's solution is found in the cache
+
+    """
+
+    def __init__(self, status, solver_name, values):
+        """
+
+        Args:
+            status (str): status of the solved problem
+            solver_name (str): the solver that solved the problem
+            values (list): the value of each variable of the problem, in the order SolutionCache.key found them
+
+        """
+        self.status = status
+        self.solver_name = solver_name
+        self.values = values
+
+    def fits(self, variables):
+        """ True if the values can be given to VARIABLES (the variables of a problem with the same key) """
+        return len(variables) == len(self.values) and \
+            all(np.shape(value) == variable.shape for variable, value in zip(variables, self.values))
+
+    def load(self, variables):
+        """ Gives the solved values to the variables of a problem with the same key, like the solver would """
+        for variable, value in zip(variables, self.values):
+            variable.save_value(value)
+
+
+class SolutionCache(DiskCache):
+    """ An on-disk cache of the solutions of optimization windows. Each solution is saved (pickled) under a key made
+    from everything the solver is given: the structure of the problem, the value of each constant and parameter
+    (prices, loads, DER ratings, etc.), and the solver settings. Two windows share a key only if they are the same
+    problem, no matter which sensitivity case or run they are from. Inputs that do not change the problem (like
+    most Finance inputs) do not change the key.
+
+    The cache directory is DERVET_SOLUTION_CACHE (if that environment variable is set), otherwise
+    ~/.cache/dervet/solutions. Once the cache is larger than MAX_SIZE, the least recently used solutions are deleted.
+
+    """
+    VERSION = 1  # increase when what is saved changes, so that old entries are not reused
+    ENVIRONMENT_VARIABLE = 'DERVET_SOLUTION_CACHE'
+
+    def __init__(self, directory=None, max_size=None):
+        """ Initialize the cache
+
+        Args:
+            directory (str, Path): where the cache is kept. If None, then the environment variable
+                DERVET_SOLUTION_CACHE, or ~/.cache/dervet/solutions, is used
+            max_size (float): the size (MB) the cache is kept under (defaults to MAX_SIZE)
+
+        """
+        if directory is None:
+            directory = os.environ.get(self.ENVIRONMENT_VARIABLE, Path.home() / '.cache' / 'dervet' / 'solutions')
+        super().__init__(directory, max_size)
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_params(cls, scenario_params):
+        """ Create the solution cache from the user's Scenario inputs (both of which are optional)
+
+        Args:
+            scenario_params (dict): Scenario inputs
+
+        Returns: a SolutionCache, or None if the user did not turn the cache on
+
+        """
+        if not scenario_params.get('solution_cache'):
+            return None
+        return cls(max_size=scenario_params.get('solution_cache_size'))
+
+    def key(self, prob, settings):
+        """ Key of a problem's entry in the cache
+
+        Args:
+            prob (cvx.Problem): the problem of an optimization window
+            settings (tuple): anything else that changes how the problem is solved (solvers, tolerances, etc.)
+
+        Returns: hex digest of the problem and SETTINGS, and the variables of the problem in the order they were
+            found (the order their values are saved in)
+
+        """
+        variables = []
+        digests = {}
+        digest = hashlib.sha256(repr((self.VERSION, cvx.__version__, settings)).encode())
+        digest.update(self.node_digest(prob.objective, variables, digests))
+        for constraint in prob.constraints:
+            digest.update(self.node_digest(constraint, variables, digests))
+        return digest.hexdigest(), variables
+
+    def node_digest(self, node, variables, digests):
+        """ Digest of an objective, constraint, or expression (results are memoized, as DERs and value streams
+        share expressions)
+
+        Args:
+            node (cvx.Canonical): the objective, constraint, or expression
+            variables (list): the variables found so far. A variable is hashed by its position in this list,
+                so the key does not depend on the ids CVXPY gave the variables
+            digests (dict): digest of each node hashed so far, keyed by its id
+
+        Returns: the digest (bytes)
+
+        """
+        key = id(node)
+        if key not in digests:
+            digest = hashlib.sha256(type(node).__name__.encode())
+            digest.update(repr(getattr(node, 'shape', None)).encode())
+            if isinstance(node, Variable):
+                variables.append(node)
+                attributes = sorted(name for name, value in node.attributes.items() if value is True)
+                digest.update(repr((len(variables), node.name(), attributes)).encode())
+            elif isinstance(node, Leaf):
+                self.update_with_data(digest, node.value)
+            else:
+                # (the data of a constraint is its id)
+                if hasattr(node, 'get_data') and not isinstance(node, Constraint):
+                    self.update_with_data(digest, node.get_data())
+                for arg in node.args:
+                    digest.update(self.node_digest(arg, variables, digests))
+            digests[key] = digest.digest()
+        return digests[key]
+
+    @classmethod
+    def update_with_data(cls, digest, data):
+        """ Adds a value (or the data -- axis, indices, etc. -- that describes an atom) to a digest """
+        if isinstance(data, (list, tuple)):
+            digest.update(f'{type(data).__name__}{len(data)}'.encode())
+            for item in data:
+                cls.update_with_data(digest, item)
+            return
+        if sp.issparse(data):
+            data = data.toarray()
+        if isinstance(data, np.ndarray):
+            data = np.ascontiguousarray(data)
+            digest.update(repr((data.dtype.str, data.shape)).encode())
+            digest.update(data.tobytes())
+            return
+        digest.update(repr(data).encode())
+
+    def load(self, key):
+        """ Finds the solution of a problem that was solved before
+
+        Args:
+            key (str): result of the key method
+
+        Returns: the CachedSolution, or None if it is not in the cache
+
+        """
+        path = self.directory / f'{key}.pkl'
+        try:
+            with open(path, 'rb') as file:
+                solution = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            self.misses += 1
+            return None
+        self.touch(path)
+        self.hits += 1
+        return solution
+
+    def save(self, key, prob, variables):
+        """ Saves the solution of a problem, then evicts the least recently used solutions if the cache is too big
+
+        Args:
+            key (str): result of the key method
+            prob (cvx.Problem): the solved problem
+            variables (list): the variables of the problem (from the key method), after the solution was saved
+                to them
+
+        """
+        values = [variable.value for variable in variables]
+        if prob.status != cvx.OPTIMAL or any(value is None for value in values):
+            return
+        solution = CachedSolution(prob.status, getattr(prob.solver_stats, 'solver_name', None), values)
+        path = self.directory / f'{key}.pkl'
+        # write to a temporary file first, so that another run never reads a partial entry
+        temporary = path.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(temporary, 'wb') as file:
+                pickle.dump(solution, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)
+        except (OSError, pickle.PicklingError) as e:
+            TellUser.warning(f"Could not save a solution to the solution cache ({self.directory}): {e}")
+            return
+        self.saved(path)
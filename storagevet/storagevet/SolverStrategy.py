@@ -0,0 +1,247 @@
+"""
+Copyright (c) 2024, Electric Power Research Institute
+
+ All rights reserved.
+
+ Redistribution and use in source and binary forms, with or without modification,
+ are permitted provided that the following conditions are met:
+
+     * Redistributions of source code must retain the above copyright notice,
+       this list of conditions and the following disclaimer.
+     * Redistributions in binary form must reproduce the above copyright notice,
+       this list of conditions and the following disclaimer in the documentation
+       and/or other materials provided with the distribution.
+     * Neither the name of DER-VET nor the names of its contributors
+       may be used to endorse or promote products derived from this software
+       without specific prior written permission.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+ A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+ CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+ EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+ PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+ PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+ LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+ NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+"""
+SolverStrategy.py
+
+This file holds the SolverStrategy class, which decides which solvers are tried (and in what order)
+when solving an optimization problem.
+"""
+
+import time
+import numpy as np
+import cvxpy as cvx
+from storagevet.ErrorHandling import *
+
+
+class SolverStrategy:
+    """ An ordered list of solvers to try when solving an optimization problem. If a solver fails, then
+    the next one in the list is tried. Unless the user gives the list, mixed-integer problems
+    (binary formulation) and linear programs each get a default list.
+
+    """
+    # default solvers, in the order they are tried
+    MIP_SOLVERS = ['GLPK_MI', 'ECOS_BB', 'HIGHS']
+    LP_SOLVERS = ['HIGHS', 'CLARABEL', 'GLPK_MI', 'ECOS_BB']
+
+    # names of the options each solver has for: a time limit (seconds), a relative MIP gap, and a number of threads
+    OPTION_NAMES = {
+        'HIGHS': ('time_limit', 'mip_rel_gap', None),
+        'GLPK_MI': ('tm_lim', 'mip_gap', None),
+        'ECOS_BB': (None, 'mi_rel_eps', None),
+        'CLARABEL': ('time_limit', None, None),
+        'OSQP': ('time_limit', None, None),
+        'SCS': ('time_limit_secs', None, None),
+        'CBC': ('maximumSeconds', 'allowableFractionGap', 'numberThreads'),
+        'GUROBI': ('TimeLimit', 'MIPGap', 'Threads'),
+        'CPLEX': (None, None, None),
+        'MOSEK': (None, None, None),
+    }
+
+    # solvers that start from the initial values given to the variables when warm started
+    VALUE_WARM_START_SOLVERS = ['GUROBI', 'CPLEX']
+    # solvers that start from their last solution of the same problem (a shared parametric problem) when warm started
+    CACHE_WARM_START_SOLVERS = ['OSQP', 'SCS']
+
+    def __init__(self, solvers=None, time_limit=None, mip_gap=None, threads=None, warm_start=True):
+        """ Initialize the solver strategy
+
+        Args:
+            solvers (list): names of the solvers to try (in order). If None, then the default list for the
+                type of problem (mixed-integer or not) is used
+            time_limit (float): the most time (in seconds) a solver can take on a problem
+            mip_gap (float): relative gap at which a mixed-integer solve can stop
+            threads (int): number of threads a solver can use
+            warm_start (bool): start each problem that asks for a warm start from the solution of the one before it
+
+        """
+        self.solvers = [solver.upper() for solver in solvers] if solvers else None
+        self.time_limit = time_limit
+        self.mip_gap = mip_gap
+        self.threads = threads
+        self.warm_start = warm_start
+        self.last_solve = {}
+        self.last_solution = {}  # values of the variables of the last problem solved with a warm start, keyed by name
+        self.cold_start_iterations = {}  # iterations each solver took on the last problem it solved without a warm start
+        if self.solvers is not None:
+            unknown = [solver for solver in self.solvers if solver not in self.OPTION_NAMES]
+            if len(unknown):
+                TellUser.error(f"Unknown solver(s): {', '.join(unknown)}. Allowed solvers: {', '.join(self.OPTION_NAMES)}")
+                raise ModelParameterError(f"Unknown solver(s): {', '.join(unknown)}")
+
+    @classmethod
+    def from_params(cls, scenario_params):
+        """ Create the solver strategy from the user's Scenario inputs (all of which are optional)
+
+        Args:
+            scenario_params (dict): Scenario inputs
+
+        Returns: a SolverStrategy
+
+        """
+        warm_start = scenario_params.get('solver_warm_start')
+        return cls(scenario_params.get('solvers'), scenario_params.get('solver_time_limit'),
+                   scenario_params.get('solver_mip_gap'), scenario_params.get('solver_threads'),
+                   True if warm_start is None else bool(warm_start))
+
+    @staticmethod
+    def is_installed(solver):
+        """ True if SOLVER can be used with the version of CVXPY (and solver packages) that is installed """
+        installed = cvx.installed_solvers()
+        if solver == 'HIGHS':
+            # HiGHS is used through SciPy in older versions of CVXPY
+            return solver in installed or 'SCIPY' in installed
+        return solver in installed
+
+    def sequence(self, prob):
+        """ The solvers to try on a problem, in order
+
+        Args:
+            prob (cvx.Problem): the optimization problem
+
+        Returns: list of solver names
+
+        """
+        if self.solvers is not None:
+            solvers = self.solvers
+        elif prob.is_mixed_integer():
+            solvers = self.MIP_SOLVERS
+        else:
+            solvers = self.LP_SOLVERS
+        return [solver for solver in solvers if self.is_installed(solver)]
+
+    def options(self, solver, mixed_integer):
+        """ Keyword arguments that pass the time limit, MIP gap, and threads to a solver
+
+        Args:
+            solver (str): name of the solver
+            mixed_integer (bool): whether the problem has integer variables
+
+        Returns: dict of keyword arguments to cvx.Problem.solve
+
+        """
+        time_limit_name, mip_gap_name, threads_name = self.OPTION_NAMES[solver]
+        options = {}
+        if self.time_limit is not None and time_limit_name is not None:
+            # GLPK takes its time limit in milliseconds
+            options[time_limit_name] = int(self.time_limit * 1000) if solver == 'GLPK_MI' else self.time_limit
+        if self.mip_gap is not None and mip_gap_name is not None and mixed_integer:
+            options[mip_gap_name] = self.mip_gap
+        if self.threads is not None and threads_name is not None:
+            options[threads_name] = self.threads
+        if solver == 'HIGHS' and 'HIGHS' not in cvx.installed_solvers():
+            return {'solver': cvx.SCIPY, 'scipy_options': dict(options, method='highs')}
+        return dict(options, solver=solver)
+
+    def load_initial_values(self, prob):
+        """ Gives the variables of a problem the values that the variables of the same name had in the last
+        solution, tiled (or cut short) to the length of the new variable
+
+        Args:
+            prob (cvx.Problem): the optimization problem
+
+        Returns: the number of variables that were given an initial value
+
+        """
+        loaded = 0
+        for variable in prob.variables():
+            value = self.last_solution.get(variable.name())
+            if value is None:
+                continue
+            if value.shape != variable.shape:
+                value = np.resize(value, variable.shape)
+            # save_value skips the checks (like integrality) that setting value does, since this is only a starting point
+            variable.save_value(value)
+            loaded += 1
+        return loaded
+
+    def starts_warm(self, prob, solver):
+        """ Whether a solver will have a starting point when it is asked to warm start
+
+        Args:
+            prob (cvx.Problem): the optimization problem
+            solver (str): name of the solver
+
+        Returns: bool
+
+        """
+        if solver in self.VALUE_WARM_START_SOLVERS:
+            return any(variable.name() in self.last_solution for variable in prob.variables())
+        if solver in self.CACHE_WARM_START_SOLVERS:
+            return solver in (getattr(prob, '_solver_cache', None) or {})
+        return False
+
+    def solve(self, prob, verbose=False, warm_start=False, **kwargs):
+        """ Tries each solver in the sequence until one of them solves the problem
+
+        Args:
+            prob (cvx.Problem): the optimization problem
+            verbose (bool): print the solver's output
+            warm_start (bool): start from the solution of the last problem that was solved with a warm start
+                (ignored if the user turned warm starts off)
+            **kwargs: any other arguments to cvx.Problem.solve
+
+        Returns: the name of the solver that solved the problem
+
+        Raises: the last cvx.error.SolverError (or RuntimeError) if every solver fails
+
+        """
+        mixed_integer = prob.is_mixed_integer()
+        sequence = self.sequence(prob)
+        if not len(sequence):
+            raise cvx.error.SolverError("None of the solvers that were requested are installed.")
+        warm_start = warm_start and self.warm_start
+        initial_values = None
+        start = time.time()
+        for attempt, solver in enumerate(sequence):
+            solver_warm_start = warm_start and self.starts_warm(prob, solver)
+            if solver_warm_start and solver in self.VALUE_WARM_START_SOLVERS and initial_values is None:
+                # only solvers that start from the variables' values need them (once, for all such solvers)
+                initial_values = self.load_initial_values(prob)
+            try:
+                TellUser.debug(f"Using {solver} solver")
+                prob.solve(verbose=verbose, warm_start=solver_warm_start, **self.options(solver, mixed_integer), **kwargs)
+            except (cvx.error.SolverError, RuntimeError) as e:
+                TellUser.debug(f"{e}")
+                if attempt + 1 == len(sequence):
+                    self.last_solve = {'solver': None, 'solve time (s)': time.time() - start, 'attempts': attempt + 1}
+                    raise
+                TellUser.debug("The solver was unable to find a solution... let's try another solver.")
+                continue
+            iterations = getattr(prob.solver_stats, 'num_iters', None)
+            if not solver_warm_start and iterations is not None:
+                self.cold_start_iterations[solver] = iterations
+            self.last_solve = {'solver': solver, 'solve time (s)': time.time() - start, 'attempts': attempt + 1,
+                               'warm start': solver_warm_start, 'iterations': iterations,
+                               # the baseline that a warm start is compared to
+                               'cold start iterations': self.cold_start_iterations.get(solver)}
+            if warm_start:
+                self.last_solution = {variable.name(): np.asarray(variable.value) for variable in prob.variables()
+                                      if variable.value is not None}
+            return solver
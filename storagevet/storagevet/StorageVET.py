@@ -37,6 +37,7 @@ This Python script serves as the initial launch point executing the Python-based
 from storagevet.Scenario import Scenario
 from storagevet.Params import Params
 from storagevet.Result import Result
+from storagevet.Checkpoint import Checkpoint
 import time
 from storagevet.Visualization import Visualization
 from storagevet.ErrorHandling import *
@@ -48,18 +49,21 @@ class StorageVET:
 
     """
 
-    def __init__(self, model_parameters_path, verbose=False):
+    def __init__(self, model_parameters_path, verbose=False, resume=None):
         """ Constructor to initialize the parameters and data needed to run StorageVET.
         Initialize the Params Object from Model Parameters
 
             Args:
                 model_parameters_path (str): Filename of the model parameters CSV or JSON that
                     describes the case to be analysed
+                resume (str, Path): results folder of an earlier run to resume from. Optimization windows
+                    saved in its checkpoints are skipped
         """
         self.verbose = verbose
         # Initialize the Params Object from Model Parameters
         self.case_dict = Params.initialize(model_parameters_path, verbose)  # unvalidated case instances
         self.results = Result.initialize(Params.results_inputs, Params.case_definitions)
+        self.resume_path = Checkpoint.resume_folder(resume)
         if verbose:
             self.visualization = Visualization(Params)
             self.visualization.class_summary()
@@ -71,12 +75,19 @@ class StorageVET:
 
         """
         starts = time.time()
-        for key, value in self.case_dict.items():
+        for key, value in Params.load_and_prepare():
             run = Scenario(value)
+            run.checkpoint = Checkpoint.for_case(Result.dir_abs_path, key, value, self.resume_path)
             run.set_up_poi_and_service_aggregator()
             run.initialize_cba()
             run.fill_and_drop_extra_data()
-            run.optimize_problem_loop()
+            try:
+                run.optimize_problem_loop()
+            except (Exception, KeyboardInterrupt):
+                # keep the windows solved before the error, so the run can be resumed
+                run.save_checkpoint(force=True)
+                raise
+            run.checkpoint.remove()
 
             Result.add_instance(key, run)  # cost benefit analysis is in the Result class
 
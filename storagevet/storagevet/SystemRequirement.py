@@ -34,6 +34,7 @@ This file hold 2 classes: Requirements and System Requirements
 """
 
 import storagevet.Library as Lib
+from storagevet.OptimizationWindow import OptimizationWindow
 import numpy as np
 import pandas as pd
 
@@ -155,13 +156,13 @@ class SystemRequirement:
         """
 
         Args:
-            mask (DataFrame): DataFrame of booleans used, the same length as time_series. The value is true if the
-                corresponding column in time_series is included in the data to be optimized.
+            mask (OptimizationWindow): the timesteps of the optimization window (a boolean mask, the same
+                length as time_series, is also accepted)
 
         Returns: the value of this requirement at the times that correspond to the mask given
 
         """
-        return self.value.loc[mask].values
+        return OptimizationWindow.create(mask).subset(self.value).values
 
     def __le__(self, other):
         """  x<=y calls x.__le__(y)
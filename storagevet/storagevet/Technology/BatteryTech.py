@@ -33,11 +33,12 @@ BatteryTech.py
 This Python class contains methods and attributes specific for technology analysis within StorageVet.
 """
 from .EnergyStorage import EnergyStorage
+import copy
 import numpy as np
 import pandas as pd
-import rainflow
+from storagevet.CycleCounting import RainflowCounter
 from storagevet.ErrorHandling import *
-from storagevet.Library import truncate_float, is_leap_yr
+from storagevet.Library import truncate_float, is_leap_yr, yearly_sum, yearly_index
 import cvxpy as cvx
 
 
@@ -45,6 +46,9 @@ class Battery(EnergyStorage):
     """ Battery class that inherits from Storage.
 
     """
+    # the attributes that calc_degradation changes
+    DEGRADATION_STATE = ['degrade_perc', 'soh', 'degrade_data', 'cycle_counter', 'effective_soe_max',
+                         'effective_soe_min']
 
     def __init__(self, params):
         """ Initializes a battery class that inherits from the technology class.
@@ -70,7 +74,11 @@ class Battery(EnergyStorage):
         self.eol_condition = params['cycle_life_table_eol_condition'] / 100
         self.incl_degradation = bool(params['incl_degradation'])
         self.degrade_data = None
-        self.counted_cycles = []
+        self.cycle_counter = None
+        # solve optimization windows in parallel with a predicted degradation, solving again the windows whose
+        # effective energy capacity is off by more than this fraction of the rated energy capacity
+        self.parallel_degradation_tolerance = (params.get('parallel_degradation_tolerance') or 0) / 100
+        self.degradation_reconciliation = None
 
     def initialize_degradation_module(self, opt_agg):
         """
@@ -90,6 +98,7 @@ class Battery(EnergyStorage):
             self.degrade_data['degradation progress %'] = self.degrade_perc
             self.degrade_data['state of health %'] = self.soh * 1e2
             self.degrade_data['effective energy capacity (kWh)'] = self.degraded_energy_capacity()
+            self.cycle_counter = RainflowCounter(self.cycle_life['Cycle Depth Upper Limit'])
             self.calc_degradation('Optimization Start', None, None)
 
     def degraded_energy_capacity(self):
@@ -127,41 +136,17 @@ class Battery(EnergyStorage):
 
             if not isinstance(opt_period, str):
                 # calculate degradation due to cycling iff energy values are given
-                energy_series = self.variables_df.loc[start_dttm:last_dttm, 'ene']
+                energy_series = self.variable_results.between('ene', start_dttm, last_dttm)
                 # Find the effective energy capacity
                 eff_e_cap = self.degraded_energy_capacity()
 
-                #If using rainflow counting package uncomment following few lines
-                # use rainflow counting algorithm to get cycle counts
-                # cycle_counts = rainflow.count_cycles(energy_series, ndigits=4)
-                #
-                # aux_df = pd.DataFrame(cycle_counts, columns=['DoD', 'N_cycles'])
-                # aux_df['Opt window'] = opt_period
-                #
-                # # sort cycle counts into user inputed cycle life bins
-                # digitized_cycles = np.searchsorted(self.cycle_life['Cycle Depth Upper Limit'],[min(i[0]/eff_e_cap, 1) for i in cycle_counts], side='left')
-
-                # use rainflow extract function to get information on each cycle
-                cycle_extract=list(rainflow.extract_cycles(energy_series))
-                aux_df = pd.DataFrame(cycle_extract, columns=['rng', 'mean','count','i_start','i_end'])
-                aux_df['Opt window'] = opt_period
-
-                # sort cycle counts into user inputed cycle life bins
-                # NOTE: digitized_cycles can be out of range here if cycle depth > 1
-                digitized_cycles = np.searchsorted(self.cycle_life['Cycle Depth Upper Limit'],[min(i[0] / eff_e_cap, 1) for i in cycle_extract], side='left')
-                aux_df['Input_cycle_DoD_mapping'] = np.array(self.cycle_life['Cycle Depth Upper Limit'][digitized_cycles]*eff_e_cap)
-                aux_df['Cycle Life Value'] = np.array(self.cycle_life['Cycle Life Value'][digitized_cycles] )
-
-                self.counted_cycles.append(aux_df.copy())
-                # sum up number of cycles for all cycle counts in each bin
-                cycle_sum = self.cycle_life.loc[:, :]
-                cycle_sum.loc[:, 'cycles'] = 0.0
-                for i in range(len(cycle_extract)):
-                    cycle_sum.loc[digitized_cycles[i], 'cycles'] += cycle_extract[i][2]
+                # count the cycles in this window (continuing any cycle left open by the windows before it),
+                # sorted into the user inputted cycle life bins
+                cycles = self.cycle_counter.count(energy_series.values, eff_e_cap, opt_period)
 
                 # sum across bins to get total degrade percent
                 # 1/cycle life value is degrade percent for each cycle
-                cycle_degrade = np.dot(1/cycle_sum['Cycle Life Value'], cycle_sum.cycles)* (1 - self.eol_condition)
+                cycle_degrade = np.dot(1 / self.cycle_life['Cycle Life Value'].values, cycles) * (1 - self.eol_condition)
 
             if start_dttm is not None and last_dttm is not None:
                 # add the yearly degradation linearly to the # of years from START_DTTM to (END_DTTM + dt)
@@ -189,13 +174,49 @@ class Battery(EnergyStorage):
             self.effective_soe_max = eff_e_cap * self.ulsoc
             self.effective_soe_min = eff_e_cap * self.llsoc
 
+    def degradation_state(self):
+        """ Returns: a copy of the attributes that calc_degradation changes, so that the degradation of the
+        optimization windows can be calculated again from the same start (see restore_degradation_state)
+
+        """
+        return copy.deepcopy({attr: getattr(self, attr) for attr in self.DEGRADATION_STATE})
+
+    def restore_degradation_state(self, state):
+        """ Undoes any degradation calculated since STATE was taken
+
+        Args:
+            state (dict): from degradation_state
+
+        """
+        for attr, value in copy.deepcopy(state).items():
+            setattr(self, attr, value)
+
+    def set_degradation(self, degrade_perc):
+        """ Sets the degradation progress (and so the effective energy capacity) that the next optimization window
+        is solved with
+
+        Args:
+            degrade_perc (float): degradation progress (as a fraction of the rated energy capacity)
+
+        """
+        self.degrade_perc = degrade_perc
+        eff_e_cap = self.degraded_energy_capacity()
+        self.effective_soe_max = eff_e_cap * self.ulsoc
+        self.effective_soe_min = eff_e_cap * self.llsoc
+
+    def capacity_difference(self, degrade_perc1, degrade_perc2):
+        """ Returns: the difference between the effective energy capacities of two degradation progresses, as a
+        fraction of the rated energy capacity
+
+        """
+        return abs(degrade_perc1 - degrade_perc2)
+
     def constraints(self, mask, **kwargs):
         """Default build constraint list method. Used by services that do not
         have constraints.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices
-                corresponding to time_series data included in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns:
             A list of constraints that corresponds the battery's physical
@@ -220,7 +241,7 @@ class Battery(EnergyStorage):
         super().save_variable_results(subs_index)
         # check for charging and discharging in same time step
         eps = 1e-4
-        if np.any((self.variables_df.loc[subs_index, 'ch'].values >= eps) & (self.variables_df.loc[subs_index, 'dis'].values >= eps)):
+        if np.any((self.variables_dict['ch'].value >= eps) & (self.variables_dict['dis'].value >= eps)):
             TellUser.warning('non-zero charge and discharge powers found in optimization solution. Try binary formulation')
 
     def proforma_report(self, apply_inflation_rate_func, fill_forward_func, results):
@@ -244,9 +265,8 @@ class Battery(EnergyStorage):
             hp_proforma = pd.DataFrame()
             if results.columns.isin(['Energy Price ($/kWh)']).any():
                 hp_cost = self.dt * -results.loc[:, 'Energy Price ($/kWh)'] * self.hp
-                for year in optimization_years:
-                    year_monthly = hp_cost[hp_cost.index.year == year]
-                    hp_proforma.loc[pd.Period(year=year, freq='Y'), tech_id + ' Aux Load Cost'] = year_monthly.sum()
+                hp_proforma[tech_id + ' Aux Load Cost'] = \
+                    yearly_sum(hp_cost).reindex(yearly_index(optimization_years), fill_value=0)
             # fill forward
             hp_proforma = fill_forward_func(hp_proforma, None)
             # append will super class's proforma
@@ -272,8 +292,14 @@ class Battery(EnergyStorage):
         if self.incl_degradation:
             DCT[f"{self.name.replace(' ', '_')}_degradation_data"] = self.degrade_data
 
-            total_counted_cycles = pd.concat(self.counted_cycles)
+            total_counted_cycles = self.cycle_counter.cycle_log()
+            bins = total_counted_cycles.pop('bin').values.astype(int)
+            total_counted_cycles['Input_cycle_DoD_mapping'] = \
+                self.cycle_life['Cycle Depth Upper Limit'].values[bins] * total_counted_cycles.pop('scale').values
+            total_counted_cycles['Cycle Life Value'] = self.cycle_life['Cycle Life Value'].values[bins]
 
             DCT[f"{self.name.replace(' ', '_')}_cycle_counting"] = total_counted_cycles
+            if self.degradation_reconciliation is not None:
+                DCT[f"{self.name.replace(' ', '_')}_degradation_reconciliation"] = self.degradation_reconciliation
 
         return DCT
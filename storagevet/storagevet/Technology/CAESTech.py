@@ -73,7 +73,7 @@ class CAES(EnergyStorage):
         """ Generates the objective costs for fuel cost and O&M cost
 
          Args:
-            mask (Series): Series of booleans used, the same length as case.power_kw
+            mask (OptimizationWindow): the timesteps of the optimization window
             annuity_scalar (float): a scalar value to be multiplied by any yearly cost or benefit that helps capture the cost/benefit over
                         the entire project lifetime (only to be set iff sizing)
 
@@ -95,18 +95,11 @@ class CAES(EnergyStorage):
         if self.variables_df.index.empty:
             return pro_forma
         tech_id = self.unique_tech_id()
-        optimization_years = self.variables_df.index.year.unique()
-        dis = self.variables_df['dis']
-        udis = self.variables_df['udis']
+        yearly = Lib.yearly_sum(self.variables_df[['dis', 'udis']])
 
         # add CAES fuel costs in $/kW
-        fuel_costs = pd.DataFrame()
         fuel_col_name = tech_id + ' Fuel Costs'
-        for year in optimization_years:
-            dis_sub = dis.loc[dis.index.year == year]
-            udis_sub = udis.loc[udis.index.year == year]
-            # add fuel costs in $/kW
-            fuel_costs.loc[pd.Period(year=year, freq='Y'), fuel_col_name] = -np.sum(self.heat_rate * self.fuel_cost * self.dt * (dis_sub + udis_sub))
+        fuel_costs = pd.DataFrame({fuel_col_name: -self.heat_rate * self.fuel_cost * self.dt * (yearly['dis'] + yearly['udis'])})
         # fill forward
         fuel_costs = fill_forward_func(fuel_costs, None)
         # append with super class's proforma
@@ -36,6 +36,7 @@ import pandas as pd
 import numpy as np
 import cvxpy as cvx
 from storagevet.ErrorHandling import *
+from storagevet.ResultsBuffer import ResultsBuffer
 
 
 class DER:
@@ -61,7 +62,7 @@ class DER:
         self.id = params.get('ID')
 
         # attributes about specific to each DER
-        self.variables_df = pd.DataFrame()  # optimization variables are saved here
+        self.variable_results = ResultsBuffer()  # optimization variables are saved here
         self.variables_dict = {}  # holds the CVXPY variables upon creation in the technology instance
 
         # boolean attributes
@@ -170,41 +171,37 @@ class DER:
     def get_state_of_energy(self, mask):
         """
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the state of energy as a function of time for the
 
         """
-        return cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name=f'{self.name}-Zero')
+        return cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name=f'{self.name}-Zero')
 
     def get_discharge(self, mask):
         """ The effective discharge of this DER
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the discharge as a function of time for the
 
         """
-        return cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name=f'{self.name}-Zero')
+        return cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name=f'{self.name}-Zero')
 
     def get_charge(self, mask):
         """
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the charge as a function of time for the
 
         """
-        return cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name=f'{self.name}-Zero')
+        return cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name=f'{self.name}-Zero')
 
     def get_net_power(self, mask):
         """
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the net power [= charge - discharge] as a function of time for the
 
@@ -216,52 +213,48 @@ class DER:
         this DER can schedule to reserve
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
         """
-        return cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name=f'{self.name}ZeroUp')
+        return cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name=f'{self.name}ZeroUp')
 
     def get_charge_down_schedule(self, mask):
         """ the amount of charging power in the up direction (pulling power down from the grid) that
         this DER can schedule to reserve
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
         """
-        return cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name=f'{self.name}ZeroDown')
+        return cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name=f'{self.name}ZeroDown')
 
     def get_discharge_up_schedule(self, mask):
         """ the amount of discharge power in the up direction (supplying power up into the grid) that
         this DER can schedule to reserve
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
         """
-        return cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name=f'{self.name}ZeroUp')
+        return cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name=f'{self.name}ZeroUp')
 
     def get_discharge_down_schedule(self, mask):
         """ the amount of discharging power in the up direction (pulling power down from the grid) that
         this DER can schedule to reserve
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
         """
-        return cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name=f'{self.name}ZeroDown')
+        return cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name=f'{self.name}ZeroDown')
 
     def get_delta_uenegy(self, mask):
         """ the amount of energy, from the current SOE level the DER's state of energy changes
@@ -270,7 +263,7 @@ class DER:
         Returns: the energy throughput in kWh for this technology
 
         """
-        return cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name=f'{self.name}Zero')
+        return cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name=f'{self.name}Zero')
 
     def get_uenergy_increase(self, mask):
         """ the amount of energy in a timestep that is provided to the distribution grid
@@ -278,7 +271,7 @@ class DER:
         Returns: the energy throughput in kWh for this technology
 
         """
-        return cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name=f'{self.name}Zero')
+        return cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name=f'{self.name}Zero')
 
     def get_uenergy_decrease(self, mask):
         """ the amount of energy in a timestep that is taken from the distribution grid
@@ -286,13 +279,13 @@ class DER:
         Returns: the energy throughput in kWh for this technology
 
         """
-        return cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name=f'{self.name}Zero')
+        return cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name=f'{self.name}Zero')
 
     def objective_function(self, mask, annuity_scalar=1):
         """ Generates the objective function related to a technology. Default includes O&M which can be 0
 
         Args:
-            mask (Series): Series of booleans used, the same length as case.power_kw
+            mask (OptimizationWindow): the timesteps of the optimization window
             annuity_scalar (float): a scalar value to be multiplied by any yearly cost or benefit that helps capture the cost/benefit over
                 the entire project lifetime (only to be set iff sizing)
 
@@ -305,8 +298,7 @@ class DER:
         """Default build constraint list method. Used by services that do not have constraints.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns:
             A list of constraints that corresponds the battery's physical constraints and its service constraints
@@ -321,8 +313,26 @@ class DER:
             subs_index (Index): index of the subset of data for which the variables were solved for
 
         """
-        variable_values = pd.DataFrame({name: variable.value for name, variable in self.variables_dict.items()}, index=subs_index)
-        self.variables_df = pd.concat([self.variables_df, variable_values], sort=True)
+        self.variable_results.save({name: variable.value for name, variable in self.variables_dict.items()}, subs_index)
+
+    def initialize_variable_results(self, horizon_index):
+        """ Allocates room for the optimization variables of every timestep that will be optimized over, so the
+        solution of each window can be written in place
+
+        Args:
+            horizon_index (Index): index of every timestep included in an optimization window
+
+        """
+        self.variable_results = ResultsBuffer(horizon_index)
+
+    @property
+    def variables_df(self):
+        """ DataFrame of the optimization variables solved for so far (built from the results buffer) """
+        return self.variable_results.frame()
+
+    @variables_df.setter
+    def variables_df(self, frame):
+        self.variable_results = ResultsBuffer.from_frame(frame)
 
     def unique_tech_id(self):
         """ String id that serves as the prefix for reporting optimization variables for specific DER via timeseries
@@ -35,6 +35,7 @@ This Python class contains methods and attributes specific for technology analys
 import cvxpy as cvx
 import numpy as np
 import pandas as pd
+import storagevet.Library as Lib
 from storagevet.Technology.DistributedEnergyResource import DER
 from storagevet.ErrorHandling import *
 
@@ -190,8 +191,7 @@ class EnergyStorage(DER):
     def get_state_of_energy(self, mask):
         """
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the state of energy as a function of time for the
 
@@ -201,8 +201,7 @@ class EnergyStorage(DER):
     def get_discharge(self, mask):
         """
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the discharge as a function of time for the
 
@@ -212,8 +211,7 @@ class EnergyStorage(DER):
     def get_charge(self, mask):
         """
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the charge as a function of time for the
 
@@ -235,8 +233,7 @@ class EnergyStorage(DER):
         this DER can schedule to reserve
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
@@ -251,8 +248,7 @@ class EnergyStorage(DER):
         this DER can schedule to reserve
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
@@ -267,8 +263,7 @@ class EnergyStorage(DER):
         this DER can schedule to reserve
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
@@ -283,8 +278,7 @@ class EnergyStorage(DER):
         this DER can schedule to reserve
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
@@ -323,7 +317,7 @@ class EnergyStorage(DER):
         """ Generates the objective function related to a technology. Default includes O&M which can be 0
 
         Args:
-            mask (Series): Series of booleans used, the same length as case.power_kW
+            mask (OptimizationWindow): the timesteps of the optimization window
             annuity_scalar (float): a scalar value to be multiplied by any yearly cost or benefit that helps capture the cost/benefit over
                     the entire project lifetime (only to be set iff sizing, else annuity_scalar should not affect the aobject function)
 
@@ -350,14 +344,13 @@ class EnergyStorage(DER):
         """Default build constraint list method. Used by services that do not have constraints.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns:
             A list of constraints that corresponds the battery's physical constraints and its service constraints
         """
         constraint_list = []
-        size = int(np.sum(mask))
+        size = mask.size
 
         ene_target = self.soc_target * self.effective_soe_max   # this is init_ene
 
@@ -409,10 +402,8 @@ class EnergyStorage(DER):
         # (number of cycles * energy capacity) per day, for technology warranty purposes
         # this constraint only applies when optimization window is equal to or greater than 24 hours
         if self.daily_cycle_limit and size >= 24:
-            sub = mask.loc[mask]
-            for day in sub.index.dayofyear.unique():
-                day_mask = (day == sub.index.dayofyear)
-                constraint_list += [cvx.NonPos(cvx.sum(dis[day_mask] + udis[day_mask]) * self.dt - self.ene_max_rated * self.daily_cycle_limit)]
+            days = mask.day_aggregation()
+            constraint_list += [cvx.NonPos(days @ (dis + udis) * self.dt - self.ene_max_rated * self.daily_cycle_limit)]
         elif self.daily_cycle_limit and size < 24:
             TellUser.info('Daily cycle limit did not apply as optimization window is less than 24 hours.')
 
@@ -505,32 +496,21 @@ class EnergyStorage(DER):
         pro_forma = super().proforma_report(apply_inflation_rate_func, fill_forward_func, results)
         if self.variables_df.index.empty:
             return pro_forma
-        optimization_years = self.variables_df.index.year.unique()
         tech_id = self.unique_tech_id()
-        startup_costs = pd.DataFrame()
-        # OM COSTS
-        om_costs = pd.DataFrame()
-        cumulative_energy_dispatch_kw = pd.DataFrame()
-        dis = self.variables_df['dis']
-        udis = self.variables_df['udis']
         dis_column_name = tech_id + ' Cumulative Energy Dispatch (kW)'
         variable_column_name = tech_id + ' Variable O&M Cost'
-        for year in optimization_years:
-            index_yr = pd.Period(year=year, freq='Y')
-            # add fixed o&m costs
-            om_costs.loc[index_yr, self.fixed_column_name()] = -self.fixedOM_perKW
-            # add variable o&m costs
-            dis_sub = dis.loc[dis.index.year == year]
-            udis_sub = udis.loc[udis.index.year == year]
-            om_costs.loc[index_yr, variable_column_name] = -self.variable_om
-            cumulative_energy_dispatch_kw.loc[index_yr, dis_column_name] = np.sum(dis_sub) + np.sum(udis_sub)
-
-            # add startup costs
-            if self.incl_startup:
-                start_c_sub = self.variables_df['start_c'].loc[self.variables_df['start_c'].index.year == year]
-                startup_costs.loc[index_yr, tech_id + ' Start Charging Costs'] = -np.sum(start_c_sub * self.p_start_ch)
-                start_d_sub = self.variables_df['start_d'].loc[self.variables_df['start_d'].index.year == year]
-                startup_costs.loc[index_yr, tech_id + ' Start Discharging Costs'] = -np.sum(start_d_sub * self.p_start_dis)
+        # sum each optimization year's results
+        yearly_variables = ['dis', 'udis'] + (['start_c', 'start_d'] if self.incl_startup else [])
+        yearly = Lib.yearly_sum(self.variables_df[yearly_variables])
+        # OM COSTS (fixed and variable o&m rates)
+        om_costs = pd.DataFrame({self.fixed_column_name(): -self.fixedOM_perKW,
+                                 variable_column_name: -self.variable_om}, index=yearly.index)
+        cumulative_energy_dispatch_kw = pd.DataFrame({dis_column_name: yearly['dis'] + yearly['udis']})
+
+        # add startup costs
+        if self.incl_startup:
+            startup_costs = pd.DataFrame({tech_id + ' Start Charging Costs': -yearly['start_c'] * self.p_start_ch,
+                                          tech_id + ' Start Discharging Costs': -yearly['start_d'] * self.p_start_dis})
 
         # fill forward (escalate rates)
         if self.incl_startup:
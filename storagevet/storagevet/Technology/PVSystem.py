@@ -36,6 +36,7 @@ from storagevet.Technology.DistributedEnergyResource import DER
 import cvxpy as cvx
 import pandas as pd
 import storagevet.Library as Lib
+from storagevet.OptimizationWindow import OptimizationWindow
 from storagevet.ErrorHandling import *
 
 
@@ -116,6 +117,7 @@ class PV(DER):
                 a list or array of labels, e.g. ['a', 'b', 'c'],
                 a boolean array of the same length as the axis being sliced, e.g. [True, False, True]
                 a callable function with one argument (the calling Series or DataFrame)
+                an OptimizationWindow
 
         Returns: valid array output for indexing (one of the above) of the max generation profile
 
@@ -123,14 +125,16 @@ class PV(DER):
         if label_selection is None:
             return self.gen_per_rated.values * self.rated_capacity
 
+        elif isinstance(label_selection, OptimizationWindow):
+            return label_selection.subset(self.gen_per_rated).values * self.rated_capacity
+
         else:
             return self.gen_per_rated.loc[label_selection].values * self.rated_capacity
 
     def get_discharge(self, mask):
         """ The effective discharge of this DER
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the discharge as a function of time for the
 
@@ -138,13 +142,13 @@ class PV(DER):
         if self.curtail:
             return self.variables_dict['pv_out']
         else:
-            return cvx.Parameter(shape=sum(mask), name='pv_out', value=self.maximum_generation(mask))
+            return cvx.Parameter(shape=mask.size, name='pv_out', value=self.maximum_generation(mask))
 
     def objective_function(self, mask, annuity_scalar=1):
         """ Generates the objective function related to a technology. Default includes O&M which can be 0
 
         Args:
-            mask (Series): Series of booleans used, the same length as case.power_kW
+            mask (OptimizationWindow): the timesteps of the optimization window
             annuity_scalar (float): a scalar value to be multiplied by any yearly cost or benefit that helps capture the cost/benefit over
                         the entire project lifetime (only to be set iff sizing)
 
@@ -161,8 +165,7 @@ class PV(DER):
         """Default build constraint list method. Used by services that do not have constraints.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns:
             A list of constraints that corresponds the battery's physical constraints and its service constraints
@@ -214,10 +217,7 @@ class PV(DER):
         optimization_years = self.variables_df.index.year.unique()
 
         # OM COSTS
-        om_costs = pd.DataFrame()
-        for year in optimization_years:
-            # add fixed o&m costs
-            om_costs.loc[pd.Period(year=year, freq='Y'), self.fixed_column_name()] = -self.fixed_om
+        om_costs = pd.DataFrame({self.fixed_column_name(): -self.fixed_om}, index=Lib.yearly_index(optimization_years))
         # fill forward (escalate rates)
         om_costs = fill_forward_func(om_costs, None, is_om_cost=True)
         # calculate om costs in dollars, as rate * power
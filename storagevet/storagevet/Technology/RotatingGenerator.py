@@ -42,6 +42,7 @@ This Python class contains methods and attributes specific for technology analys
 import cvxpy as cvx
 import numpy as np
 import pandas as pd
+import storagevet.Library as Lib
 from storagevet.Technology.DistributedEnergyResource import DER
 from storagevet.ErrorHandling import *
 
@@ -128,8 +129,7 @@ class RotatingGenerator(DER):
     def get_discharge(self, mask):
         """ The effective discharge of this DER
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the discharge as a function of time for the
 
@@ -141,8 +141,7 @@ class RotatingGenerator(DER):
         this DER can schedule to reserve
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
@@ -154,8 +153,7 @@ class RotatingGenerator(DER):
         this DER can schedule to reserve
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
@@ -174,7 +172,7 @@ class RotatingGenerator(DER):
         """ Generates the objective function related to a technology. Default includes O&M which can be 0
 
         Args:
-            mask (Series): Series of booleans used, the same length as case.power_kW
+            mask (OptimizationWindow): the timesteps of the optimization window
             annuity_scalar (float): a scalar value to be multiplied by any yearly cost or benefit that helps capture the cost/benefit over
                         the entire project lifetime (only to be set iff sizing)
 
@@ -194,8 +192,7 @@ class RotatingGenerator(DER):
         """ Builds the master constraint list for the subset of timeseries data being optimized.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns:
             A list of constraints that corresponds the battery's physical constraints and its service constraints
@@ -243,24 +240,15 @@ class RotatingGenerator(DER):
         tech_id = self.unique_tech_id()
         if self.variables_df.index.empty:
             return pro_forma
-        optimization_years = self.variables_df.index.year.unique()
+        # sum each optimization year's results
+        yearly = Lib.yearly_sum(self.variables_df[['elec', 'udis']])
 
-        # OM COSTS
-        om_costs = pd.DataFrame()
-        cumulative_energy_dispatch_kw = pd.DataFrame()
-        elec = self.variables_df['elec']
-        udis = self.variables_df['udis']
+        # OM COSTS (fixed and variable o&m rates)
         dis_column_name = tech_id + ' Cumulative Energy Dispatch (kW)'
         variable_column_name = tech_id + ' Variable O&M Costs'
-        for year in optimization_years:
-            index_yr = pd.Period(year=year, freq='Y')
-            # add fixed o&m costs
-            om_costs.loc[index_yr, self.fixed_column_name()] = -self.fixed_om
-            # add variable costs
-            elec_sub = elec.loc[elec.index.year == year]
-            udis_sub = udis.loc[udis.index.year == year]
-            om_costs.loc[index_yr, variable_column_name] = -self.variable_om
-            cumulative_energy_dispatch_kw.loc[index_yr, dis_column_name] = np.sum(elec_sub) + np.sum(udis_sub)
+        om_costs = pd.DataFrame({self.fixed_column_name(): -self.fixed_om,
+                                 variable_column_name: -self.variable_om}, index=yearly.index)
+        cumulative_energy_dispatch_kw = pd.DataFrame({dis_column_name: yearly['elec'] + yearly['udis']})
 
         # fill forward (escalate rates)
         om_costs = fill_forward_func(om_costs, None, is_om_cost = True)
@@ -281,13 +269,8 @@ class RotatingGenerator(DER):
         pro_forma = pd.concat([pro_forma, om_costs], axis=1)
 
         # fuel costs in $/kW
-        fuel_costs = pd.DataFrame()
         fuel_col_name = tech_id + ' Fuel Costs'
-        for year in optimization_years:
-            elec_sub = elec.loc[elec.index.year == year]
-            udis_sub = udis.loc[udis.index.year == year]
-            # add fuel costs in $/kW
-            fuel_costs.loc[pd.Period(year=year, freq='Y'), fuel_col_name] = -np.sum(self.heat_rate * self.fuel_cost * self.dt * (elec_sub + udis_sub))
+        fuel_costs = pd.DataFrame({fuel_col_name: -self.heat_rate * self.fuel_cost * self.dt * (yearly['elec'] + yearly['udis'])})
         # fill forward
         fuel_costs = fill_forward_func(fuel_costs, None)
         # append with super class's proforma
@@ -114,11 +114,7 @@ class Backup(ValueStream):
         """
         proforma = ValueStream.proforma_report(self, opt_years, apply_inflation_rate_func,
                                                fill_forward_func, results)
-        proforma[self.name] = 0
-
-        for year in opt_years:
-            monthly_benefit = np.multiply(self.monthly_energy, self.price)
-            proforma.loc[pd.Period(year=year, freq='Y')] = monthly_benefit.sum()
+        proforma[self.name] = np.multiply(self.monthly_energy, self.price).sum()
         # apply inflation rates
         proforma = apply_inflation_rate_func(proforma, None, min(opt_years))
 
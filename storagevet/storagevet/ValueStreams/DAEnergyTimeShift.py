@@ -73,8 +73,7 @@ class DAEnergyTimeShift(ValueStream):
         """ Generates the full objective function, including the optimization variables.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
             tot_variable_gen (Expression): the sum of the variable/intermittent generation sources
             load_sum (list, Expression): the sum of load within the system
             generator_out_sum (list, Expression): the sum of conventional generation within the system
@@ -85,7 +84,7 @@ class DAEnergyTimeShift(ValueStream):
         Returns:
             A dictionary with the portion of the objective function that it affects, labeled by the expression's key. Default is to return {}.
         """
-        p_da = cvx.Parameter(value=self.price.loc[mask].values, shape=sum(mask), name='DA_price')
+        p_da = cvx.Parameter(value=mask.subset(self.price).values, shape=mask.size, name='DA_price')
         cost = cvx.sum(
             cvx.multiply(p_da, net_ess_power) +
             cvx.multiply(-p_da, generator_out_sum) +
@@ -140,9 +139,7 @@ class DAEnergyTimeShift(ValueStream):
         # NOTE: DA ETS here represents the cost of electricity, and we use the Net Load column
         #       a negative energy_cost is a cost
         #       a positive energy_cost is a benefit
-        for year in opt_years:
-            year_subset = energy_cost[energy_cost.index.year == year]
-            proforma.loc[pd.Period(year=year, freq='Y'), 'DA ETS'] = year_subset.sum()
+        proforma['DA ETS'] = Lib.yearly_sum(energy_cost)
         proforma = fill_forward_func(proforma, self.growth)
         return proforma
 
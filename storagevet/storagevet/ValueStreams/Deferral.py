@@ -37,7 +37,6 @@ import cvxpy as cvx
 from storagevet.ValueStreams.ValueStream import ValueStream
 import pandas as pd
 import storagevet.Library as Lib
-import random
 from storagevet.ErrorHandling import *
 from storagevet.Library import truncate_float
 
@@ -113,46 +112,36 @@ class Deferral(ValueStream):
                 ess_ene_max += der_isnt.ene_max_rated * der_isnt.ulsoc
             if der_isnt.technology_type == 'Generator':
                 conventional_gen_max += der_isnt.discharge_capacity()
+        # NOTE: ElectrolyzerSystems do not have a Site load timeseries
+        # FIXME: being_sized() only exists in DER-VET
+        feeder_ders = [der_isnt for der_isnt in poi.der_list
+                       if (der_isnt.technology_type == "Load" and der_isnt.tag != 'ElectrolyzerSystem')
+                       or (der_isnt.technology_type == "Intermittent Resource" and not der_isnt.being_sized())]
         years_deferral_column = []
         min_power_deferral_column = []
         min_energy_deferral_column = []
 
+        # the power requirement of each year is found once, when its data is added
+        yearly_requirements = {}
+        data_years = sorted(self.load.index.year.unique())
+        check_years = data_years
         while current_year <= end_year.year:
-            size = len(self.load)
             years_deferral_column.append(current_year)
-
-            # TODO can we check the max year? or can we take the previous answer to calculate the next energy requirements?
-            positive_feeder_load = self.load.values
-            negative_feeder_load = np.zeros(size)
-            for der_isnt in poi.der_list:
-                # NOTE: ElectrolyzerSystems do not have a Site load timeseries
-                if der_isnt.technology_type == "Load" and der_isnt.tag != 'ElectrolyzerSystem':
-                    positive_feeder_load = positive_feeder_load + der_isnt.value.values
-                # FIXME: being_sized() only exists in DER-VET
-                if der_isnt.technology_type == "Intermittent Resource" and not der_isnt.being_sized():
-                    # TODO: should take PV variability into account here
-                    negative_feeder_load = negative_feeder_load - der_isnt.maximum_generation()
-
-            positive_feeder_load += np.repeat(conventional_gen_max, size)
-            # Determine power requirement of the storage:
-            # (1) anytime the net_feeder_load goes above deferral_max_import (too much load)
-            positive_load_power_req = positive_feeder_load - self.max_import
-            positive_power_req = positive_load_power_req.clip(min=0)
-            # (2) anytime the net_feeder_load goes below deferral_max_exports
-            # (assumes deferral_max_export < 0)  (too much generation)
-            negative_load_power_req = negative_feeder_load - self.max_export
-            negative_power_req = negative_load_power_req.clip(max=0)
-            # The sum of (1) and (2)
-            storage_power_requirement = positive_power_req + negative_power_req
-
-            e_walk, _ = self.precheck_failure(self.dt, rte_lst, storage_power_requirement)
+            for year in check_years:
+                if year not in yearly_requirements:
+                    yearly_requirements[year] = self.yearly_power_requirement(year, feeder_ders, conventional_gen_max)
+            index = pd.DatetimeIndex(np.concatenate([yearly_requirements[year][0] for year in check_years]))
+            storage_power_requirement = np.concatenate([yearly_requirements[year][1] for year in check_years])
+            deferral_load = np.concatenate([yearly_requirements[year][2] for year in check_years])
+
+            e_walk, _ = self.precheck_failure(self.dt, rte_lst, storage_power_requirement, deferral_load)
             TellUser.debug(f'In {current_year} -- min power: {truncate_float(self.p_min)}  min energy: {truncate_float(self.e_min)}')
             # save min power and energy requirements
             min_power_deferral_column.append(self.p_min)
             min_energy_deferral_column.append(self.e_min)
             # save energy required as function of time & storage power required as function of time
-            self.e_walk = pd.Series(e_walk, index=self.load.index)
-            self.power_requirement = pd.Series(storage_power_requirement, index=self.load.index)
+            self.e_walk = pd.Series(e_walk, index=index)
+            self.power_requirement = pd.Series(storage_power_requirement, index=index)
             if find_failure_year and (self.p_min > ess_dis_max or self.p_min > ess_cha_max or self.e_min > ess_ene_max):
                 # then we predict that deferral will fail
                 last_deferral_yr = current_year - 1
@@ -165,14 +154,14 @@ class Deferral(ValueStream):
             # the current year we have could be the last year the deferral is possible, so we want
             # to keep it in self.opt_results until we know the next is can be deferred as well
             additional_years = [current_year, current_year + 1]
-            next_opt_years = list(set(opt_years + additional_years))
-
-            # add additional year of data to der data
-            for der in poi.der_list:
-                der.grow_drop_data(next_opt_years, frequency, def_load_growth)
+            check_years = sorted(set(opt_years + additional_years))
 
-            # add additional year of data to deferred load
-            self.grow_drop_data(next_opt_years, frequency, def_load_growth)
+            # add the next year of data to the deferred load and the DERs that make up the feeder load
+            # (data is only dropped once the analysis years are known)
+            data_years = data_years + [current_year + 1]
+            for der in feeder_ders:
+                der.grow_drop_data(data_years, frequency, def_load_growth)
+            self.grow_drop_data(data_years, frequency, def_load_growth)
 
             # index the current year by one
             current_year += 1
@@ -183,7 +172,38 @@ class Deferral(ValueStream):
         self.deferral_df.set_index('Year', inplace=True)
         return opt_years
 
-    def precheck_failure(self, tstep, rte_lst, sto_p_req):
+    def yearly_power_requirement(self, year, feeder_ders, conventional_gen_max):
+        """ Finds the power the storage is required to dispatch in YEAR to keep the feeder within its limits
+
+        Args:
+            year (int): the year of data to check
+            feeder_ders (list): the DERs whose load or generation is seen on the feeder
+            conventional_gen_max (float): the total discharge capacity of generators
+
+        Returns: the index of the year, the storage power requirement (negative=charging and
+            positive=discharging), and the deferral load of the year
+
+        """
+        in_year = self.load.index.year == year
+        positive_feeder_load = self.load.values[in_year]
+        negative_feeder_load = np.zeros(in_year.sum())
+        for der_isnt in feeder_ders:
+            if der_isnt.technology_type == "Load":
+                positive_feeder_load = positive_feeder_load + der_isnt.value.values[in_year]
+            else:
+                # TODO: should take PV variability into account here
+                negative_feeder_load = negative_feeder_load - der_isnt.maximum_generation()[in_year]
+        positive_feeder_load = positive_feeder_load + conventional_gen_max
+        # Determine power requirement of the storage:
+        # (1) anytime the net_feeder_load goes above deferral_max_import (too much load)
+        positive_power_req = (positive_feeder_load - self.max_import).clip(min=0)
+        # (2) anytime the net_feeder_load goes below deferral_max_exports
+        # (assumes deferral_max_export < 0)  (too much generation)
+        negative_power_req = (negative_feeder_load - self.max_export).clip(max=0)
+        # The sum of (1) and (2)
+        return self.load.index[in_year], positive_power_req + negative_power_req, self.load.values[in_year]
+
+    def precheck_failure(self, tstep, rte_lst, sto_p_req, load=None):
         """
         This function takes in a vector of storage power requirements (negative=charging and positive=discharging) [=] kW
         that are required to perform the deferral as well as a time step (tstep) [=] hrs
@@ -192,6 +212,7 @@ class Deferral(ValueStream):
             tstep (float): timestep of the data in hours
             rte_lst (list): round trip efficiency of storage
             sto_p_req (list, ndarray): storage power requirement
+            load (ndarray): deferral load at each timestep of STO_P_REQ (defaults to the deferral load)
 
         Returns:
             how much the energy in the ESS needs to wander as a function of time,
@@ -200,38 +221,82 @@ class Deferral(ValueStream):
         Notes:
             This algorithm can reliably find the last year deferral is possible, however the problem might still
             be found INFEASIBLE if the ESS cannot use it's full range of SOC (ie. if LLSOC is too high or ULSOC is too low)
+            Charging is scaled by the average RTE of the storage.
         """
-        # Loop through time steps. If the storage is forced to dispatch from the constraint,
+        # Step through runs of time steps. If the storage is forced to dispatch from the constraint,
         # return to nominal SOC as soon as possible after.
-        self.p_min = max(abs(sto_p_req))
-        # TODO: determine min energy requirement in static recursive function to speed runtime --HN
+        sto_p_req = np.asarray(sto_p_req, dtype=float)
+        if load is None:
+            load = self.load.values
+        self.p_min = np.abs(sto_p_req).max()
+        rte = np.mean(rte_lst) if len(rte_lst) else 1
+        # the most energy the ESS can return towards nominal SOC while charging in each time step
+        recharge_limit = np.minimum(abs(self.p_min), abs(self.max_import - load)) * tstep
         sto_dispatch = np.zeros(sto_p_req.shape)
         e_walk = np.zeros(sto_p_req.shape)  # how much the energy in the ESS needs to wander #Definitely not a star wars pun
-        for step in range(len(sto_p_req)):
-            if step == 0:
-                e_walk[step] = -tstep * sto_p_req[0]  # initialize at nominal SOC
-                sto_dispatch[step] = sto_p_req[0]  # ignore constaints imposed by the first timestep of the year
-            elif sto_p_req[step] > 0:  # if it is required to dispatch, do it
-                sto_dispatch[step] = sto_p_req[step]
-                e_walk[step] = e_walk[step - 1] - sto_dispatch[step] * tstep  # kWh
-            elif sto_p_req[step] < 0:
-                sto_dispatch[step] = sto_p_req[step]
-                random_rte = random.choice(rte_lst)
-                e_walk[step] = e_walk[step - 1] - sto_dispatch[step] * tstep * random_rte
-            elif e_walk[step - 1] < 0:  # Otherwise contribute its full power to returning energy to nominal
-                sto_dispatch[step] = -min(abs(self.p_min), abs(e_walk[step - 1] / tstep), abs(self.max_import - self.load.iloc[step]))
-                random_rte = random.choice(rte_lst)
-                e_walk[step] = e_walk[step - 1] - sto_dispatch[step] * tstep * random_rte  # kWh
-            elif e_walk[step - 1] > 0:
-                sto_dispatch[step] = min(abs(self.p_min), abs(e_walk[step - 1] / tstep))
-                e_walk[step] = e_walk[step - 1] - sto_dispatch[step] * tstep  # kWh
-            else:
-                sto_dispatch[step] = 0
-                e_walk[step] = e_walk[step - 1]
-        kWh_min = max(e_walk) - min(e_walk)
+        e_walk[0] = -tstep * sto_p_req[0]  # initialize at nominal SOC
+        sto_dispatch[0] = sto_p_req[0]  # ignore constaints imposed by the first timestep of the year
+        required = sto_p_req != 0
+        run_starts = np.r_[1, np.flatnonzero(required[2:] != required[1:-1]) + 2]
+        run_ends = np.r_[run_starts[1:], len(sto_p_req)]
+        for start, end in zip(run_starts, run_ends):
+            if start >= end:
+                continue
+            if required[start]:  # if it is required to dispatch, do it
+                sto_dispatch[start:end] = sto_p_req[start:end]
+                energy = sto_p_req[start:end] * tstep * np.where(sto_p_req[start:end] < 0, rte, 1)
+                e_walk[start:end] = e_walk[start - 1] - np.cumsum(energy)  # kWh
+            else:  # Otherwise contribute its full power to returning energy to nominal
+                self.return_to_nominal(e_walk, sto_dispatch, start, end, tstep, rte, recharge_limit)
+        kWh_min = e_walk.max() - e_walk.min()
         self.e_min = float(kWh_min)
         return e_walk, sto_dispatch
 
+    def return_to_nominal(self, e_walk, sto_dispatch, start, end, tstep, rte, recharge_limit):
+        """ Fills E_WALK and STO_DISPATCH from START to END (time steps that the ESS is not required to dispatch)
+        with the ESS returning to nominal SOC as fast as it can
+
+        Args:
+            e_walk (ndarray): how much the energy in the ESS needs to wander (kWh), filled in place
+            sto_dispatch (ndarray): theoretical dispatch of the ESS (kW), filled in place
+            start (int): first time step of the run
+            end (int): time step after the last one of the run
+            tstep (float): timestep of the data in hours
+            rte (float): round trip efficiency of storage
+            recharge_limit (ndarray): the most energy the ESS can charge in each time step (kWh)
+
+        """
+        energy = e_walk[start - 1]
+        if energy > 0:
+            # discharge at p_min until the ESS is back at nominal SOC
+            e_walk[start:end] = np.maximum(energy - abs(self.p_min) * tstep * np.arange(1, end - start + 1), 0)
+            sto_dispatch[start:end] = -np.diff(np.r_[energy, e_walk[start:end]]) / tstep
+            return
+        step = start
+        while step < end and energy < 0:
+            # charge at the recharge limit while more than that much energy needs to be returned
+            limit = recharge_limit[step:end]
+            e_linear = energy + rte * np.cumsum(limit)
+            e_before = np.r_[energy, e_linear[:-1]]
+            crossed = limit >= -e_before
+            linear_steps = np.argmax(crossed) if crossed.any() else len(limit)
+            e_walk[step:step + linear_steps] = e_linear[:linear_steps]
+            sto_dispatch[step:step + linear_steps] = -limit[:linear_steps] / tstep
+            step += linear_steps
+            if step == end:
+                break
+            energy = e_before[linear_steps]
+            # then charge all that is left each time step (of which only RTE is kept)
+            limit = recharge_limit[step:end]
+            e_geometric = energy * (1 - rte) ** np.arange(1, end - step + 1)
+            e_before = np.r_[energy, e_geometric[:-1]]
+            holds = limit >= -e_before
+            geometric_steps = np.argmin(holds) if not holds.all() else len(limit)
+            e_walk[step:step + geometric_steps] = e_geometric[:geometric_steps]
+            sto_dispatch[step:step + geometric_steps] = e_before[:geometric_steps] / tstep
+            step += geometric_steps
+            energy = e_before[geometric_steps] if step < end else 0
+
     def grow_drop_data(self, years, frequency, load_growth):
         """ Adds data by growing the given data OR drops any extra data that might have slipped in.
         Update variable that hold timeseries data after adding growth data. These method should be called after
@@ -261,8 +326,7 @@ class Deferral(ValueStream):
         """Default build constraint list method. Used by services that do not have constraints.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
             tot_variable_gen (Expression): the sum of the variable/intermittent generation sources
             load_sum (list, Expression): the sum of load within the system
             generator_out_sum (list, Expression): the sum of conventional generation within the system
@@ -275,9 +339,9 @@ class Deferral(ValueStream):
         # adding constraints to ensure power dispatch does not violate thermal limits of transformer deferred
         # only include them if deferral is not going to fail
         constraints = []
-        year_of_optimization = mask.loc[mask].index.year[-1]
+        year_of_optimization = mask.index.year[-1]
         if year_of_optimization < self.year_failed:
-            load_beyond_poi = cvx.Parameter(value=self.load.loc[mask].values, name='deferral_load', shape=sum(mask))
+            load_beyond_poi = cvx.Parameter(value=mask.subset(self.load).values, name='deferral_load', shape=mask.size)
             # -(max export) >= dis - ch + generation - loads
             constraints += [cvx.NonPos(self.max_export - load_sum - load_beyond_poi + (-1)*net_ess_power + generator_out_sum + tot_variable_gen)]
             # max import >= loads - (dis - ch) - generation
@@ -330,11 +394,7 @@ class Deferral(ValueStream):
         yr_index = pd.period_range(start=start_year, end=end_year, freq='Y')
 
         proforma = pd.DataFrame(data={self.name + ' Value': np.zeros(len(yr_index))}, index=yr_index)
-
-        for year in yr_index:
-
-            if year.year < self.year_failed:
-                proforma.loc[year, self.name + ' Value'] = self.price
+        proforma.loc[yr_index.year < self.year_failed, self.name + ' Value'] = self.price
         # apply inflation rates
         proforma = apply_inflation_rate_func(proforma, None, min(opt_years))
 
@@ -39,7 +39,6 @@ import pandas as pd
 import sys
 from storagevet.Finances import Financial
 from storagevet.ErrorHandling import *
-import copy
 import time
 
 
@@ -93,49 +92,32 @@ class DemandChargeReduction(ValueStream):
                 last_day = '1/1/' + str(yr.year + 1)
 
                 new_index = pd.date_range(start=first_day, end=last_day, freq=frequency, inclusive='left')
-                size = new_index.size
 
                 # make new tariff with charges that have increased with user-defined growth rate
                 add_tariff = input_tariff.reset_index()
                 add_tariff.loc[:, 'Value'] = input_tariff['Value'].values*(1+self.growth)**years
                 add_tariff.loc[:, 'Billing Period'] = (input_tariff.index.astype(int) + index_max).astype(str)
                 add_tariff = add_tariff.set_index('Billing Period', drop=True)
-                # Build Energy Price Vector based on the new year
-                temp = pd.DataFrame(index=new_index)
-                weekday = new_index.weekday
-                he = (new_index + pd.Timedelta('1s')).hour + 1
-
-                billing_period = [[] for _ in range(size)]
-
-                for p in add_tariff.index:
-                    # edit the pricedf energy price and period values for all of the periods defined
-                    # in the tariff input file
-                    bill = add_tariff.loc[p, :]
-                    mask = Financial.create_bill_period_mask(bill, temp.index.month, he, weekday)
-                    if bill['Charge'].lower() == 'demand':
-                        for i, true_false in enumerate(mask):
-                            if true_false:
-                                billing_period[i].append(p)
-                billing_period = pd.Series(billing_period, dtype='object', index=temp.index)
+                # Build the billing periods based on the new year
+                billing_period = Financial.create_bill_period_table(add_tariff, new_index)
 
                 # ADD CHECK TO MAKE SURE ENERGY PRICES ARE THE SAME FOR EACH OVERLAPPING BILLING PERIOD
                 # Check to see that each timestep has a period assigned to it
-                if not billing_period.apply(len).all():
+                if not billing_period.any(axis=1).all():
                     TellUser.error('The billing periods in the input file do not partition the year. '
                                    + 'Please check the tariff input file')
                     TellUser.close_log()
                     raise TariffError('The billing periods in the input file do not partition the year')
                 # append to tariff and billing_period
                 self.tariff = pd.concat([self.tariff, add_tariff], sort=True)
-                self.billing_period = pd.concat([self.billing_period, billing_period], sort=True)
+                self.billing_period = pd.concat([self.billing_period, billing_period]).fillna(False).astype(bool)
                 index_max = int(self.tariff.index.astype(int).max())
 
     def objective_function(self, mask, load_sum, tot_variable_gen, generator_out_sum, net_ess_power, annuity_scalar=1):
         """ Generates the full objective function, including the optimization variables.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
             tot_variable_gen (Expression): the sum of the variable/intermittent generation sources
             load_sum (list, Expression): the sum of load within the system
             generator_out_sum (list, Expression): the sum of conventional generation within the system
@@ -149,7 +131,7 @@ class DemandChargeReduction(ValueStream):
         start = time.time()
         total_demand_charges = 0
         net_load = load_sum + net_ess_power + (-1)*generator_out_sum + (-1)*tot_variable_gen
-        sub_billing_period = self.billing_period.loc[mask]
+        sub_billing_period = mask.subset(self.billing_period)
         # determine and add demand charges monthly
         months = sub_billing_period.index.to_period('M')
         for mo in months.unique():
@@ -159,26 +141,13 @@ class DemandChargeReduction(ValueStream):
             # select the month's billing period data
             month_sub_billing_period = sub_billing_period.loc[monthly_mask]
 
-            # set of unique billing periods in the selected month
-            pset = {item for sublist in month_sub_billing_period for item in sublist}
-
-            # determine the index what has the first True value in the array of booleans
-            # (the index of the timestep that corresponds to day 1 and hour 0 of the month)
-            first_true = np.nonzero(monthly_mask)[0][0]
+            # unique billing periods in the selected month
+            pset = month_sub_billing_period.columns[month_sub_billing_period.any(axis=0).values]
 
             for per in pset:
                 # Add demand charge calculation for each applicable billing period (PER) within the selected month
-
-                # get an array that is True only for the selected month
-                billing_per_mask = copy.deepcopy(monthly_mask)
-
-                for i in range(first_true, first_true + len(month_sub_billing_period)):
-                    # loop through only the values that are 'True' (which should all be in order because
-                    # the array should be sorted by datetime index) as they represent a month
-
-                    # reassign the value at I to be whether PER applies to the time corresponding to I
-                    # (reassign each 'True' value to 'False' if the billing period does not apply to that timestep)
-                    billing_per_mask[i] = per in sub_billing_period.iloc[i]
+                # (an array that is True only for the timesteps in the selected month that PER applies to)
+                billing_per_mask = monthly_mask & sub_billing_period[per].values
 
                 # add a demand charge for each billing period in a month (for every month being optimized)
                 if np.all(billing_per_mask):
@@ -196,7 +165,10 @@ class DemandChargeReduction(ValueStream):
 
         """
         report = pd.DataFrame(index=self.billing_period.index)
-        report.loc[:, 'Demand Charge Billing Periods'] = self.billing_period
+        # list the billing periods that apply to each timestep
+        billing_period_labels = self.billing_period.columns.values
+        report.loc[:, 'Demand Charge Billing Periods'] = \
+            [list(billing_period_labels[applies]) for applies in self.billing_period.values.astype(bool)]
         return report
 
     def drill_down_reports(self, **kwargs):
@@ -288,20 +288,18 @@ class DemandResponse(ValueStream):
         needs to be reserved for this value stream
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
         """
         if not self.day_ahead:
             # make sure we will be able to discharge if called upon (in addition to other market services)
-            subs = mask.loc[mask]
-            dis_reservation = pd.Series(np.zeros(sum(mask)), index=subs.index)
-            subs_qc = self.qc.loc[self.qc.index.isin(subs.index)]
+            dis_reservation = pd.Series(np.zeros(mask.size), index=mask.index)
+            subs_qc = self.qc.loc[self.qc.index.isin(mask.index)]
             if not subs_qc.empty:
                 dis_reservation.update(subs_qc)
-            down = cvx.Parameter(shape=sum(mask), value=dis_reservation.values, name='DischargeResDR')
+            down = cvx.Parameter(shape=mask.size, value=dis_reservation.values, name='DischargeResDR')
         else:
             down = super().p_reservation_discharge_up(mask)
         return down
@@ -108,8 +108,7 @@ class EnergyTimeShift(ValueStream):
         """ Generates the full objective function, including the optimization variables.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
             tot_variable_gen (Expression): the sum of the variable/intermittent generation sources
             load_sum (list, Expression): the sum of load within the system
             generator_out_sum (list, Expression): the sum of conventional generation within the system
@@ -121,8 +120,8 @@ class EnergyTimeShift(ValueStream):
             A dictionary with expression of the objective function that it affects. This can be passed into the cvxpy solver.
 
         """
-        size = sum(mask)
-        price = cvx.Parameter(size, value=self.price.loc[mask].values, name='energy_price')
+        size = mask.size
+        price = cvx.Parameter(size, value=mask.subset(self.price).values, name='energy_price')
 
         load_price = cvx.multiply(price, load_sum)
         ess_net_price = cvx.multiply(price, net_ess_power)
@@ -98,8 +98,7 @@ class FrequencyRegulation(MarketServiceUpAndDown):
         """build constraint list method for the optimization engine
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices
-                corresponding to time_series data included in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
             tot_variable_gen (Expression): the sum of the variable/intermittent
                 generation sources
             load_sum (list, Expression): the sum of load within the system
@@ -122,21 +121,21 @@ class FrequencyRegulation(MarketServiceUpAndDown):
         if self.u_ts_constraints:
             constraint_list += [
                 cvx.NonPos(self.variables['up_ch'] + self.variables['up_dis']
-                           - self.regu_max.loc[mask])
+                           - mask.subset(self.regu_max))
             ]
             constraint_list += [
                 cvx.NonPos((-1)*self.variables['up_ch'] + (-1)*self.variables[
-                    'up_dis'] + self.regu_min.loc[mask])
+                    'up_dis'] + mask.subset(self.regu_min))
             ]
         #   Reg Down Max and Reg Down Min will constrain the sum down_ch+down_dis
         if self.d_ts_constraints:
             constraint_list += [
                 cvx.NonPos(self.variables['down_ch'] + self.variables['down_dis']
-                           - self.regd_max.loc[mask])
+                           - mask.subset(self.regd_max))
             ]
             constraint_list += [
                 cvx.NonPos(-self.variables['down_ch'] - self.variables['down_dis']
-                           + self.regd_min.loc[mask])
+                           + mask.subset(self.regd_min))
             ]
 
         return constraint_list
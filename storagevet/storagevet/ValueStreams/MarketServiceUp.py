@@ -98,8 +98,7 @@ class MarketServiceUp(ValueStream):
         """ Generates the full objective function, including the optimization variables.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series
-                data included in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
             tot_variable_gen (Expression): the sum of the variable/intermittent generation sources
             load_sum (list, Expression): the sum of load within the system
             generator_out_sum (list, Expression): the sum of conventional generation within the
@@ -115,7 +114,7 @@ class MarketServiceUp(ValueStream):
             cvxpy solver.
 
         """
-        payment = cvx.Parameter(sum(mask), value=self.price.loc[mask].values,
+        payment = cvx.Parameter(mask.size, value=mask.subset(self.price).values,
                                 name=f'{self.name}_price')
 
         return {
@@ -128,8 +127,7 @@ class MarketServiceUp(ValueStream):
         """Default build constraint list method. Used by services that do not have constraints.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series
-                data included in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
             tot_variable_gen (Expression): the sum of the variable/intermittent generation sources
             load_sum (list, Expression): the sum of load within the system
             generator_out_sum (list, Expression): the sum of conventional generation within
@@ -152,8 +150,7 @@ class MarketServiceUp(ValueStream):
         that needs to be reserved for this value stream
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series
-                data included in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
@@ -165,8 +162,7 @@ class MarketServiceUp(ValueStream):
         that needs to be reserved for this value stream
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series
-                data included in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
@@ -181,8 +177,7 @@ class MarketServiceUp(ValueStream):
         Note: stored energy should be positive and provided energy should be negative
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series
-                data included in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: tuple (stored, provided),
             where the first value is the case where the systems would end up with more energy than
@@ -225,10 +220,7 @@ class MarketServiceUp(ValueStream):
             results.loc[:, f'{self.full_name} Up (Charging) (kW)'] + \
             results.loc[:, f'{self.full_name} Up (Discharging) (kW)']
         spinning_prof = np.multiply(bid, self.price) * self.dt
-
-        for year in opt_years:
-            year_subset = spinning_prof[spinning_prof.index.year == year]
-            proforma.loc[pd.Period(year=year, freq='Y'), self.full_name] = year_subset.sum()
+        proforma[self.full_name] = Lib.yearly_sum(spinning_prof)
         # forward fill growth columns with inflation at growth rate
         proforma = fill_forward_func(proforma, self.growth)
 
@@ -127,8 +127,7 @@ class MarketServiceUpAndDown(ValueStream):
         variables.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices
-                corresponding to time_series data included in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
             tot_variable_gen (Expression): the sum of the variable/intermittent
                 generation sources
             load_sum (list, Expression): the sum of load within the system
@@ -148,13 +147,13 @@ class MarketServiceUpAndDown(ValueStream):
 
         # pay for reg down energy, get paid for reg up energy
         # paid revenue for capacity to do both
-        size = sum(mask)
+        size = mask.size
 
-        p_regu = cvx.Parameter(size, value=self.price_up.loc[mask].values,
+        p_regu = cvx.Parameter(size, value=mask.subset(self.price_up).values,
                                name=f'{self.name}_p_regu')
-        p_regd = cvx.Parameter(size, value=self.price_down.loc[mask].values,
+        p_regd = cvx.Parameter(size, value=mask.subset(self.price_down).values,
                                name=f'{self.name}_p_regd')
-        p_ene = cvx.Parameter(size, value=self.price_energy.loc[mask].values,
+        p_ene = cvx.Parameter(size, value=mask.subset(self.price_energy).values,
                               name=f'{self.name}_price')
         eou = self.get_energy_option_up(mask)
         eod = self.get_energy_option_down(mask)
@@ -201,31 +200,30 @@ class MarketServiceUpAndDown(ValueStream):
         """ transform the energy option up into a n x 1 vector
 
         Args:
-            mask:
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: a CVXPY vector
 
         """
-        return cvx.promote(self.eou_avg, mask.loc[mask].shape)
+        return cvx.promote(self.eou_avg, (mask.size,))
 
     def get_energy_option_down(self, mask):
         """ transform the energy option down into a n x 1 vector
 
         Args:
-            mask:
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: a CVXPY vector
 
         """
-        return cvx.promote(self.eod_avg, mask.loc[mask].shape)
+        return cvx.promote(self.eod_avg, (mask.size,))
 
     def constraints(self, mask, load_sum, tot_variable_gen, generator_out_sum,
                     net_ess_power, combined_rating):
         """build constraint list method for the optimization engine
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices
-                corresponding to time_series data included in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
             tot_variable_gen (Expression): the sum of the variable/intermittent
                 generation sources
             load_sum (list, Expression): the sum of load within the system
@@ -258,8 +256,7 @@ class MarketServiceUpAndDown(ValueStream):
         up into the grid) that needs to be reserved for this value stream
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices
-                corresponding to time_series data included in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
@@ -271,8 +268,7 @@ class MarketServiceUpAndDown(ValueStream):
         down from the grid) that needs to be reserved for this value stream
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices
-                corresponding to time_series data included in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
@@ -284,8 +280,7 @@ class MarketServiceUpAndDown(ValueStream):
         up into the grid) that needs to be reserved for this value stream
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices
-                corresponding to time_series data included in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
@@ -297,8 +292,7 @@ class MarketServiceUpAndDown(ValueStream):
         down from the grid) that needs to be reserved for this value stream
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices
-                corresponding to time_series data included in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
@@ -309,8 +303,7 @@ class MarketServiceUpAndDown(ValueStream):
         """ the deviation in energy due to changes in charge
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices
-                corresponding to time_series data included in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns:
 
@@ -325,8 +318,7 @@ class MarketServiceUpAndDown(ValueStream):
         """ the deviation in energy due to changes in discharge
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices
-            corresponding to time_series data included in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns:
 
@@ -346,8 +338,7 @@ class MarketServiceUpAndDown(ValueStream):
             negative
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices
-                corresponding to time_series data included in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: tuple (stored, provided),
             where the first value is the case where the systems would end up
@@ -371,8 +362,7 @@ class MarketServiceUpAndDown(ValueStream):
         negative
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices
-                corresponding to time_series data included in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: tuple (stored, provided),
             where the first value is the case where the systems would end up
@@ -476,15 +466,10 @@ class MarketServiceUpAndDown(ValueStream):
                                    'RD': regulation_down_prof},
                                   index=results.index)
         market_results_only = proforma.copy(deep=True)
-        for year in opt_years:
-            year_subset = fr_results[fr_results.index.year == year]
-            yr_pd = pd.Period(year=year, freq='Y')
-            proforma.loc[yr_pd, f'{self.name} Energy Throughput'] \
-                = -year_subset['E'].sum()
-            market_results_only.loc[yr_pd, f'{pref} Up'] \
-                = year_subset['RU'].sum()
-            market_results_only.loc[yr_pd, f'{pref} Down'] \
-                = year_subset['RD'].sum()
+        yearly_results = Lib.yearly_sum(fr_results)
+        proforma[f'{self.name} Energy Throughput'] = -yearly_results['E']
+        market_results_only[f'{pref} Up'] = yearly_results['RU']
+        market_results_only[f'{pref} Down'] = yearly_results['RD']
         # forward fill growth columns with inflation at their corresponding growth rates
         market_results_only = fill_forward_func(market_results_only, self.growth)
         proforma = fill_forward_func(proforma, self.energy_growth)
@@ -78,8 +78,7 @@ class NonspinningReserve(MarketServiceUp):
         """Default build constraint list method. Used by services that do not have constraints.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
             tot_variable_gen (Expression): the sum of the variable/intermittent generation sources
             load_sum (list, Expression): the sum of load within the system
             generator_out_sum (list, Expression): the sum of conventional generation within the system
@@ -96,10 +95,10 @@ class NonspinningReserve(MarketServiceUp):
         if self.ts_constraints:
             constraint_list += \
                 [cvx.NonPos(self.variables['ch_less'] +
-                            self.variables['dis_more'] - self.max.loc[mask])]
+                            self.variables['dis_more'] - mask.subset(self.max))]
             constraint_list += \
                 [cvx.NonPos(-self.variables['ch_less'] -
-                            self.variables['dis_more'] + self.min.loc[mask])]
+                            self.variables['dis_more'] + mask.subset(self.min))]
 
         return constraint_list
 
@@ -240,10 +240,8 @@ class ResourceAdequacy(ValueStream):
         """
         proforma = ValueStream.proforma_report(self, opt_years, apply_inflation_rate_func,
                                                fill_forward_func, results)
-        proforma[self.name + ' Capacity Payment'] = 0
-
-        for year in opt_years:
-            proforma.loc[pd.Period(year=year, freq='Y')] = self.qc * np.sum(self.capacity_rate)
+        # the same capacity payment is made in every optimization year
+        proforma[self.name + ' Capacity Payment'] = self.qc * np.sum(self.capacity_rate)
         # apply inflation rates
         proforma = apply_inflation_rate_func(proforma, None, min(opt_years))
         proforma = fill_forward_func(proforma, self.growth)
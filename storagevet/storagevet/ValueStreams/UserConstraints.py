@@ -174,10 +174,7 @@ class UserConstraints(ValueStream):
         """
         proforma = ValueStream.proforma_report(self, opt_years, apply_inflation_rate_func,
                                                fill_forward_func, results)
-        proforma[self.name + ' Value'] = 0
-
-        for year in opt_years:
-            proforma.loc[pd.Period(year=year, freq='Y')] = self.price
+        proforma[self.name + ' Value'] = self.price
         # apply inflation rates
         proforma = apply_inflation_rate_func(proforma, None, min(opt_years))
         proforma = fill_forward_func(proforma, None)
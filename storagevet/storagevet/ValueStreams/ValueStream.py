@@ -35,6 +35,7 @@ This Python class contains methods and attributes specific for service analysis
 import numpy as np
 import cvxpy as cvx
 import pandas as pd
+from storagevet.ResultsBuffer import ResultsBuffer
 
 
 class ValueStream:
@@ -53,7 +54,7 @@ class ValueStream:
         self.dt = params['dt']
         self.system_requirements = []
 
-        self.variables_df = pd.DataFrame()  # optimization variables are saved here
+        self.variable_results = ResultsBuffer()  # optimization variables are saved here
         self.variable_names = {}
 
         # attributes that are specific to the optimization problem being run (can change from window to window)
@@ -94,76 +95,70 @@ class ValueStream:
         needs to be reserved for this value stream
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
         """
-        return cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name=f'{self.name}ZeroUp')
+        return cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name=f'{self.name}ZeroUp')
 
     def p_reservation_charge_down(self, mask):
         """ the amount of charging power in the up direction (pulling power down from the grid) that
         needs to be reserved for this value stream
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
         """
-        return cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name=f'{self.name}ZeroDown')
+        return cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name=f'{self.name}ZeroDown')
 
     def p_reservation_discharge_up(self, mask):
         """ the amount of discharge power in the up direction (supplying power up into the grid) that
         needs to be reserved for this value stream
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
         """
-        return cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name=f'{self.name}ZeroUp')
+        return cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name=f'{self.name}ZeroUp')
 
     def p_reservation_discharge_down(self, mask):
         """ the amount of discharging power in the down direction (pulling power down from the grid) that
         needs to be reserved for this value stream
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: CVXPY parameter/variable
 
         """
-        return cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name=f'{self.name}ZeroDown')
+        return cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name=f'{self.name}ZeroDown')
 
     def uenergy_option_stored(self, mask):
         """ the amount of energy, due to regulation up that needs to be reserved for this value stream
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the up energy reservation in kWh
 
         """
-        return cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name=f'ZeroStored{self.name}')
+        return cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name=f'ZeroStored{self.name}')
 
     def uenergy_option_provided(self, mask):
         """ the amount of energy, due to regulation up that needs to be reserved for this value stream
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the up energy reservation in kWh
 
         """
-        return cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name=f'ZeroProvided{self.name}')
+        return cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name=f'ZeroProvided{self.name}')
 
     def worst_case_uenergy_stored(self, mask):
         """ the amount of energy, from the current SOE that needs to be reserved for this value stream
@@ -172,13 +167,12 @@ class ValueStream:
         Note: stored energy should be positive and provided energy should be negative
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the case where the systems would end up with more energy than expected
 
         """
-        stored = cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name=f'uEstoredZero{self.name}')
+        stored = cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name=f'uEstoredZero{self.name}')
         return stored
 
     def worst_case_uenergy_provided(self, mask):
@@ -188,21 +182,19 @@ class ValueStream:
         Note: stored energy should be positive and provided energy should be negative
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
 
         Returns: the case where the systems would end up with less energy than expected
 
         """
-        provided = cvx.Parameter(value=np.zeros(sum(mask)), shape=sum(mask), name=f'uEprovidedZero{self.name}')
+        provided = cvx.Parameter(value=np.zeros(mask.size), shape=mask.size, name=f'uEprovidedZero{self.name}')
         return provided
 
     def objective_function(self, mask, load_sum, tot_variable_gen, generator_out_sum, net_ess_power, annuity_scalar=1):
         """ Generates the full objective function, including the optimization variables.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
             tot_variable_gen (Expression): the sum of the variable/intermittent generation sources
             load_sum (list, Expression): the sum of load within the system
             generator_out_sum (list, Expression): the sum of conventional generation within the system
@@ -219,8 +211,7 @@ class ValueStream:
         """Default build constraint list method. Used by services that do not have constraints.
 
         Args:
-            mask (DataFrame): A boolean array that is true for indices corresponding to time_series data included
-                    in the subs data set
+            mask (OptimizationWindow): the timesteps of the optimization window
             tot_variable_gen (Expression): the sum of the variable/intermittent generation sources
             load_sum (list, Expression): the sum of load within the system
             generator_out_sum (list, Expression): the sum of conventional generation within the system
@@ -241,10 +232,27 @@ class ValueStream:
             subs_index (Index): index of the subset of data for which the variables_df were solved for
 
         """
-        variable_values = pd.DataFrame({name: self.variables[name].value for name in self.variable_names}, index=subs_index)
-        df_list = [x for x in [self.variables_df, variable_values] if not x.empty]
-        if len(df_list) > 0:
-            self.variables_df = pd.concat(df_list, sort=True)
+        if len(self.variable_names):
+            self.variable_results.save({name: self.variables[name].value for name in self.variable_names}, subs_index)
+
+    def initialize_variable_results(self, horizon_index):
+        """ Allocates room for the optimization variables of every timestep that will be optimized over, so the
+        solution of each window can be written in place
+
+        Args:
+            horizon_index (Index): index of every timestep included in an optimization window
+
+        """
+        self.variable_results = ResultsBuffer(horizon_index, self.variable_results.columns)
+
+    @property
+    def variables_df(self):
+        """ DataFrame of the optimization variables solved for so far (built from the results buffer) """
+        return self.variable_results.frame()
+
+    @variables_df.setter
+    def variables_df(self, frame):
+        self.variable_results = ResultsBuffer.from_frame(frame)
 
     def timeseries_report(self):
         """ Summaries the optimization results for this Value Stream.
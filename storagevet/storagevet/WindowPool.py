@@ -0,0 +1,188 @@
+"""
+Copyright (c) 2024, Electric Power Research Institute
+
+ All rights reserved.
+
+ Redistribution and use in source and binary forms, with or without modification,
+ are permitted provided that the following conditions are met:
+
+     * Redistributions of source code must retain the above copyright notice,
+       this list of conditions and the following disclaimer.
+     * Redistributions in binary form must reproduce the above copyright notice,
+       this list of conditions and the following disclaimer in the documentation
+       and/or other materials provided with the distribution.
+     * Neither the name of DER-VET nor the names of its contributors
+       may be used to endorse or promote products derived from this software
+       without specific prior written permission.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+ A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+ CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+ EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+ PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+ PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+ LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+ NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+"""
+WindowPool.py
+
+This file holds the WindowSolution class and the functions that solve independent optimization windows of a
+Scenario in a pool of worker processes.
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+from storagevet.ErrorHandling import *
+
+# the Scenario (and arguments to set up each window with) of a worker process
+_worker = {}
+
+
+class WindowSolution:
+    """ The parts of an optimization window solved in a worker process that the Scenario of the main
+    process needs to save the window's results, as if it had solved the window itself. It stands in for
+    the solved cvx.Problem in Scenario.save_optimization_results
+
+    """
+
+    def __init__(self, status, objective_values, cvx_error_msg, der_values, value_stream_values, solvers, profile):
+        """
+
+        Args:
+            status (str): status of the solved problem
+            objective_values (dict): the optimal value of each cost function
+            cvx_error_msg: any error message that might have occurred during problem solve
+            der_values (dict): solved values of the variables of each active DER, keyed by its position in
+                the POI's der_list
+            value_stream_values (dict): solved values of the variables of each value stream, keyed by its name
+            solvers (list): the name of the solver that solved the problem
+            profile (dict): the window's row of the worker's OptimizationProfile
+
+        """
+        self.status = status
+        self.objective_values = objective_values
+        self.cvx_error_msg = cvx_error_msg
+        self.der_values = der_values
+        self.value_stream_values = value_stream_values
+        self.solvers = solvers
+        self.profile = profile
+
+    @classmethod
+    def from_problem(cls, scenario, opt_window_num, prob, obj_expression, cvx_error_msg):
+        """ Collects the solution of an optimization window that was solved by SCENARIO
+
+        Args:
+            scenario (Scenario): the scenario (of a worker process) that solved the window
+            opt_window_num (int): the optimization window number
+            prob (cvx.Problem): the solved problem
+            obj_expression (dict): the cost functions of the problem
+            cvx_error_msg: any error message that might have occurred during problem solve
+
+        Returns: a WindowSolution
+
+        """
+        solvers_before = len(scenario.solvers)
+        scenario.record_solve(opt_window_num, prob)
+        objective_values = {cost: getattr(func, 'value', func) for cost, func in obj_expression.items()}
+        der_values = {index: {name: variable.value for name, variable in der.variables_dict.items()}
+                      for index, der in enumerate(scenario.poi.der_list) if der in scenario.poi.active_ders}
+        value_stream_values = {name: {var_name: variable.value for var_name, variable in (vs.variables or {}).items()}
+                               for name, vs in scenario.service_agg.value_streams.items()}
+        return cls(prob.status, objective_values, cvx_error_msg, der_values, value_stream_values,
+                   scenario.solvers[solvers_before:], scenario.optimization_profile.windows.pop(opt_window_num, {}))
+
+    def load(self, scenario, size):
+        """ Gives the solved values to new optimization variables of SCENARIO's DERs and value streams, so that
+        they can save their results like they would after solving the window themselves
+
+        Args:
+            scenario (Scenario): the scenario of the main process
+            size (int): number of timesteps in the optimization window
+
+        """
+        scenario.poi.active_ders = [scenario.poi.der_list[index] for index in self.der_values]
+        scenario.poi.initialize_optimization_variables(size)
+        scenario.service_agg.initialize_optimization_variables(size)
+        for index, values in self.der_values.items():
+            self.save_values(scenario.poi.der_list[index].variables_dict, values)
+        for name, values in self.value_stream_values.items():
+            self.save_values(scenario.service_agg.value_streams[name].variables or {}, values)
+
+    @staticmethod
+    def save_values(variables, values):
+        """ Sets the value of each variable (without the checks that setting variable.value does, like the
+        solver would)
+
+        Args:
+            variables (dict): CVXPY variables keyed by name
+            values (dict): their values keyed by name
+
+        """
+        for name, value in values.items():
+            if value is not None and name in variables:
+                variables[name].save_value(value)
+
+
+def solve_windows(scenario, windows, workers, **window_kwargs):
+    """ Solves optimization windows in a pool of worker processes, each with its own copy of SCENARIO
+
+    Args:
+        scenario (Scenario): the scenario that the windows belong to
+        windows (list): the optimization window numbers to solve
+        workers (int): number of worker processes
+        **window_kwargs: passed to solve_window
+
+    Yields: each window number and its WindowSolution (None if the window had nothing to optimize),
+        in the order of WINDOWS
+
+    """
+    # give each worker a few batches of windows, so consecutive windows reuse the worker's parametric problems
+    chunksize = max(1, math.ceil(len(windows) / (workers * 4)))
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=start_worker, initargs=(scenario, window_kwargs))
+    try:
+        yield from zip(windows, pool.map(solve_window, windows, chunksize=chunksize))
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def start_worker(scenario, window_kwargs):
+    """ Keeps the scenario that a worker process solves windows of
+
+    Args:
+        scenario (Scenario): copy of the scenario of the main process
+        window_kwargs (dict): arguments to set up and solve each window with (see solve_window)
+
+    """
+    # the main process logs the results of each window
+    TellUser.create_null_log()
+    _worker['scenario'] = scenario
+    _worker['kwargs'] = window_kwargs
+
+
+def solve_window(opt_window_num):
+    """ Sets up and solves an optimization window in a worker process
+
+    Args:
+        opt_window_num (int): the optimization window number
+
+    Returns: the WindowSolution, or None if the window does not have any constraints or objectives to minimize
+
+    """
+    scenario = _worker['scenario']
+    kwargs = _worker['kwargs']
+    scenario.apply_window_degradation(opt_window_num)
+    functions, constraints, sub_index = scenario.set_up_optimization(opt_window_num,
+                                                                     annuity_scalar=kwargs.get('annuity_scalar', 1),
+                                                                     ignore_der_costs=kwargs.get('ignore_der_costs', False))
+    if not len(constraints) and not len(functions.values()):
+        return None
+    prob, obj_expression, cvx_error_msg = scenario.solve_optimization(functions, constraints,
+                                                                      force_glpk_mi=kwargs.get('force_glpk_mi', False),
+                                                                      template_key=scenario.problem_template_key(sub_index),
+                                                                      opt_window_num=opt_window_num)
+    return WindowSolution.from_problem(scenario, opt_window_num, prob, obj_expression, cvx_error_msg)
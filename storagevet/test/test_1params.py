@@ -37,6 +37,8 @@ import pytest
 from pathlib import Path
 from test.TestingLib import *
 from storagevet.ErrorHandling import *
+from storagevet.Params import Params
+from storagevet.DataCache import DataCache
 from test.test_default_model_parameters import *
 #import ipdb
 #ipdb.set_trace()
@@ -258,3 +260,112 @@ def test_no_label_results_key():
     continuous
     """
     assert_ran(DIR / "042-no_results_label.csv")
+
+
+"""
+Referenced data cache checks
+"""
+
+
+def test_data_cache_reuses_parsed_files(monkeypatch, tmp_path):
+    monkeypatch.setenv('DERVET_DATA_CACHE', str(tmp_path))
+    first_case = check_initialization(DIR / '000-DA_battery_month.csv')
+    assert Params.data_cache.hits == 0
+    assert Params.data_cache.misses > 0
+    first_time_series = first_case.case_dict[0].Scenario['time_series']
+    second_case = check_initialization(DIR / '000-DA_battery_month.csv')
+    assert Params.data_cache.hits > 0
+    assert Params.data_cache.misses == 0
+    pd.testing.assert_frame_equal(first_time_series, second_case.case_dict[0].Scenario['time_series'])
+
+
+def test_data_cache_off(monkeypatch):
+    monkeypatch.setenv('DERVET_DATA_CACHE', 'off')
+    check_initialization(DIR / '000-DA_battery_month.csv')
+    assert Params.data_cache.hits == 0
+    assert Params.data_cache.misses == 0
+
+
+def test_corrupt_data_cache_entry_is_a_miss(monkeypatch, tmp_path):
+    monkeypatch.setenv('DERVET_DATA_CACHE', str(tmp_path))
+    check_initialization(DIR / '000-DA_battery_month.csv')
+    for entry in tmp_path.glob('*.pkl'):
+        entry.write_bytes(b'not a pickle')
+    check_initialization(DIR / '000-DA_battery_month.csv')
+    assert Params.data_cache.hits == 0
+    assert Params.data_cache.misses > 0
+    # the corrupt entries were replaced
+    check_initialization(DIR / '000-DA_battery_month.csv')
+    assert Params.data_cache.misses == 0
+
+
+def test_data_cache_evicts_least_recently_used_entries(tmp_path):
+    TellUser.create_log(tmp_path, False)
+    cache = DataCache(tmp_path, max_size=1)
+    frame = pd.DataFrame(np.zeros((12800, 2)))  # 200 KB, so the sixth entry goes over 1 MB
+    keys = [f'{number:02}' for number in range(6)]
+    for key in keys[:4]:
+        cache.save(key, frame, key)
+    # reading the first entry makes it the most recently used
+    os.utime(tmp_path / '01.pkl', (0, 0))
+    os.utime(tmp_path / '02.pkl', (1, 1))
+    os.utime(tmp_path / '03.pkl', (2, 2))
+    assert cache.load('00', '00') is not None
+    for key in keys[4:]:
+        cache.save(key, frame, key)
+    assert sum(entry.stat().st_size for entry in tmp_path.glob('*.pkl')) <= cache.max_bytes
+    assert (tmp_path / '00.pkl').exists()
+    assert not (tmp_path / '01.pkl').exists()
+    assert (tmp_path / '05.pkl').exists()
+
+
+def test_cases_are_prepared_one_at_a_time():
+    case = check_initialization(DIR / '009-bat_energy_sensitivity.csv')
+    keys = list(case.case_dict.keys())
+    assert len(keys) > 1
+    assert case.case_dict[keys[0]].prepared
+    assert not any(case.case_dict[key].prepared for key in keys[1:])
+    for key, instance in Params.load_and_prepare():
+        assert instance.prepared
+        assert all(Params.instances[previous] is None for previous in keys[:keys.index(key)])
+    assert all(value is None for value in Params.instances.values())
+
+
+def test_errors_in_later_cases_are_reported_before_solving(tmp_path):
+    # the second case has a soc_target below llsoc
+    mp = pd.read_csv(DIR / '009-bat_energy_sensitivity.csv', keep_default_na=False)
+    soc_target = (mp.Tag == 'Battery') & (mp.Key == 'soc_target')
+    mp.loc[soc_target, ['Sensitivity Parameters', 'Sensitivity Analysis']] = ['50, 1', 'yes']
+    mp.to_csv(tmp_path / '009-bat_energy_sensitivity.csv', index=False)
+    with pytest.raises(ModelParameterError):
+        check_initialization(tmp_path / '009-bat_energy_sensitivity.csv')
+
+
+def test_each_case_is_prepared_once(monkeypatch):
+    prepared = []
+    prepare = Params.prepare
+    monkeypatch.setattr(Params, 'prepare', lambda self: prepared.append(self) or prepare(self))
+    case = check_initialization(DIR / '009-bat_energy_sensitivity.csv')
+    # only the first case's data is loaded before the first case is run
+    assert len(prepared) == 1
+    for key, instance in Params.load_and_prepare():
+        pass
+    assert len(prepared) == len(case.case_dict)
+
+
+def test_cases_share_read_only_referenced_data():
+    check_initialization(DIR / '009-bat_energy_sensitivity.csv')
+    first, second = [Params.prepare_case(key) for key in list(Params.instances)[:2]]
+    first_data, second_data = first.Scenario['monthly_data'], second.Scenario['monthly_data']
+    column = first_data.columns[0]
+    # both cases read the same buffer
+    assert np.shares_memory(first_data[column].to_numpy(), second_data[column].to_numpy())
+    # an in-place write to the shared buffer raises
+    with pytest.raises(ValueError):
+        first_data.iloc[0, 0] = -1
+    # a case that changes a column gets its own copy of it
+    original = second_data[column].copy()
+    first_data[column] = first_data[column] * 2
+    assert not np.shares_memory(first_data[column].to_numpy(), second_data[column].to_numpy())
+    pd.testing.assert_series_equal(second_data[column], original)
+    pd.testing.assert_series_equal(first_data[column], original * 2)
@@ -40,7 +40,18 @@ would like the tests to run on.
 import pytest
 from pathlib import Path
 import numpy as np
+import threading
+import rainflow
+import cvxpy as cvx
 from test.TestingLib import *
+from storagevet.Checkpoint import Checkpoint
+from storagevet.Scenario import Scenario
+from storagevet.SolverStrategy import SolverStrategy
+from storagevet.OptimizationWindow import OptimizationWindow
+from storagevet.ProblemTemplate import ProblemTemplate
+from storagevet.Result import Result
+from storagevet.ErrorHandling import FilenameError, TellUser
+from storagevet.ValueStreams.Deferral import Deferral
 
 DIR = Path('./test/model_params/')
 
@@ -50,6 +61,225 @@ def test_da_month():
     assert_ran_with_services(test_file, ['DA'])
 
 
+def test_da_month_optimization_profile():
+    results = run_case(DIR / f'000-DA_battery_month{CSV}')
+    assert_file_exists(results, 'optimization_profile')
+    profile = results.instances[0].optimization_profile
+    assert len(profile) == len(results.instances[0].objective_values)
+    assert (profile['status'] == 'optimal').all()
+    assert 'Value Stream build: DA (s)' in profile.columns
+    # nonzeros are known for the windows solved through a shared parametric problem (the others are not
+    # compiled again to count them)
+    assert profile['nonzeros'].notna().any()
+    # windows of the same size have the same constraint matrix structure
+    assert (profile.groupby('variables')['nonzeros'].nunique() <= 1).all()
+    # every window notes how it used the parametric problem of its shape
+    assert profile['problem template'].iloc[0] == 'first of its shape'
+    assert 'created' in profile['problem template'].values
+    assert profile['problem template'].isin(['first of its shape', 'created', 'reused', 'widened', 'miss']).all()
+
+
+def test_problem_template_is_widened_by_a_window_that_changes_a_constant():
+    def window(price, limit):
+        x = cvx.Variable(3, name='x')
+        return x, cvx.Minimize(cvx.sum(cvx.multiply(price, x))), [x >= limit, x <= 10]
+
+    (_, *first), (_, *second), (x, *third) = window([1, 2, 3], 1), window([2, 3, 4], 1), window([3, 4, 5], 2)
+    template = ProblemTemplate.create(first, *second)
+    # the limit was the same in the first two windows, so it is not a parameter
+    assert len(template.problem.parameters()) == 1
+    assert not template.load(*third)
+    widened = ProblemTemplate.create((template.problem.objective, template.problem.constraints), *third,
+                                     template.varying)
+    assert len(widened.problem.parameters()) == 2
+    widened.problem.solve()
+    widened.save_window_solution()
+    np.testing.assert_allclose(x.value, [2, 2, 2], atol=1e-6)
+    # the earlier windows still fit the widened template
+    assert widened.load(*first)
+
+
+def scenario_inputs_added(tmp_path, test_file, tag='Scenario', **keys):
+    # copy of the model parameters with extra Scenario (or TAG) inputs
+    mp = pd.read_csv(test_file)
+    value_column = 'Value' if 'Value' in mp.columns else 'Optimization Value'
+    for key, (value, value_type) in keys.items():
+        if key in mp.loc[mp.Tag == tag, 'Key'].values:
+            mp.loc[(mp.Tag == tag) & (mp.Key == key), value_column] = value
+        else:
+            row = {'Tag': tag, 'Key': key, value_column: value, 'Type': value_type, 'Active': '.',
+                   'Sensitivity Analysis': 'no'}
+            if 'ID' in mp.columns:
+                row['ID'] = mp.loc[mp.Tag == tag, 'ID'].iloc[0]
+            mp.loc[len(mp)] = row
+    new_file = tmp_path / f'{test_file.stem}-{"-".join(keys)}{test_file.suffix}'
+    mp.to_csv(new_file, index=False)
+    return new_file
+
+
+def test_da_month_parallel_windows(tmp_path):
+    test_file = scenario_inputs_added(tmp_path, DIR / f'000-DA_battery_month{CSV}', window_workers=(3, 'int'))
+    serial = run_case(DIR / f'000-DA_battery_month{CSV}').instances[0]
+    parallel = run_case(test_file).instances[0]
+    pd.testing.assert_frame_equal(serial.time_series_data, parallel.time_series_data, check_exact=False, atol=1e-4)
+    assert len(parallel.optimization_profile) == len(serial.optimization_profile)
+    assert (parallel.optimization_profile['status'] == 'optimal').all()
+
+
+def test_da_daily_batched_windows(tmp_path):
+    # mixed-integer windows are not batched, so use the linear formulation
+    one_at_a_time = scenario_inputs_added(tmp_path, DIR / f'000-DA_battery_month{CSV}', n=(24, 'string/int'),
+                                          binary=(0, 'bool'))
+    batched = scenario_inputs_added(tmp_path, DIR / f'000-DA_battery_month{CSV}', n=(24, 'string/int'),
+                                    binary=(0, 'bool'), batch_windows=(1, 'bool'))
+    serial = run_case(one_at_a_time).instances[0]
+    batch = run_case(batched).instances[0]
+    # the dispatch can be a different one of several optimal solutions, but each window's costs are the same
+    pd.testing.assert_frame_equal(serial.objective_values, batch.objective_values, check_exact=False, atol=1e-3)
+    assert batch.optimization_profile['batch'].nunique() < len(batch.optimization_profile)
+
+
+def test_window_subsets_by_position_only_when_indexes_are_equal():
+    horizon = pd.date_range('2017-01-01', periods=48, freq='h')
+    window = OptimizationWindow(horizon, slice(10, 20))
+    aligned = pd.Series(np.arange(48), index=horizon.copy())
+    assert window.is_aligned(aligned.index)
+    pd.testing.assert_series_equal(window.subset(aligned), aligned.iloc[10:20])
+    # same length and endpoints, but two timesteps inside the window are swapped
+    swapped = horizon.to_numpy().copy()
+    swapped[[12, 30]] = swapped[[30, 12]]
+    shuffled = pd.Series(np.arange(48), index=pd.DatetimeIndex(swapped))
+    assert not window.is_aligned(shuffled.index)
+    pd.testing.assert_series_equal(window.subset(shuffled), shuffled.loc[window.index])
+    assert window.subset(shuffled).iloc[2] == 30
+
+
+def test_windows_of_a_horizon_compare_each_index_once(monkeypatch):
+    horizon = pd.date_range('2017-01-01', periods=48, freq='h')
+    windows = OptimizationWindow.split(pd.Series(np.repeat(np.arange(4), 12), index=horizon))
+    data = pd.Series(np.arange(48), index=horizon.copy())
+    compared = []
+    equals = pd.DatetimeIndex.equals
+    monkeypatch.setattr(pd.DatetimeIndex, 'equals', lambda self, other: compared.append(self) or equals(self, other))
+    for window in windows.values():
+        pd.testing.assert_series_equal(window.subset(data), data.iloc[window.positions])
+    assert len(compared) == 1
+    # the horizon's entry goes away with the horizon
+    key = id(horizon)
+    del windows, window, horizon
+    assert key not in OptimizationWindow.ALIGNED
+
+
+def test_da_month_warm_start(tmp_path, monkeypatch):
+    # SCS re-solves the parametric problem shared by windows of the same length from its last solution
+    test_file = scenario_inputs_added(tmp_path, DIR / f'000-DA_battery_month{CSV}', binary=(0, 'bool'),
+                                      solvers=('SCS', 'list/string'))
+    loaded = []
+    load_initial_values = SolverStrategy.load_initial_values
+    monkeypatch.setattr(SolverStrategy, 'load_initial_values',
+                        lambda self, prob: loaded.append(prob) or load_initial_values(self, prob))
+    profile = run_case(test_file).instances[0].optimization_profile
+    assert profile['warm start'].any()
+    assert not profile['warm start'].iloc[0]
+    assert profile['iterations'].notna().all()
+    # SCS does not start from the variables' values, so they are not loaded
+    assert not len(loaded)
+    # each warm start can be compared to the iterations of the last cold start
+    assert profile['cold start iterations'].iloc[0] == profile['iterations'].iloc[0]
+    assert profile['cold start iterations'].notna().all()
+
+
+def test_da_month_solution_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('DERVET_SOLUTION_CACHE', str(tmp_path / 'solutions'))
+    test_file = scenario_inputs_added(tmp_path, DIR / f'000-DA_battery_month{CSV}', solution_cache=(1, 'bool'))
+    solved = run_case(test_file).instances[0]
+    assert (solved.optimization_profile['solution cache'] == 'miss').all()
+    # the second run has the same problems, so every window's solution is reused
+    cached = run_case(test_file).instances[0]
+    assert (cached.optimization_profile['solution cache'] == 'hit').all()
+    pd.testing.assert_frame_equal(solved.time_series_data, cached.time_series_data)
+    pd.testing.assert_frame_equal(solved.objective_values, cached.objective_values)
+
+
+def test_solution_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setenv('DERVET_SOLUTION_CACHE', str(tmp_path / 'solutions'))
+    test_file = scenario_inputs_added(tmp_path, DIR / f'000-DA_battery_month{CSV}', solution_cache=(1, 'bool'),
+                                      solution_cache_size=(0.1, 'float'))
+    run_case(test_file)
+    sizes = [entry.stat().st_size for entry in (tmp_path / 'solutions').iterdir()]
+    assert 0 < len(sizes) < 12
+    assert sum(sizes) <= 0.1 * 2**20
+
+
+def results_saved_in(tmp_path, test_file):
+    # copy of the model parameters that saves its results (and checkpoints) within TMP_PATH
+    mp = pd.read_csv(test_file)
+    value_column = 'Value' if 'Value' in mp.columns else 'Optimization Value'
+    for key in ['dir_absolute_path', 'errors_log_path']:
+        mp.loc[(mp.Tag == 'Results') & (mp.Key == key), value_column] = str(tmp_path / 'results')
+    mp.loc[(mp.Tag == 'Results') & (mp.Key == 'dir_absolute_path'), 'Active'] = 'yes'
+    new_file = tmp_path / test_file.name
+    mp.to_csv(new_file, index=False)
+    return new_file
+
+
+def test_degradation_resumed_from_checkpoint(tmp_path, monkeypatch):
+    # stop the run while saving the 3rd window, with a checkpoint saved after every window
+    test_file = results_saved_in(tmp_path, DIR / f"010-degradation_test{CSV}")
+    monkeypatch.setattr(Checkpoint, 'INTERVAL', 0)
+    save_optimization_results = Scenario.save_optimization_results
+    saved = []
+
+    def stop_on_third_window(self, *args):
+        saved.append(args[0])
+        if len(saved) == 3:
+            raise RuntimeError('stopped part way through')
+        save_optimization_results(self, *args)
+    monkeypatch.setattr(Scenario, 'save_optimization_results', stop_on_third_window)
+    with pytest.raises(RuntimeError):
+        StorageVET(test_file).solve()
+    stopped_results = Result.dir_abs_path
+    assert stopped_results == tmp_path / 'results'
+    assert (stopped_results / 'checkpoints' / 'case0.pkl').exists()
+    monkeypatch.setattr(Scenario, 'save_optimization_results', save_optimization_results)
+
+    resumed = StorageVET(test_file, resume=stopped_results).solve()
+    assert not (resumed.dir_abs_path / 'checkpoints').exists()
+    resumed = resumed.instances[0]
+    uninterrupted = run_case(test_file).instances[0]
+    pd.testing.assert_frame_equal(uninterrupted.time_series_data, resumed.time_series_data, check_exact=False, atol=1e-4)
+    pd.testing.assert_frame_equal(uninterrupted.objective_values, resumed.objective_values, check_exact=False, atol=1e-4)
+
+
+def test_checkpoint_fingerprint_covers_every_referenced_file():
+    case = {'Scenario': {'time_series_filename': 'data/ts.csv', 'monthly_data_filename': 'data/md.csv', 'n': 'month'},
+            'Finance': {'customer_tariff_filename': 'data\\tariff.csv', 'yearly_data_filename': 'data/yearly.csv'},
+            'Battery': {'1': {'cycle_life_filename': 'data/cycle.csv'}}}
+    assert {filename for _, filename in Checkpoint.referenced_filenames(case)} == \
+        {'data/ts.csv', 'data/md.csv', 'data/tariff.csv', 'data/yearly.csv', 'data/cycle.csv'}
+
+
+def test_resume_needs_a_results_folder(tmp_path):
+    assert Checkpoint.resume_folder(tmp_path) == tmp_path
+    assert Checkpoint.resume_folder(None) is None
+    with pytest.raises(FilenameError):
+        Checkpoint.resume_folder(True)
+    with pytest.raises(FilenameError):
+        Checkpoint.resume_folder(tmp_path / 'missing')
+
+
+@pytest.mark.parametrize('kind', ['lock', 'local function'])
+def test_checkpoint_that_can_not_be_pickled_is_skipped(tmp_path, kind):
+    # pickle raises TypeError for a lock, and AttributeError for a local function
+    unpicklable = threading.Lock() if kind == 'lock' else (lambda: None)
+    TellUser.create_log(tmp_path, False)
+    checkpoint = Checkpoint(tmp_path / 'checkpoints' / 'case0.pkl', 'fingerprint')
+    checkpoint.save(lambda: {'windows': [1, 2], 'member': unpicklable}, force=True)
+    assert not any((tmp_path / 'checkpoints').iterdir())
+    checkpoint.save(lambda: {'windows': [1, 2]}, force=True)
+    assert Checkpoint(tmp_path / 'other.pkl', 'fingerprint', checkpoint.path).load() == {'windows': [1, 2]}
+
+
 def xtest_da_month3_slow():
     assert_ran(DIR / f'018-DA_battery_month_5min{CSV}')
 
@@ -72,6 +302,31 @@ def test_da_month_degradation_battery_replaced_during_optimization():
     assert_ran(DIR / f"010-degradation_test{CSV}")
 
 
+def test_degradation_predicted_in_parallel(tmp_path):
+    test_file = scenario_inputs_added(tmp_path, DIR / f"010-degradation_test{CSV}", window_workers=(3, 'int'))
+    test_file = scenario_inputs_added(tmp_path, test_file, tag='Battery', parallel_degradation_tolerance=(0.5, 'float'))
+    serial = run_case(DIR / f"010-degradation_test{CSV}").instances[0]
+    parallel = run_case(test_file).instances[0]
+    reconciliation = parallel.drill_down_dict['es_degradation_reconciliation']
+    assert len(reconciliation) == len(serial.objective_values)
+    assert (reconciliation['difference %'].abs() <= 0.005).all()
+    assert (reconciliation['solved in pass'] > 1).any()
+    assert np.allclose(serial.drill_down_dict['es_degradation_data'].iloc[-1],
+                       parallel.drill_down_dict['es_degradation_data'].iloc[-1], rtol=1e-3)
+
+
+def test_degradation_counts_cycles_across_windows():
+    # the cycles counted one window at a time are the cycles of the whole dispatch
+    results = run_case(DIR / f"010-degradation_test{CSV}").instances[0]
+    cycle_counting = results.drill_down_dict['es_cycle_counting']
+    soe = results.time_series_data['BATTERY: es State of Energy (kWh)'].values
+    expected = [cycle for cycle in rainflow.extract_cycles(np.r_[soe, soe[-1]]) if cycle[0] > 0]
+    counted = cycle_counting[cycle_counting.rng > 0]
+    assert len(counted) == len(expected)
+    assert counted['count'].sum() == sum(cycle[2] for cycle in expected)
+    assert np.allclose(np.sort(counted.rng), np.sort([cycle[0] for cycle in expected]))
+
+
 def test_da_fr_month():
     assert_ran(DIR / f'001-DA_FR_battery_month{CSV}')
 
@@ -106,6 +361,19 @@ class TestDaDeferral:
         assert np.all(value[value.index <= pd.Period(2023, freq='Y')].values/value.values[0] == expected_inflation_after_max_opt_yr)
 
 
+def test_deferral_energy_walk():
+    # discharge for 2 hours, return to nominal SOC (at 80% RTE), then charge and return again
+    deferral = Deferral.__new__(Deferral)
+    deferral.max_import = 100
+    deferral.load = pd.Series(np.zeros(9))
+    requirement = np.array([0, 10, 10, 0, 0, 0, -10, 0, 0])
+    e_walk, dispatch = deferral.precheck_failure(1, [.8], requirement)
+    np.testing.assert_allclose(e_walk, [0, -10, -20, -12, -4, -.8, 7.2, 0, 0], atol=1e-9)
+    np.testing.assert_allclose(dispatch, [0, 10, 10, -10, -10, -4, -10, 7.2, 0], atol=1e-9)
+    assert deferral.p_min == 10
+    assert deferral.e_min == pytest.approx(27.2)
+
+
 def xtest_da_nsr_month_slow():
     assert_ran(DIR / f'005-DA_NSR_battery_month{CSV}')
 
@@ -60,11 +60,11 @@ def _checkThatFileExists(f, name='Unlabeled', raise_exception_on_fail=True, writ
             return None
     return path_file
 
-def run_case(model_param_location: str):
+def run_case(model_param_location: str, workers: int = 1):
     print(f"Testing {model_param_location}...")
     # first make sure the model_param file exists
     model_param_file = _checkThatFileExists(Path(model_param_location), 'Model Parameter Input File')
-    case = DERVET(model_param_file)
+    case = DERVET(model_param_file, workers=workers)
     results = case.solve()
     print(results.dir_abs_path)
     return results
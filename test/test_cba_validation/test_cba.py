@@ -99,6 +99,18 @@ def test_sensitivity_evaluation():
     assert_ran(DIR / '003-cba_valuation_sensitivity.csv', )
 
 
+def test_sensitivity_evaluation_in_parallel():
+    serial_results = run_case(DIR / '003-cba_valuation_sensitivity.csv')
+    serial_summary = pd.read_csv(serial_results.dir_abs_path / 'sensitivity_summary.csv')
+    parallel_results = run_case(DIR / '003-cba_valuation_sensitivity.csv', workers=3)
+    assert_file_exists(parallel_results)
+    assert list(parallel_results.instances.keys()) == [0, 1, 2]
+    for key in parallel_results.instances.keys():
+        assert os.path.isfile(parallel_results.dir_abs_path / str(key) / 'dervet_log.log')
+    parallel_summary = pd.read_csv(parallel_results.dir_abs_path / 'sensitivity_summary.csv')
+    pd.testing.assert_frame_equal(serial_summary, parallel_summary)
+
+
 def test_coupled_evaluation():
     # TODO check that post-facto cash flows are ZERO
     assert_ran(DIR / '004-cba_valuation_coupled_dt.csv', )
@@ -41,6 +41,7 @@ import pytest
 from pathlib import Path
 from storagevet.ErrorHandling import *
 from test.TestingLib import *
+from dervet.RepresentativePeriods import RepresentativePeriods
 
 
 def setup_default_case(test_file):
@@ -202,3 +203,45 @@ def test_default_incl_ts_charge_limits_bad_ts_data():
     temp_mp = modify_mp('Scenario', key='time_series_filename', value='./test/datasets/default_incl_ts_charge_limits_bad_ts_data.csv', column='Optimization Value', mp_in=temp_mp, mp_out_tag='charge')
     timeseries_data_error(temp_mp)
     remove_temp_files(temp_mp)
+
+def test_default_sized_on_representative_days():
+    # size the battery on 12 representative days of the year, then dispatch it for the whole year
+    temp_mp = modify_mp('Scenario', key='n', value='year', column='Optimization Value', mp_out_tag='representative')
+    temp_mp = modify_mp('Battery', key='ene_max_rated', value=0, column='Optimization Value', mp_in=temp_mp, mp_out_tag='representative')
+    temp_mp = modify_mp('Battery', key='ccost_kWh', value=20, column='Optimization Value', mp_in=temp_mp, mp_out_tag='representative')
+    mp = pd.read_csv(f'{temp_mp}{CSV}')
+    row = mp[(mp.Tag == 'Scenario') & (mp.Key == 'n')].iloc[0].copy()
+    row['Key'], row['Optimization Value'], row['Type'] = 'representative_periods', 12, 'int'
+    mp.loc[len(mp)] = row
+    mp.to_csv(f'{temp_mp}{CSV}', index=False)
+    results = assert_ran(f'{temp_mp}{CSV}')
+    assert_file_exists(results, 'representative_periods')
+    instance = results.instances[0]
+    assert instance.sizing_df['Energy Rating (kWh)'].iloc[0] > 0
+    assert_timeseries_columns_exist(instance.time_series_data, ['BATTERY: es Charge (kW)'])
+    remove_temp_files(temp_mp)
+
+def test_default_sized_on_representative_days_of_the_year_with_monthly_windows(monkeypatch):
+    # the whole year is clustered (not only the first optimization window), even though n is a month
+    clustered = []
+    initialize = RepresentativePeriods.__init__
+
+    def record_clustering(self, *args, **kwargs):
+        initialize(self, *args, **kwargs)
+        clustered.append(self)
+    monkeypatch.setattr(RepresentativePeriods, '__init__', record_clustering)
+    temp_mp = modify_mp('Scenario', key='n', value='month', column='Optimization Value', mp_out_tag='representative')
+    temp_mp = modify_mp('Battery', key='ene_max_rated', value=0, column='Optimization Value', mp_in=temp_mp, mp_out_tag='representative')
+    temp_mp = modify_mp('Battery', key='ccost_kWh', value=20, column='Optimization Value', mp_in=temp_mp, mp_out_tag='representative')
+    mp = pd.read_csv(f'{temp_mp}{CSV}')
+    row = mp[(mp.Tag == 'Scenario') & (mp.Key == 'n')].iloc[0].copy()
+    row['Key'], row['Optimization Value'], row['Type'] = 'representative_periods', 12, 'int'
+    mp.loc[len(mp)] = row
+    mp.to_csv(f'{temp_mp}{CSV}', index=False)
+    results = assert_ran(f'{temp_mp}{CSV}')
+    assert len(clustered) == 1
+    assert clustered[0].count == 365
+    assert clustered[0].weights.sum() == clustered[0].count
+    instance = results.instances[0]
+    assert instance.sizing_df['Energy Rating (kWh)'].iloc[0] > 0
+    remove_temp_files(temp_mp)
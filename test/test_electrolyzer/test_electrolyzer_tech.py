@@ -43,6 +43,7 @@ import numpy as np
 import numpy.testing as npt
 from storagevet.ErrorHandling import *
 from test.TestingLib import *
+from dervet.DERVETParams import ParamsDER
 #import ipdb
 #ipdb.set_trace()
 
@@ -332,6 +333,47 @@ def test_ez_001_b():
     assert_timeseries_columns_exist(ts, [f'ELECTROLYZERSYSTEM: {name.lower()} Hydrogen Production Actual (kg)'])
     remove_temp_files(temp_mp)
 
+def test_ez_001_b_interpolated():
+    test_file = DIR / f'001-EZ-PV-BESS'
+
+    # optimized EZ power with a linearly interpolated variable efficiency curve
+    temp_mp = modify_mp('ElectrolyzerSystem', key='incl_variable_efficiency', value=1, column='Optimization Value', mp_in=test_file, mp_out_tag='interpolated')
+    mp = pd.read_csv(f'{temp_mp}{CSV}')
+    ez_row = mp.loc[(mp.Tag == 'ElectrolyzerSystem') & (mp.Key == 'incl_variable_efficiency')].iloc[0].copy()
+    ez_row['Key'] = 'variable_efficiency_interpolation'
+    mp.loc[len(mp)] = ez_row
+    mp.to_csv(f'{temp_mp}{CSV}', index=False)
+    results = assert_ran(f'{temp_mp}{CSV}').instances[0]
+    ez = [der for der in results.poi.der_list if der.tag == 'ElectrolyzerSystem'][0]
+    assert ez.variable_efficiency_interpolation
+    # the EZ does not operate between curve points here, so look up a few directly
+    fractional_power = pd.Series([0, 0.05, 0.25, 0.75, 1])
+    npt.assert_allclose(ez.calc_variable_efficiency(fractional_power), [0.01, 0.01, 0.02, 0.045, 0.06])
+    ez.variable_efficiency_interpolation = False
+    npt.assert_allclose(ez.calc_variable_efficiency(fractional_power), [0.01, 0.01, 0.02, 0.04, 0.06])
+    remove_temp_files(temp_mp)
+
+def test_ez_001_b_sensitivity_shares_unsorted_efficiency_curve(tmp_path):
+    test_file = DIR / f'001-EZ-PV-BESS'
+
+    # every case sorts its own view of a shared, unsorted variable efficiency curve
+    curve = pd.read_csv('./data/electrolyzersystem_efficiency_curve.csv').iloc[::-1].reset_index(drop=True)
+    curve.to_csv(tmp_path / 'efficiency_curve.csv', index=False)
+    temp_mp = modify_mp('ElectrolyzerSystem', key='hydrogen_schedule_mode', value=1, column='Optimization Value', mp_in=test_file, mp_out_tag='sensitivity')
+    temp_mp = modify_mp('ElectrolyzerSystem', key='incl_variable_efficiency', value=1, column='Optimization Value', mp_in=temp_mp, mp_out_tag='sensitivity')
+    temp_mp = modify_mp('ElectrolyzerSystem', key='variable_efficiency_filename', value=tmp_path / 'efficiency_curve.csv', column='Optimization Value', mp_in=temp_mp, mp_out_tag='sensitivity')
+    temp_mp = modify_mp('ElectrolyzerSystem', key='efficiency', value='0.02, 0.03', column='Sensitivity Parameters', mp_in=temp_mp, mp_out_tag='sensitivity')
+    temp_mp = modify_mp('ElectrolyzerSystem', key='efficiency', value='yes', column='Sensitivity Analysis', mp_in=temp_mp, mp_out_tag='sensitivity')
+    temp_mp = modify_mp('ElectrolyzerSystem', key='efficiency', value='None', column='Coupled', mp_in=temp_mp, mp_out_tag='sensitivity')
+    results = assert_ran(f'{temp_mp}{CSV}')
+    remove_temp_files(temp_mp)
+    assert len(results.instances) == 2
+    for result in results.instances.values():
+        ez = [der for der in result.poi.der_list if der.tag == 'ElectrolyzerSystem'][0]
+        assert ez.variable_efficiency_data['Fractional Power (%)'].is_monotonic_increasing
+    shared_curve = ParamsDER.referenced_data['variable_efficiency_filename'][str(tmp_path / 'efficiency_curve.csv')]
+    pd.testing.assert_frame_equal(shared_curve, curve)
+
 def test_ez_001_c():
     test_file = DIR / f'001-EZ-PV-BESS'
 
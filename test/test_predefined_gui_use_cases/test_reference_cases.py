@@ -49,10 +49,10 @@ USECASE_FOLDER = {
 }
 
 USECASE_RESULTS_FILES_COUNT = {
-    1: 24,
-    2: 25,
-    3: 18,
-    4: 22,
+    1: 25,
+    2: 26,
+    3: 19,
+    4: 23,
 }
 
 USECASE_TIMESERIES_COLUMNS_COUNT = {
@@ -38,6 +38,7 @@ import pytest
 from pathlib import Path
 from test.TestingLib import *
 from storagevet.ErrorHandling import *
+from dervet.MicrogridValueStreams.Reliability import Reliability
 
 RESULTS = Path("./test/test_load_shedding/results")
 SIZING_RESULTS = Path("./test/test_load_shedding/results/Sizing")
@@ -166,3 +167,119 @@ def test_battery_sizing4reliability_soc_init_small():
 
 def test_post_facto_dg_only():
     assert_ran(MP / f"Reliability_DG{CSV}")
+
+
+"""
+Batched outage simulation TESTS
+"""
+
+
+ESS_PROPERTIES = {'charge max': 40, 'discharge max': 40, 'operation SOE min': 10, 'operation SOE max': 200,
+                  'rte list': [0.9], 'energy rating': 200}
+
+
+def outage_reference(reliability_check, demand_left, energy_check, outage_len, init_soe, props, dt):
+    """ The SOE profile of a single outage, following the rules of the recursive simulate_outage
+    (one ESS, so there is one round trip efficiency)
+
+    """
+    soe, profile = init_soe, []
+    for step in range(min(outage_len, len(reliability_check))):
+        if 0 >= reliability_check[step]:
+            if props['operation SOE max'] >= soe:
+                rte = props['rte list'][0]
+                charge = min((props['operation SOE max'] - soe) / (rte * dt), -demand_left[step], props['charge max'])
+                soe = soe + charge * rte * dt
+        else:
+            if 0 < np.around(energy_check[step] * dt - soe, decimals=2):
+                break
+            discharge = min((soe - props['operation SOE min']) / dt, demand_left[step], props['discharge max'])
+            if 0 < np.around(demand_left[step] - discharge, decimals=2):
+                break
+            soe = soe - discharge * dt
+        profile.append(soe)
+    return profile
+
+
+@pytest.fixture
+def reliability(tmp_path):
+    TellUser.create_log(tmp_path, False)
+    rng = np.random.default_rng(seed=2)
+    index = pd.date_range('2017-01-01', periods=72, freq='h')
+    critical_load = pd.Series(rng.uniform(0, 100, len(index)), index=index)
+    instance = Reliability({'target': 4, 'dt': 1, 'post_facto_only': True, 'post_facto_initial_soc': 50,
+                            'max_outage_duration': 6, 'n-2': False, 'critical load': critical_load,
+                            'load_shed_percentage': False})
+    pv_max = rng.uniform(0, 60, len(index))
+    der_mix = (np.full(len(index), 30.0), pv_max, dict(ESS_PROPERTIES), 0.8 * pv_max, 1.2)
+    instance.get_der_mix_properties = lambda der_list: der_mix
+    return instance
+
+
+def test_batched_outages_match_each_outage_simulated_on_its_own(reliability):
+    generation, pv_max, props, pv_vari, gamma = reliability.get_der_mix_properties([])
+    init_soe = np.random.default_rng(seed=3).uniform(10, 200, len(reliability.critical_load))
+    outage_len = int(reliability.max_outage_duration)
+    all_demand, all_reliability, all_energy = reliability.data_process_all(generation, pv_max, pv_vari, gamma)
+    profiles, coverage = reliability.simulate_outages(all_reliability, all_demand, all_energy, outage_len,
+                                                      init_soe, props)
+    for start in range(len(reliability.critical_load)):
+        demand, reliability_check, energy = reliability.data_process(start, generation, pv_max, props, pv_vari, gamma)
+        np.testing.assert_array_equal(all_demand[start, :len(demand)], demand)
+        reference = outage_reference(reliability_check, demand, energy, outage_len, init_soe[start], props,
+                                     reliability.dt)
+        assert coverage[start] == len(reference)
+        np.testing.assert_allclose(profiles[start, :len(reference)], reference)
+        assert not profiles[start, len(reference):].any()
+    # some outages are covered for the whole time, and some are not
+    assert 0 < (coverage == outage_len).sum() < len(coverage)
+
+
+def test_load_coverage_probability_matches_each_outage_simulated_on_its_own(reliability):
+    generation, pv_max, props, pv_vari, gamma = reliability.get_der_mix_properties([])
+    soe = pd.Series(np.random.default_rng(seed=4).uniform(10, 200, len(reliability.critical_load)),
+                    index=reliability.critical_load.index)
+    lcpc = reliability.load_coverage_probability([], pd.DataFrame({'Aggregated State of Energy (kWh)': soe}),
+                                                 pd.DataFrame({'Type': ['Energy Storage System']}))
+    data_length = len(reliability.critical_load)
+    coverage = []
+    for start in range(data_length):
+        demand, reliability_check, energy = reliability.data_process(start, generation, pv_max, props, pv_vari, gamma)
+        coverage.append(len(outage_reference(reliability_check, demand, energy, 6, soe.iloc[start], props,
+                                             reliability.dt)))
+    coverage = np.array(coverage)
+    expected = [(coverage >= length).sum() / (data_length - length + 1) * 100 for length in range(1, 7)]
+    np.testing.assert_allclose(lcpc['Load Coverage Probability (%)'].values, expected)
+
+
+def test_min_soe_matches_each_outage_simulated_on_its_own(reliability):
+    class Storage:
+        technology_type = 'Energy Storage System'
+
+        @staticmethod
+        def energy_capacity(solution=False):
+            return ESS_PROPERTIES['energy rating']
+
+    generation, pv_max, props, pv_vari, gamma = reliability.get_der_mix_properties([])
+    index = reliability.critical_load.index
+    reliability.min_soe_iterative(index, [Storage()])
+    init_soe = reliability.soc_init * props['energy rating']
+    expected = []
+    for start in range(len(index)):
+        demand, reliability_check, energy = reliability.data_process(start, generation, pv_max, props, pv_vari, gamma)
+        profile = [init_soe] + outage_reference(reliability_check, demand, energy, reliability.coverage_dt, init_soe,
+                                                props, reliability.dt)
+        expected.append(max(profile) - min(profile))
+    np.testing.assert_allclose(reliability.min_soe_df['soe'].values, expected)
+
+
+def test_round_trip_efficiency_draws_follow_the_numpy_seed(reliability):
+    generation, pv_max, props, pv_vari, gamma = reliability.get_der_mix_properties([])
+    props['rte list'] = [0.8, 0.9]
+    outages = reliability.data_process_all(generation, pv_max, pv_vari, gamma)
+    np.random.seed(5)
+    first = reliability.simulate_outages(outages[1], outages[0], outages[2], 6, 100, props)
+    np.random.seed(5)
+    second = reliability.simulate_outages(outages[1], outages[0], outages[2], 6, 100, props)
+    np.testing.assert_array_equal(first[0], second[0])
+    np.testing.assert_array_equal(first[1], second[1])